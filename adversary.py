@@ -0,0 +1,236 @@
+# Adversary engine for the simulated transmission path
+#
+# Each attack mutates a (token, md5_hash) message the way an attacker on the
+# wire could. The front ends pick one at random when the simulated attacker
+# strikes; run_campaign() pushes large numbers of mutated messages through
+# CryptoManager on a process pool and reports how many were detected.
+
+import os
+import random
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from crypto_utils import CryptoManager, ReplayGuard, TOKEN_TTL
+
+# ============== MESSAGES ==============
+Message = namedtuple('Message', ['token', 'md5_hash'])
+
+HISTORY_LIMIT = 32  # Earlier messages an attacker keeps for replays
+
+# Campaign outcomes
+DETECTED = 'detected'      # Receiver rejected the message
+UNDETECTED = 'undetected'  # Receiver accepted a plaintext that was not sent
+HARMLESS = 'harmless'      # Accepted, and the plaintext was what was sent
+
+CAMPAIGN_WORDS = [
+    'PYTHON', 'HANGMAN', 'SECURE', 'TUNNEL', 'CIPHER', 'GALLOWS',
+    'KEYBOARD', 'NETWORK', 'PLAYER', 'RAGDOLL', 'INTEGRITY', 'FERNET'
+]
+
+
+class AttackContext:
+    """What an attacker on the channel has seen so far."""
+
+    def __init__(self, rng=None, history=None):
+        self.rng = rng or random.Random()
+        # Earlier messages on this channel
+        self.history = history if history is not None else deque(maxlen=HISTORY_LIMIT)
+        self._foreign = None
+
+    @property
+    def foreign(self):
+        """A session the attacker controls (different key)."""
+        if self._foreign is None:
+            self._foreign = CryptoManager()
+        return self._foreign
+
+
+# ============== ATTACKS ==============
+class Attack:
+    name = ''
+
+    def apply(self, message, ctx):
+        raise NotImplementedError
+
+
+class BitFlip(Attack):
+    name = 'bit_flip'
+
+    def apply(self, message, ctx):
+        token = bytearray(message.token)
+        offset = ctx.rng.randrange(len(token))
+        token[offset] ^= 1 << ctx.rng.randrange(8)
+        return Message(bytes(token), message.md5_hash)
+
+
+class ByteFlip(Attack):
+    """The original demo attack: invert byte 15."""
+    name = 'byte_flip'
+
+    def apply(self, message, ctx):
+        token = bytearray(message.token)
+        if len(token) > 20:
+            token[15] ^= 0xFF
+        return Message(bytes(token), message.md5_hash)
+
+
+class Truncate(Attack):
+    name = 'truncate'
+
+    def apply(self, message, ctx):
+        cut = ctx.rng.randrange(1, len(message.token))
+        return Message(message.token[:-cut], message.md5_hash)
+
+
+class Replay(Attack):
+    """Resend an earlier message (token and hash) from the same channel."""
+    name = 'replay'
+
+    def apply(self, message, ctx):
+        if not ctx.history:
+            return message
+        return ctx.rng.choice(ctx.history)
+
+
+class Reorder(Attack):
+    """Deliver the most recent earlier message in place of this one."""
+    name = 'reorder'
+
+    def apply(self, message, ctx):
+        if not ctx.history:
+            return message
+        return ctx.history[-1]
+
+
+class TokenSubstitution(Attack):
+    """Swap in an earlier token but keep this message's hash."""
+    name = 'token_substitution'
+
+    def apply(self, message, ctx):
+        if not ctx.history:
+            return message
+        return Message(ctx.rng.choice(ctx.history).token, message.md5_hash)
+
+
+class KeyConfusion(Attack):
+    """Inject a word of the attacker's choosing under the attacker's own key.
+
+    MD5 is unkeyed, so the attacker can send a matching hash.
+    """
+    name = 'key_confusion'
+
+    def apply(self, message, ctx):
+        word = ctx.rng.choice(CAMPAIGN_WORDS)
+        return Message(ctx.foreign.encrypt(word), CryptoManager.generate_md5(word))
+
+
+ATTACKS = {attack.name: attack for attack in (
+    BitFlip(), ByteFlip(), Truncate(), Replay(), Reorder(),
+    TokenSubstitution(), KeyConfusion()
+)}
+
+
+def random_attack(rng=random):
+    return ATTACKS[rng.choice(sorted(ATTACKS))]
+
+
+def receive(crypto, message):
+    """Receiver side: the plaintext if it decrypts and matches its hash, else None."""
+    try:
+        text = crypto.decrypt(message.token)
+    except Exception:
+        return None
+    if not crypto.verify_integrity(text, message.md5_hash):
+        return None
+    return text
+
+
+# ============== CAMPAIGN ==============
+def _run_chunk(attack_name, trials, seed, replay_guard=False, session_length=16):
+    """Worker: run trials of one attack and count outcomes.
+
+    Each trial sends one genuine message followed by one attacked message;
+    only the attacked message is counted.
+    """
+    attack = ATTACKS[attack_name]
+    rng = random.Random(seed)
+    counts = {DETECTED: 0, UNDETECTED: 0, HARMLESS: 0}
+    crypto = None
+    ctx = None
+    start = time.perf_counter()
+    for i in range(trials):
+        if i % session_length == 0:
+            # New session: new key, empty channel history
+            if replay_guard:
+                crypto = CryptoManager(ttl=TOKEN_TTL, replay_guard=ReplayGuard(capacity=2 * session_length))
+            else:
+                crypto = CryptoManager()
+            ctx = AttackContext(rng)
+        
+        # A genuine message goes through untouched; the attacker records it
+        word = rng.choice(CAMPAIGN_WORDS)
+        genuine = Message(crypto.encrypt(word), crypto.digest(word))
+        receive(crypto, genuine)
+        ctx.history.append(genuine)
+        
+        # The next message is attacked
+        word = rng.choice(CAMPAIGN_WORDS)
+        sent = Message(crypto.encrypt(word), crypto.digest(word))
+        received = receive(crypto, attack.apply(sent, ctx))
+        if received is None:
+            counts[DETECTED] += 1
+        elif received == word:
+            counts[HARMLESS] += 1
+        else:
+            counts[UNDETECTED] += 1
+    return attack_name, counts, time.perf_counter() - start
+
+
+def run_campaign(trials_per_attack, attacks=None, processes=None, chunk_size=20_000, seed=0,
+                 replay_guard=False):
+    """Run every attack on a process pool; returns {name: report dict}."""
+    attacks = list(attacks or ATTACKS)
+    processes = processes or os.cpu_count()
+    jobs = []
+    for name in attacks:
+        for start in range(0, trials_per_attack, chunk_size):
+            jobs.append((name, min(chunk_size, trials_per_attack - start), seed + len(jobs), replay_guard))
+
+    report = {name: {DETECTED: 0, UNDETECTED: 0, HARMLESS: 0, 'cpu_seconds': 0.0} for name in attacks}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_run_chunk, *job) for job in jobs]
+        for future in futures:
+            name, counts, elapsed = future.result()
+            for key, value in counts.items():
+                report[name][key] += value
+            report[name]['cpu_seconds'] += elapsed
+    wall = time.perf_counter() - started
+
+    for name, r in report.items():
+        trials = r[DETECTED] + r[UNDETECTED] + r[HARMLESS]
+        effective = r[DETECTED] + r[UNDETECTED]
+        r['trials'] = trials
+        r['detection_rate'] = r[DETECTED] / effective if effective else 1.0
+        r['per_core_throughput'] = trials / r['cpu_seconds'] if r['cpu_seconds'] else 0.0
+    report['_wall_seconds'] = wall
+    return report
+
+
+def print_report(report):
+    wall = report.pop('_wall_seconds')
+    print(f"{'attack':<20}{'trials':>10}{'detected':>10}{'undetected':>12}{'harmless':>10}{'rate':>8}{'msg/s/core':>12}")
+    total = 0
+    for name, r in report.items():
+        total += r['trials']
+        print(f"{name:<20}{r['trials']:>10,}{r[DETECTED]:>10,}{r[UNDETECTED]:>12,}{r[HARMLESS]:>10,}"
+              f"{r['detection_rate']:>8.1%}{r['per_core_throughput']:>12,.0f}")
+    print(f"\n{total:,} messages in {wall:.1f}s wall ({total / wall:,.0f} msg/s)")
+
+
+if __name__ == "__main__":
+    import sys
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    trials = int(args[0]) if args else 100_000
+    print_report(run_campaign(trials, replay_guard='--replay-guard' in sys.argv))
@@ -0,0 +1,203 @@
+# Batch guess evaluation for many rooms at once
+#
+# For bot tournaments and server-side hosting: the game state of thousands
+# of rooms lives in a few arrays instead of GameRoom objects. Each word is
+# a row of a zero-padded uint8 matrix, and each room keeps 26-bit masks of
+# the letters in its word and the letters guessed so far. A tick's worth of
+# guesses from every room is applied in a handful of NumPy operations per
+# round: reveals, wrong-count increments and win/lose transitions follow
+# the same rules as GameRoom.handle_guess. A room that sent several guesses
+# in one tick has them applied in order, one round each.
+#
+# Usage: python batch.py [rooms]   (checks against GameRoom and times both)
+
+from collections import namedtuple
+
+import numpy as np
+
+from rooms import MAX_WRONG_GUESSES, STATES, letter_mask
+
+# ============== CONFIGURATION ==============
+MAX_WORD = 32  # Longest word; reveals are u32 position masks, as on the wire
+ALPHABET = 26
+
+SET_WORD, TRANSITION, GUESSING, GAME_OVER = range(len(STATES))
+
+# Per guess, in the order the guesses were given
+Outcome = namedtuple('Outcome', ['applied', 'correct', 'reveal', 'wrong_count', 'won', 'lost'])
+
+
+def letter_codes(letters):
+    """0..25 for a string, bytes or uint8 array of upper-case letters."""
+    if isinstance(letters, str):
+        letters = letters.encode('ascii')
+    codes = np.frombuffer(letters, dtype=np.uint8) if isinstance(letters, bytes) \
+        else np.asarray(letters, dtype=np.uint8)
+    codes = codes - np.uint8(ord('A'))
+    if codes.size and codes.max() >= ALPHABET:
+        raise ValueError("Guesses must be letters A-Z")
+    return codes
+
+
+# ============== BATCH ==============
+class GuessBatch:
+    """Words, guesses, wrong counts and states of `capacity` rooms as arrays."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.words = np.zeros((capacity, MAX_WORD), dtype=np.uint8)  # ASCII, 0-padded
+        self.lengths = np.zeros(capacity, dtype=np.uint8)
+        self.letters = np.zeros(capacity, dtype=np.uint32)  # Letters in the word
+        self.guessed = np.zeros(capacity, dtype=np.uint32)
+        self.wrong = np.zeros(capacity, dtype=np.uint8)
+        self.state = np.full(capacity, SET_WORD, dtype=np.uint8)
+
+    def load(self, slot, word, guessed=(), wrong_count=0, state="GUESSING"):
+        if len(word) > MAX_WORD:
+            raise ValueError(f"Word longer than {MAX_WORD} letters")
+        self.words[slot] = 0
+        self.words[slot, :len(word)] = np.frombuffer(word.encode('ascii'), dtype=np.uint8)
+        self.lengths[slot] = len(word)
+        self.letters[slot] = letter_mask(word)
+        self.guessed[slot] = letter_mask(guessed)
+        self.wrong[slot] = wrong_count
+        self.state[slot] = STATES.index(state)
+
+    def load_room(self, slot, room):
+        self.load(slot, room.word, room.guessed, room.wrong_count, room.state)
+
+    def store_room(self, slot, room):
+        """Copy a slot back into a GameRoom (no journal records are written)."""
+        guessed = int(self.guessed[slot])
+        room.guessed = {chr(ord('A') + i) for i in range(ALPHABET) if guessed >> i & 1}
+        room.wrong_count = int(self.wrong[slot])
+        state = STATES[self.state[slot]]
+        if state == "GAME_OVER" and room.state != "GAME_OVER":
+            room.status_msg = ("DEFEAT - Player 1 Wins!" if room.wrong_count >= MAX_WRONG_GUESSES
+                               else "VICTORY - Player 2 Wins!")
+        room.state = state
+
+    def masked(self, slot):
+        word = self.words[slot, :self.lengths[slot]].tobytes().decode('ascii')
+        if self.state[slot] == GAME_OVER:
+            return word
+        guessed = int(self.guessed[slot])
+        return ''.join(c if guessed >> (ord(c) - ord('A')) & 1 else '_' for c in word)
+
+    def apply(self, slots, letters):
+        """Apply guesses (slots[i] guesses letters[i]); an Outcome of arrays."""
+        slots = np.asarray(slots, dtype=np.intp)
+        codes = letter_codes(letters)
+        if len(slots) != len(codes):
+            raise ValueError("One letter per slot")
+        n = len(slots)
+        out = Outcome(np.zeros(n, dtype=bool), np.zeros(n, dtype=bool), np.zeros(n, dtype=np.uint32),
+                      np.zeros(n, dtype=np.uint8), np.zeros(n, dtype=bool), np.zeros(n, dtype=bool))
+        if n == 0:
+            return out
+
+        # Rank of each guess among its room's guesses; one round per rank
+        # keeps the slots within a round unique and the order per room
+        order = np.argsort(slots, kind='stable')
+        ordered = slots[order]
+        first = np.ones(n, dtype=bool)
+        first[1:] = ordered[1:] != ordered[:-1]
+        starts = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+        rank = np.empty(n, dtype=np.intp)
+        rank[order] = np.arange(n) - starts
+        if rank.max() == 0:
+            self._round(np.arange(n), slots, codes, out)
+        else:
+            for r in range(rank.max() + 1):
+                index = np.flatnonzero(rank == r)
+                self._round(index, slots[index], codes[index], out)
+        return out
+
+    def _round(self, index, slots, codes, out):
+        bits = np.left_shift(np.uint32(1), codes.astype(np.uint32))
+        guessed = self.guessed[slots]
+        applied = (self.state[slots] == GUESSING) & (guessed & bits == 0)
+        guessed |= np.where(applied, bits, np.uint32(0))
+        letters = self.letters[slots]
+        correct = applied & (letters & bits != 0)
+        missed = applied & ~correct
+        wrong = self.wrong[slots] + missed.astype(np.uint8)
+        lost = missed & (wrong >= MAX_WRONG_GUESSES)
+        won = correct & (letters & ~guessed == 0)
+
+        self.guessed[slots] = guessed
+        self.wrong[slots] = wrong
+        self.state[slots] = np.where(lost | won, np.uint8(GAME_OVER), self.state[slots])
+
+        hits = (self.words[slots] == (codes + np.uint8(ord('A')))[:, None]) & correct[:, None]
+        out.reveal[index] = np.packbits(hits, axis=1, bitorder='little').view('<u4').ravel()
+        out.applied[index] = applied
+        out.correct[index] = correct
+        out.wrong_count[index] = wrong
+        out.won[index] = won
+        out.lost[index] = lost
+
+
+def scalar_outcome(room, char):
+    """handle_guess on one GameRoom, reported like one entry of an Outcome."""
+    before = (room.state, len(room.guessed))
+    room.handle_guess(char)
+    applied = (before[0], before[1]) != (room.state, len(room.guessed))
+    correct = applied and char in room.word
+    reveal = sum(1 << i for i, c in enumerate(room.word) if c == char) if correct else 0
+    over = applied and room.state == "GAME_OVER"
+    return applied, correct, reveal, room.wrong_count, over and correct, over and not correct
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from rooms import GameRoom
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    random.seed(1)
+    words = ['PYTHON', 'HANGMAN', 'GALLOWS', 'CIPHER', 'JOURNAL', 'KEYBOARD', 'ZEPHYR',
+             'QUIZ', 'RHYTHM', 'MISSISSIPPI', 'AVOCADO', 'INTEGRITY', 'XYLOPHONE']
+    rooms = []
+    for i in range(count):
+        room = GameRoom(i, ragdoll_factory=lambda x, y: None)
+        room.set_word(random.choice(words))
+        if random.random() < 0.95:  # A few are left waiting for the guesser
+            room.start_guessing()
+        rooms.append(room)
+    batch = GuessBatch(count)
+    for slot, room in enumerate(rooms):
+        batch.load_room(slot, room)
+
+    # Bots guess one to three letters a tick, repeats included
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    scalar_time = batch_time = 0.0
+    ticks = guesses = 0
+    mismatches = 0
+    while any(r.state == "GUESSING" for r in rooms):
+        slots = [s for s in range(count) for _ in range(random.choice((1, 1, 1, 2, 3)))]
+        random.shuffle(slots)
+        letters = ''.join(random.choice(alphabet) for _ in slots)
+
+        start = time.perf_counter()
+        expected = [scalar_outcome(rooms[s], c) for s, c in zip(slots, letters)]
+        scalar_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        got = batch.apply(slots, letters)
+        batch_time += time.perf_counter() - start
+
+        for i, e in enumerate(expected):
+            if e != (got.applied[i], got.correct[i], got.reveal[i], got.wrong_count[i], got.won[i], got.lost[i]):
+                mismatches += 1
+        ticks += 1
+        guesses += len(slots)
+
+    states = all(STATES[batch.state[s]] == r.state and int(batch.wrong[s]) == r.wrong_count
+                 and batch.masked(s) == r.masked_word() for s, r in enumerate(rooms))
+    print(f"{count:,} rooms, {ticks} ticks, {guesses:,} guesses")
+    print(f"scalar handle_guess: {scalar_time / ticks * 1e3:8.2f} ms/tick")
+    print(f"batch apply:         {batch_time / ticks * 1e3:8.2f} ms/tick ({scalar_time / batch_time:.0f}x)")
+    print(f"outcome mismatches: {mismatches}, final states match: {states}")
@@ -0,0 +1,96 @@
+# Collision broadphase scaling benchmark
+# Usage: python benchmarks/bench_collision.py [max_ragdolls]
+#
+# Drops N ragdolls at once (rope snap, blood burst) along a gallows row
+# that grows with N, so density stays constant. Each frame it times one
+# full collision pass: every ragdoll's joints against the scene, then
+# step() for blood and ragdoll pairs. An all-pairs check without the
+# spatial hash runs on the same positions for comparison.
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import collision
+from collision import CollisionWorld, push_out
+from physics import Ragdoll, HEAD
+
+FRAMES = 120
+SPACING = 60  # Ragdolls per gallows-width of floor
+BRUTE_LIMIT = 200  # All-pairs gets too slow to wait for beyond this
+
+
+def scene(count):
+    """Gallows repeated every 300 units, ragdolls about to fall."""
+    random.seed(1)
+    segments = [(x1 + 300 * g, y1, x2 + 300 * g, y2, t)
+                for g in range(count * SPACING // 300 + 1)
+                for x1, y1, x2, y2, t in collision.GALLOWS]
+    ragdolls = []
+    for i in range(count):
+        r = Ragdoll(100 + i * SPACING + random.uniform(-20, 20), 100)
+        r.wrong_count = 6
+        r.pop_progress[:] = [1.0] * 7
+        r.death_timer = 100 + i % 20  # Snaps within the first 20 frames
+        ragdolls.append(r)
+    return segments, ragdolls
+
+
+def brute_force(world):
+    """The same contacts without a broadphase: everything against everything."""
+    circles = []
+    for body, ragdoll in enumerate(world.ragdolls):
+        for i, p in enumerate(ragdoll.points):
+            if not p.locked:
+                circles.append((p, collision.HEAD_RADIUS if i == HEAD else collision.JOINT_RADIUS, body))
+        for b in ragdoll.blood_particles:
+            for seg in world.segments:
+                push_out(b.x, b.y, b.size, seg)
+    hits = 0
+    for p, r, body in circles:
+        for seg in world.segments:
+            if push_out(p.x, p.y, r, seg) is not None:
+                hits += 1
+    for i, (p, r, body) in enumerate(circles):
+        for q, s, other in circles[i + 1:]:
+            if body != other and math.hypot(q.x - p.x, q.y - p.y) < r + s:
+                hits += 1
+    return hits
+
+
+def hashed(world):
+    for r in world.ragdolls:
+        world.collide(r)
+    world.step()
+
+
+def run(count, step):
+    segments, ragdolls = scene(count)
+    world = CollisionWorld(segments)
+    for r in ragdolls:
+        world.add(r)
+    elapsed = 0.0
+    particles = 0
+    for _ in range(FRAMES):
+        for r in ragdolls:
+            r.update()
+        start = time.perf_counter()
+        step(world)
+        elapsed += time.perf_counter() - start
+        particles = max(particles, sum(len(r.blood_particles) for r in ragdolls))
+    return elapsed / FRAMES, particles
+
+
+if __name__ == "__main__":
+    max_count = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+    print(f"{'ragdolls':>8} {'particles':>9} {'hash pass':>10} {'per body':>9} {'all-pairs':>10}")
+    count = 25
+    while count <= max_count:
+        per_frame, particles = run(count, hashed)
+        brute = f"{run(count, brute_force)[0] * 1e3:7.2f} ms" if count <= BRUTE_LIMIT else "-"
+        print(f"{count:>8} {particles:>9} {per_frame * 1e3:7.2f} ms {per_frame / count * 1e6:6.1f} us {brute:>10}")
+        count *= 2
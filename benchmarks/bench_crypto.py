@@ -0,0 +1,75 @@
+# Crypto backend benchmark: Fernet + MD5 vs one-pass AEAD
+# Usage: python benchmarks/bench_crypto.py [messages]
+#
+# Times one word's trip through a session: the sender encrypts (and, for
+# Fernet, hashes), the receiver decrypts and verifies. Token sizes are
+# shown as text and as a binary word-set frame; only Fernet sessions send
+# an MD5 digest next to the token.
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_utils import CryptoManager, TOKEN_TTL, BACKENDS
+import wire
+
+WORDS = ['PYTHON', 'HANGMAN', 'SECURE', 'TUNNEL', 'CIPHER', 'GALLOWS', 'KEYBOARD', 'INTEGRITY']
+
+
+def fernet_md5(words):
+    sender = CryptoManager(ttl=TOKEN_TTL, backend='fernet')
+    receiver = CryptoManager(sender.get_key(), ttl=TOKEN_TTL)
+    for word in words:
+        token, md5_hex = sender.encrypt(word), sender.digest(word)
+        assert receiver.verify_integrity(receiver.decrypt(token), md5_hex)
+
+
+def aead(backend):
+    def run(words):
+        sender = CryptoManager(ttl=TOKEN_TTL, backend=backend, room_id=1)
+        receiver = CryptoManager(sender.get_key(), ttl=TOKEN_TTL, room_id=1)
+        for word in words:
+            assert receiver.decrypt(sender.encrypt(word)) == word
+    return run
+
+
+def best(fn, *args, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def sizes(backend):
+    """Mean (text, wire) bytes per word-set message."""
+    crypto = CryptoManager(backend=backend)
+    text = raw = 0
+    for word in WORDS:
+        token = crypto.encrypt(word)
+        text += len(token) + len(crypto.digest(word))  # AEAD: no hash, the tag covers the word
+        raw += len(wire.encode_word_set(1, wire.token_to_raw(token), wire.word_digest(crypto, word)))
+    return text / len(WORDS), raw / len(WORDS)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    random.seed(1)
+    words = [random.choice(WORDS) for _ in range(n)]
+    print(f"{n:,} messages, encrypt + verify per message")
+    print(f"{'path':<18} {'latency':>10} {'token':>7} {'frame':>7}")
+    baseline = best(fernet_md5, words)
+    text, raw = sizes('fernet')
+    print(f"{'fernet + md5':<18} {baseline / n * 1e6:7.2f} us {text:>5.0f} B {raw:>5.0f} B")
+    for name in BACKENDS:
+        if name == 'fernet':
+            continue
+        elapsed = best(aead(name), words)
+        text, raw = sizes(name)
+        print(f"{name:<18} {elapsed / n * 1e6:7.2f} us {text:>5.0f} B {raw:>5.0f} B"
+              f"   {baseline / elapsed:.1f}x")
+    print("token = text form (Fernet: base64 token + hex MD5); frame = binary word-set frame")
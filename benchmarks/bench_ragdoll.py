@@ -0,0 +1,50 @@
+# Ragdoll memory and update-loop benchmark
+# Usage: python benchmarks/bench_ragdoll.py [num_ragdolls] [frames]
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from physics import Ragdoll
+
+
+def measure_memory(count):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    ragdolls = [Ragdoll(250, 100) for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return ragdolls, size / count
+
+
+def measure_update(count, frames, repeats=5):
+    """Best-of-N time per ragdoll per frame through grow, struggle and fall."""
+    best = None
+    for _ in range(repeats):
+        random.seed(1)
+        ragdolls = [Ragdoll(250, 100) for _ in range(count)]
+        for r in ragdolls:
+            r.wrong_count = 6  # Full body, death struggle, rope snap, blood
+        start = time.perf_counter()
+        for _ in range(frames):
+            for r in ragdolls:
+                r.update()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / (frames * count)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    ragdolls, per_ragdoll = measure_memory(count)
+    del ragdolls
+    per_update = measure_update(count, frames)
+    print(f"Ragdolls:        {count}")
+    print(f"Memory/ragdoll:  {per_ragdoll:,.0f} bytes")
+    print(f"Update/ragdoll:  {per_update * 1e6:.1f} us/frame")
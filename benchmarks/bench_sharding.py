@@ -0,0 +1,58 @@
+# Sharded host scaling benchmark
+# Usage: python benchmarks/bench_sharding.py [rooms] [max_workers]
+#
+# Spreads a fixed set of rooms over 1, 2, 4, ... worker processes. Each
+# room is in GAME_OVER with its ragdoll falling, so every tick simulates
+# physics. Workers run with an unreachable tick rate, so they tick as fast
+# as they can; throughput is room ticks per second, read from the frame
+# counters the workers publish. Perfect scaling keeps efficiency at 100%
+# up to the number of cores.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharding import ShardedRoomHost, shard_for
+
+WARMUP = 1.0
+DURATION = 3.0
+FLAT_OUT = 1_000_000  # Tick rate no worker reaches: never sleep
+
+
+def throughput(rooms, workers):
+    with ShardedRoomHost(num_workers=workers, capacity=rooms, tick_rate=FLAT_OUT) as host:
+        for rid in range(1, rooms + 1):
+            host.create_room(rid)
+            host.set_word(rid, "SHARDED")
+            host.start_guessing(rid)
+            for c in "QZXWVJ":
+                host.guess(rid, c)
+        per_shard = [0] * workers
+        for rid in range(1, rooms + 1):
+            per_shard[shard_for(rid, workers)] += 1
+        time.sleep(WARMUP)
+        before = host.frames()
+        start = time.perf_counter()
+        time.sleep(DURATION)
+        after = host.frames()
+        elapsed = time.perf_counter() - start
+        assert not host.errors()
+    ticks = sum((a - b) * n for a, b, n in zip(after, before, per_shard))
+    return ticks / elapsed
+
+
+if __name__ == "__main__":
+    rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    cores = os.cpu_count()
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else cores
+    print(f"{rooms} rooms, {cores} cores")
+    print(f"{'workers':>7} {'room ticks/s':>13} {'speedup':>8} {'efficiency':>10}")
+    base = None
+    workers = 1
+    while workers <= max_workers:
+        rate = throughput(rooms, workers)
+        base = base or rate
+        print(f"{workers:>7} {rate:>13,.0f} {rate / base:>7.2f}x {rate / base / workers:>9.0%}")
+        workers = workers * 2 if workers * 2 <= max_workers or workers == max_workers else max_workers
@@ -0,0 +1,81 @@
+# Constraint solver convergence benchmark: PBD vs XPBD
+# Usage: python benchmarks/bench_solver.py [num_ragdolls] [max_iterations]
+#
+# Plays the hanging and death struggle (the rope is still on) and measures,
+# after every update, how far the limb sticks are from their rest length:
+# that is the stretch a player sees. The rope is left out because it is
+# compliant on purpose under XPBD.
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import physics
+from physics import Ragdoll
+
+FRAMES = 125  # Growth pop and the struggle, up to just after the rope snaps
+
+
+def limb_stretch(ragdoll):
+    """Largest relative length error over every stick but the rope."""
+    worst = 0.0
+    for s in ragdoll.sticks:
+        if s is ragdoll.rope:
+            continue
+        dist = math.hypot(s.p2.x - s.p1.x, s.p2.y - s.p1.y)
+        worst = max(worst, abs(dist - s.length) / s.length)
+    return worst
+
+
+def limit_violation(ragdoll):
+    """Largest joint angle beyond its limit, in degrees."""
+    worst = 0.0
+    pts = [(p.x, p.y) for p in ragdoll.points]
+    for a, o, b, lo, hi, _ in physics.LIMIT_BOUNDS:
+        angle = physics.bend(pts[a], pts[o], pts[b])
+        worst = max(worst, lo - angle, angle - hi)
+    return math.degrees(worst)
+
+
+def run(solver, iterations, count):
+    random.seed(1)
+    ragdolls = [Ragdoll(250, 100, solver=solver, iterations=iterations) for _ in range(count)]
+    for r in ragdolls:
+        r.wrong_count = 6
+    stretch = []
+    violation = 0.0
+    elapsed = 0.0
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        for r in ragdolls:
+            r.update()
+        elapsed += time.perf_counter() - start
+        for r in ragdolls:
+            stretch.append(limb_stretch(r))
+            violation = max(violation, limit_violation(r))
+    stretch.sort()
+    return {
+        'mean': sum(stretch) / len(stretch),
+        'p99': stretch[int(len(stretch) * 0.99)],
+        'max': stretch[-1],
+        'violation': violation,
+        'us': elapsed / (FRAMES * count) * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    max_iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{count} ragdolls, {FRAMES} frames; limb stretch after each update")
+    print(f"{'solver':<6} {'iters':>5} {'mean':>8} {'p99':>8} {'max':>8} {'limit':>8} {'update':>10}")
+    for solver in ('pbd', 'xpbd'):
+        for iterations in range(1, max_iterations + 1):
+            r = run(solver, iterations, count)
+            default = " *" if iterations == physics.ITERATIONS[solver] else ""
+            print(f"{solver:<6} {iterations:>5} {r['mean']:>7.2%} {r['p99']:>7.2%} {r['max']:>7.2%} "
+                  f"{r['violation']:>7.1f}° {r['us']:>7.1f} us{default}")
+    print("* default iterations; limit = worst joint angle beyond its limit")
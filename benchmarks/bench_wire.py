@@ -0,0 +1,86 @@
+# Wire format benchmark: binary frames vs base64 token + hex MD5 text
+# Usage: python benchmarks/bench_wire.py [messages]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_utils import CryptoManager
+import wire
+
+
+def text_encode(room_id, token, md5_hex):
+    return b'WORD_SET|%d|%s|%s\n' % (room_id, token, md5_hex.encode('ascii'))
+
+
+def text_parse(data):
+    out = []
+    for line in data.splitlines():
+        kind, room, token, md5_hex = line.split(b'|')
+        out.append((int(room), token, md5_hex.decode('ascii')))
+    return out
+
+
+def binary_parse(data):
+    out = []
+    for frame in wire.iter_frames(data):
+        out.append((frame.room_id, frame.fields[0], frame.fields[1]))
+    return out
+
+
+def binary_parse_fast(data):
+    return wire.parse_word_sets(data)[0]
+
+
+def text_receive(crypto, data):
+    for room_id, token, md5_hex in text_parse(data):
+        word = crypto.decrypt(token)
+        assert crypto.verify_integrity(word, md5_hex)
+
+
+def binary_receive(crypto, data):
+    for frame in wire.iter_frames(data):
+        assert wire.verify_word_set(crypto, frame) is not None
+
+
+def binary_receive_fast(crypto, data):
+    for room_id, ciphertext, digest in wire.parse_word_sets(data)[0]:
+        assert wire.verify_word(crypto, ciphertext, digest) is not None
+
+
+def best(fn, *args, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    crypto = CryptoManager()
+    words = ['PYTHON', 'HANGMAN', 'SECURE', 'INTEGRITY']
+    messages = []
+    for i in range(n):
+        word = words[i % len(words)]
+        messages.append((i, crypto.encrypt(word), crypto.generate_md5(word), wire.md5_digest(word)))
+
+    text = b''.join(text_encode(i, tok, hx) for i, tok, hx, _ in messages)
+    binary = b''.join(wire.encode_word_set(i, wire.token_to_raw(tok), dg) for i, tok, _, dg in messages)
+    assert len(binary_parse(binary)) == len(binary_parse_fast(binary)) == len(text_parse(text)) == n
+
+    t_text = best(text_parse, text)
+    t_bin = best(binary_parse, binary)
+    r_text = best(text_receive, crypto, text, repeats=3)
+    r_bin = best(binary_receive, crypto, binary, repeats=3)
+    t_fast = best(binary_parse_fast, binary)
+    r_fast = best(binary_receive_fast, crypto, binary, repeats=3)
+    print(f"Messages:          {n:,}")
+    print(f"{'':18}{'bytes/msg':>10}{'parse ns':>10}{'parse+verify us':>17}")
+    print(f"{'token + hex text':18}{len(text) / n:>10.1f}{t_text / n * 1e9:>10.0f}{r_text / n * 1e6:>17.2f}")
+    print(f"{'binary iter_frames':18}{len(binary) / n:>10.1f}{t_bin / n * 1e9:>10.0f}{r_bin / n * 1e6:>17.2f}")
+    print(f"{'binary word sets':18}{len(binary) / n:>10.1f}{t_fast / n * 1e9:>10.0f}{r_fast / n * 1e6:>17.2f}")
+    print(f"Bytes saved: {1 - len(binary) / len(text):.1%}")
@@ -0,0 +1,250 @@
+# Soak test: play many games headlessly and watch for memory growth
+# Usage: python benchmarks/soak.py [--games N] [--frontend rooms|pygame|tk|all]
+#
+# Samples RSS and per-type object counts every --interval games and runs
+# tracemalloc over the final --trace-games. Growth is judged over the end
+# of the run, after bounded caches (replay guards, attack history) have
+# filled up. Exits non-zero and lists the growing types and allocation
+# sites when growth per game goes over the limits.
+
+import argparse
+import collections
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ["PYTHON", "GALLOWS", "CIPHER", "JOURNAL", "KIOSK", "ROPE", "SECRET"]
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+TRACE_FRAMES = 8
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Peak, not current
+
+
+def object_counts():
+    gc.collect()
+    return collections.Counter(type(o).__name__ for o in gc.get_objects())
+
+
+class Sample:
+    def __init__(self, games):
+        self.games = games
+        self.rss = rss_bytes()
+        self.objects = object_counts()
+
+
+# ============== DRIVERS ==============
+# Each driver plays one complete game per call, including the animation
+# frames a player would sit through, and returns nothing.
+
+def rooms_driver(frames):
+    from rooms import GameRoom
+    room = GameRoom(1)
+
+    def play(rng):
+        room.reset_game()
+        room.set_word(rng.choice(WORDS))
+        room.start_guessing()
+        for char in rng.sample(LETTERS, 26):
+            room.handle_guess(char)
+            room.tick()
+            if room.state == "GAME_OVER":
+                break
+        for _ in range(frames):
+            room.tick()
+    return play
+
+
+def pygame_driver(frames):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame_hangman
+    game = pygame_hangman.HangmanGame()
+
+    def play(rng):
+        game.reset_game()
+        game.input_box.text = rng.choice(WORDS)
+        game.set_word()
+        game.start_guessing()
+        for char in rng.sample(LETTERS, 26):
+            game.handle_guess(char)
+            game.update_physics()
+            if game.state == "GAME_OVER":
+                break
+        for _ in range(frames):
+            game.update_physics()
+        game.draw_game()
+    return play
+
+
+def tk_driver(frames):
+    import hangman
+    # No simulated network delays; pick crypto results up as soon as they land
+    hangman.TRANSMIT_DELAY_MS = hangman.VERIFY_DELAY_MS = hangman.START_DELAY_MS = 0
+    hangman.RESULT_POLL_MS = 1
+    game = hangman.HangmanGame()
+    game.root.withdraw()
+
+    def pump(until):
+        deadline = time.monotonic() + 5
+        while not until():
+            game.root.update()
+            if time.monotonic() > deadline:
+                raise TimeoutError("Tk game did not reach the expected state")
+
+    def play(rng):
+        game._new_game()
+        game.word_entry.insert(0, rng.choice(WORDS))
+        game._set_word()
+        pump(lambda: game.overlay is not None and game.overlay.winfo_ismapped())
+        game._player2_ready()
+        # Either the game starts or the integrity check fails
+        pump(lambda: game.game_active or game.word_label.cget('text') == "TAMPERED!")
+        for char in rng.sample(LETTERS, 26):
+            if not game.game_active:
+                break
+            game._guess_letter(char)
+        for _ in range(frames):
+            game.hangman._tick()
+        game.hangman.stop()
+        game.root.update()
+    return play
+
+
+DRIVERS = {'rooms': rooms_driver, 'pygame': pygame_driver, 'tk': tk_driver}
+
+
+# ============== SOAK ==============
+def soak(name, games, interval, frames, trace_games, seed=1):
+    """Play `games` games; tracemalloc only runs for the last `trace_games`.
+
+    Tracing every allocation slows the physics down by two orders of
+    magnitude, so growth is detected from RSS and object counts over the
+    whole run and tracemalloc only attributes it. Its baseline is taken
+    halfway into the traced games, so per-game allocations that are
+    freed again cancel out.
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    play = DRIVERS[name](frames)
+    samples = []
+    trace_from = max(0, games - trace_games)
+    baseline_at = games - (games - trace_from) // 2
+    # Snapshots wait on disk so they don't show up in the object counts
+    snapshots = tempfile.mkdtemp()
+    start = time.perf_counter()
+    for i in range(1, games + 1):
+        if i - 1 == trace_from:
+            tracemalloc.start(TRACE_FRAMES)
+        if i - 1 == baseline_at:
+            gc.collect()
+            tracemalloc.take_snapshot().dump(os.path.join(snapshots, 'baseline'))
+        play(rng)
+        # Samples would show up as growth in the traced games
+        if i % interval == 0 and i <= trace_from:
+            log_sample(name, samples, i)
+    gc.collect()
+    tracemalloc.take_snapshot().dump(os.path.join(snapshots, 'final'))
+    tracemalloc.stop()
+    log_sample(name, samples, games)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:>6} {games:,} games in {elapsed:.1f}s")
+    traced = (
+        tracemalloc.Snapshot.load(os.path.join(snapshots, 'baseline')),
+        tracemalloc.Snapshot.load(os.path.join(snapshots, 'final')),
+        games - baseline_at
+    )
+    shutil.rmtree(snapshots)
+    return samples, traced
+
+
+def log_sample(name, samples, games):
+    s = Sample(games)
+    samples.append(s)
+    print(f"  {name:>6} {games:>7,} games  rss {s.rss / 2**20:7.1f} MiB  "
+          f"objects {sum(s.objects.values()):>9,}")
+
+
+def _own_traces(snapshot):
+    return snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+def report(name, samples, traced, max_bytes, max_objects, top=10):
+    """Judge RSS and object growth over the second half of the run.
+
+    True if both are within limits; otherwise prints the growing types and
+    the allocation sites tracemalloc saw growing.
+    """
+    first, last = samples[len(samples) // 2], samples[-1]
+    games = last.games - first.games
+    before, after, traced_games = traced
+    stats = _own_traces(after).compare_to(_own_traces(before), 'traceback')
+    traced_growth = sum(stat.size_diff for stat in stats) / traced_games
+    if games <= 0:
+        rss = objects = 0.0
+        growth = {}
+    else:
+        rss = (last.rss - first.rss) / games
+        growth = {t: last.objects[t] - first.objects[t] for t in last.objects}
+        objects = sum(max(0, g) for g in growth.values()) / games
+    ok = rss <= max_bytes and objects <= max_objects
+    print(f"  {name}: rss {rss:+.1f} B/game, objects {objects:+.4f}/game over the last {games:,} games; "
+          f"traced {traced_growth:+.1f} B/game over the last {traced_games:,} -> {'OK' if ok else 'FAIL'}")
+    if not ok:
+        print("  Growing types:")
+        for t, g in sorted(growth.items(), key=lambda kv: -kv[1])[:top]:
+            if g > 0:
+                print(f"    {t:<30} {g:+,} ({g / games:+.4f}/game)")
+        print("  Allocation sites:")
+        for stat in stats[:top]:
+            if stat.size_diff <= 0:
+                continue
+            print(f"    {stat.size_diff / traced_games:+.1f} B/game, {stat.count_diff:+,} blocks")
+            for line in stat.traceback.format(limit=TRACE_FRAMES, most_recent_first=True):
+                print(f"      {line}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test for memory growth per game")
+    parser.add_argument('--games', type=int, default=20_000)
+    parser.add_argument('--interval', type=int, default=2_000)
+    parser.add_argument('--frames', type=int, default=200,
+                        help="Animation frames simulated after each game (death, rope snap, blood)")
+    parser.add_argument('--trace-games', type=int, default=100,
+                        help="Games at the end of the run played under tracemalloc")
+    parser.add_argument('--frontend', choices=[*DRIVERS, 'all'], default='all')
+    parser.add_argument('--max-bytes-per-game', type=float, default=256.0,
+                        help="RSS growth limit; RSS moves in whole pages, so keep runs long")
+    parser.add_argument('--max-objects-per-game', type=float, default=0.05)
+    args = parser.parse_args()
+
+    names = list(DRIVERS) if args.frontend == 'all' else [args.frontend]
+    failed = False
+    for name in names:
+        if name == 'tk' and not os.environ.get('DISPLAY') and sys.platform.startswith('linux'):
+            print("  tk: skipped, no $DISPLAY (run under xvfb-run)")
+            continue
+        samples, traced = soak(name, args.games, args.interval, args.frames, args.trace_games)
+        if not report(name, samples, traced, args.max_bytes_per_game, args.max_objects_per_game):
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
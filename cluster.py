@@ -0,0 +1,370 @@
+# Multi-node relay cluster with consistent-hash room placement
+#
+# Each relay node is its own process serving wire.py frames over TCP. Rooms
+# are placed on nodes with a consistent-hash ring, so adding or removing a
+# node only moves the rooms whose ring segment changed hands. A node that
+# receives a frame for a room it does not own answers with REDIRECT; clients
+# cache the owner per room and follow the redirect. The relay only stores
+# and forwards frames - it never sees a plaintext word.
+
+import asyncio
+import bisect
+import hashlib
+import multiprocessing as mp
+import socket
+import time
+
+import wire
+
+# ============== CONFIGURATION ==============
+VNODES = 64        # Points per node on the hash ring
+MAX_REDIRECTS = 4
+HOST = '127.0.0.1'
+
+
+# ============== HASH RING ==============
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'little')
+
+
+class HashRing:
+    def __init__(self, nodes=(), vnodes=VNODES):
+        self.vnodes = vnodes
+        self.nodes = set()
+        self._keys = []
+        self._owners = []
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.vnodes):
+            key = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._keys, key)
+            self._keys.insert(index, key)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node):
+        self.nodes.discard(node)
+        keep = [(k, n) for k, n in zip(self._keys, self._owners) if n != node]
+        self._keys = [k for k, _ in keep]
+        self._owners = [n for _, n in keep]
+
+    def node_for(self, room_id):
+        if not self._keys:
+            raise LookupError("Hash ring is empty")
+        index = bisect.bisect(self._keys, _hash(f"room:{room_id}")) % len(self._keys)
+        return self._owners[index]
+
+
+# ============== RELAY NODE ==============
+class RelayNode:
+    def __init__(self, address, members):
+        self.address = address
+        self.ring = HashRing(members)
+        self.rooms = {}        # room_id -> raw frames since the last word set
+        self.subscribers = {}  # room_id -> set of StreamWriters
+
+    async def serve(self):
+        host, port = self.address.rsplit(':', 1)
+        server = await asyncio.start_server(self._handle, host, int(port))
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        frames = wire.FrameReader()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for frame, raw in frames.feed(data, raw=True):
+                    await self._dispatch(frame, raw, writer)
+        except (ConnectionError, wire.WireError):
+            pass
+        finally:
+            for subs in self.subscribers.values():
+                subs.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, frame, raw, writer):
+        room_id = frame.room_id
+        if frame.type == wire.RING_UPDATE:
+            members, rebalance = frame.fields
+            self.ring = HashRing(members)
+            if rebalance:
+                await self._rebalance()
+            writer.write(wire.encode_ack(0))
+        elif frame.type == wire.MIGRATE:
+            # Anything that arrived here before the handover goes after it
+            migrated = [raw for _, raw in wire.FrameReader().feed(frame.fields[0], raw=True)]
+            self.rooms[room_id] = migrated + self.rooms.get(room_id, [])
+            writer.write(wire.encode_ack(room_id))
+        elif self.ring.node_for(room_id) != self.address:
+            writer.write(wire.encode_redirect(room_id, self.ring.node_for(room_id)))
+        elif frame.type == wire.JOIN:
+            self.subscribers.setdefault(room_id, set()).add(writer)
+            writer.write(wire.encode_ack(room_id))
+            # Late joiners catch up from the room's log
+            for logged in self.rooms.get(room_id, ()):
+                writer.write(logged)
+        else:
+            if frame.type == wire.WORD_SET:
+                self.rooms[room_id] = []  # New game
+            self.rooms.setdefault(room_id, []).append(raw)
+            writer.write(wire.encode_ack(room_id))
+            for sub in self.subscribers.get(room_id, ()):
+                if sub is not writer:
+                    sub.write(raw)
+        await writer.drain()
+
+    async def _rebalance(self):
+        """Hand every room this node no longer owns to its new owner."""
+        moves = {}
+        for room_id in self.rooms:
+            owner = self.ring.node_for(room_id)
+            if owner != self.address:
+                moves.setdefault(owner, []).append(room_id)
+        for owner, room_ids in moves.items():
+            host, port = owner.rsplit(':', 1)
+            reader, writer = await asyncio.open_connection(host, int(port))
+            acks = wire.FrameReader()
+            for room_id in room_ids:
+                writer.write(wire.encode_migrate(room_id, self.rooms[room_id]))
+            await writer.drain()
+            pending = len(room_ids)
+            while pending:
+                data = await reader.read(65536)
+                if not data:
+                    raise ConnectionError(f"{owner} closed during migration")
+                pending -= sum(1 for f in acks.feed(data) if f.type == wire.ACK)
+            writer.close()
+            for room_id in room_ids:
+                del self.rooms[room_id]
+                # Point subscribers at the new owner
+                for sub in self.subscribers.pop(room_id, ()):
+                    sub.write(wire.encode_redirect(room_id, owner))
+
+
+def node_main(address, members):
+    try:
+        asyncio.run(RelayNode(address, members).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+# ============== CLIENT ==============
+class RelayClient:
+    """Blocking client that follows redirects and caches room owners."""
+
+    def __init__(self, seeds):
+        self.seeds = list(seeds)
+        self.routes = {}       # room_id -> address
+        self.connections = {}  # address -> (socket, FrameReader)
+        self.inbox = []        # Frames pushed by the relay (broadcasts)
+        self.redirects = 0
+
+    def _connection(self, address):
+        conn = self.connections.get(address)
+        if conn is None:
+            host, port = address.rsplit(':', 1)
+            sock = socket.create_connection((host, int(port)))
+            conn = self.connections[address] = (sock, wire.FrameReader())
+        return conn
+
+    def request(self, room_id, frame_bytes):
+        """Send a frame to the room's owner; returns the node that accepted it.
+
+        A node that cannot be reached is forgotten, and the request starts
+        over from a seed that has not failed yet.
+        """
+        address = self.routes.get(room_id, self.seeds[0])
+        failed = set()
+        redirects = 0
+        while True:
+            try:
+                sock, frames = self._connection(address)
+                sock.sendall(frame_bytes)
+                reply = self._await_reply(sock, frames, room_id)
+            except OSError:
+                failed.add(address)
+                self._forget(address)
+                address = next((s for s in self.seeds if s not in failed), None)
+                if address is None:
+                    raise ConnectionError(f"No relay node reachable for room {room_id}") from None
+                continue
+            if reply.type == wire.ACK:
+                self.routes[room_id] = address
+                return address
+            self.redirects += 1
+            redirects += 1
+            if redirects > MAX_REDIRECTS:
+                raise ConnectionError(f"Too many redirects for room {room_id}")
+            address = reply.fields[0]
+
+    def _forget(self, address):
+        """Drop the connection to a node and every route through it."""
+        conn = self.connections.pop(address, None)
+        if conn is not None:
+            conn[0].close()
+        for room_id in [r for r, a in self.routes.items() if a == address]:
+            del self.routes[room_id]
+
+    def _await_reply(self, sock, frames, room_id):
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                raise ConnectionError("Relay closed the connection")
+            reply = None
+            for frame in frames.feed(data):
+                if reply is None and frame.room_id == room_id and frame.type in (wire.ACK, wire.REDIRECT):
+                    reply = frame
+                else:
+                    self.inbox.append(frame)
+            if reply is not None:
+                return reply
+
+    def join(self, room_id):
+        return self.request(room_id, wire.encode_join(room_id))
+
+    def close(self):
+        for sock, _ in self.connections.values():
+            sock.close()
+        self.connections.clear()
+
+
+# ============== LOCAL CLUSTER ==============
+def _free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def _control(address, frame_bytes):
+    host, port = address.rsplit(':', 1)
+    with socket.create_connection((host, int(port))) as sock:
+        sock.sendall(frame_bytes)
+        frames = wire.FrameReader()
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                raise ConnectionError(f"{address} closed the control connection")
+            if any(f.type == wire.ACK for f in frames.feed(data)):
+                return
+
+
+def _wait_listening(address, timeout=10):
+    host, port = address.rsplit(':', 1)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, int(port)), timeout=0.5).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+class LocalCluster:
+    """Runs relay nodes as processes on this host and manages membership."""
+
+    def __init__(self):
+        self.ctx = mp.get_context('spawn')
+        self.processes = {}  # address -> Process
+
+    @property
+    def members(self):
+        return sorted(self.processes)
+
+    def _spawn(self, members):
+        address = f"{HOST}:{_free_port()}"
+        proc = self.ctx.Process(target=node_main, args=(address, members + [address]), daemon=True)
+        proc.start()
+        self.processes[address] = proc
+        _wait_listening(address)
+        return address
+
+    def _update_ring(self, members, nodes):
+        # Two phases so no node migrates a room to an owner that does not
+        # know it owns it yet
+        for node in nodes:
+            _control(node, wire.encode_ring_update(members, rebalance=False))
+        for node in nodes:
+            _control(node, wire.encode_ring_update(members, rebalance=True))
+
+    def start(self, count):
+        for _ in range(count):
+            self._spawn([])
+        self._update_ring(self.members, self.members)
+        return self.members
+
+    def add_node(self):
+        address = self._spawn(self.members)
+        self._update_ring(self.members, self.members)
+        return address
+
+    def remove_node(self, address):
+        remaining = [m for m in self.members if m != address]
+        # The leaving node is told too, so it hands all its rooms over
+        self._update_ring(remaining, remaining + [address])
+        proc = self.processes.pop(address)
+        proc.terminate()
+        proc.join()
+
+    def stop(self):
+        for proc in self.processes.values():
+            proc.terminate()
+        for proc in self.processes.values():
+            proc.join()
+        self.processes.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    rooms = range(1, 301)
+    with LocalCluster() as cluster:
+        cluster.start(3)
+        client = RelayClient(cluster.members)
+        for room_id in rooms:
+            client.request(room_id, wire.encode_word_set(room_id, b'\x80' * 73, b'\0' * 16))
+            client.request(room_id, wire.encode_guess(room_id, 'A'))
+        before = dict(client.routes)
+        print(f"3 nodes: {len(rooms)} rooms placed, {client.redirects} redirects")
+
+        added = cluster.add_node()
+        client.redirects = 0
+        for room_id in rooms:
+            client.request(room_id, wire.encode_guess(room_id, 'B'))
+        moved = sum(1 for r in rooms if client.routes[r] != before[r])
+        print(f"Added {added}: {moved} rooms moved ({moved / len(rooms):.0%}), {client.redirects} redirects")
+
+        removed = cluster.members[0]
+        before = dict(client.routes)
+        cluster.remove_node(removed)
+        client.redirects = 0
+        for room_id in rooms:
+            client.request(room_id, wire.encode_guess(room_id, 'C'))
+        moved = sum(1 for r in rooms if client.routes[r] != before[r])
+        print(f"Removed {removed}: {moved} rooms moved, {client.redirects} redirects")
+
+        # A late spectator still sees each room's full log after two moves
+        spectator = RelayClient(cluster.members)
+        spectator.join(42)
+        time.sleep(0.2)
+        sock, frames = spectator.connections[spectator.routes[42]]
+        sock.settimeout(0.5)
+        try:
+            spectator.inbox.extend(frames.feed(sock.recv(65536)))
+        except socket.timeout:
+            pass
+        print(f"Room 42 log: {[(f.type, f.fields[0] if f.type == wire.GUESS else '') for f in spectator.inbox]}")
+        spectator.close()
+        client.close()
@@ -0,0 +1,230 @@
+# Collision subsystem (no rendering, safe to run headless)
+#
+# Static line-segment colliders (the gallows) and dynamic circle colliders
+# (ragdoll joints, blood particles), with a uniform-grid spatial hash as
+# the broadphase. Segments are binned once into every cell a circle in
+# that cell could reach, so a circle only ever looks at its own cell.
+# Circles are re-binned by centre each frame and only test the 3x3 block
+# around them, so cost grows with the number of bodies, not its square.
+#
+# Resolution is positional. A ragdoll added to a CollisionWorld pushes its
+# joints out of the scene after every solver substep, so contacts settle
+# together with the sticks and joint limits. Once per frame, step() pushes
+# overlapping joints of different ragdolls apart and stops blood on
+# whatever it hits.
+
+import math
+
+from physics import FLOOR_Y, HEAD
+
+# ============== CONFIGURATION ==============
+CELL = 40  # Grid cell size; at least twice the largest circle radius
+HEAD_RADIUS = 18  # Matches the drawn head
+JOINT_RADIUS = 4
+FRICTION = 0.5  # Share of tangential motion kept on contact
+
+# Gallows in logical units: (x1, y1, x2, y2, thickness), as draw_game draws it
+GALLOWS = (
+    (40, 620, 320, 620, 8),  # Base
+    (80, 620, 80, 80, 6),    # Pole
+    (80, 80, 250, 80, 6),    # Top beam
+    (80, 140, 140, 80, 4),   # Support
+)
+
+
+# ============== COLLIDERS ==============
+class Segment:
+    """Static capsule: a line segment with half its drawn thickness as radius."""
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'radius', 'dx', 'dy', 'length_sq')
+
+    def __init__(self, x1, y1, x2, y2, thickness=0):
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+        self.radius = thickness / 2
+        self.dx, self.dy = x2 - x1, y2 - y1
+        self.length_sq = self.dx * self.dx + self.dy * self.dy
+
+    def closest(self, x, y):
+        """Closest point on the segment to (x, y)."""
+        if self.length_sq == 0:
+            return self.x1, self.y1
+        t = ((x - self.x1) * self.dx + (y - self.y1) * self.dy) / self.length_sq
+        t = 0.0 if t < 0 else 1.0 if t > 1 else t
+        return self.x1 + t * self.dx, self.y1 + t * self.dy
+
+
+def push_out(x, y, r, segment):
+    """(nx, ny, depth) to move a circle out of a segment, or None."""
+    cx, cy = segment.closest(x, y)
+    dx, dy = x - cx, y - cy
+    reach = r + segment.radius
+    dist_sq = dx * dx + dy * dy
+    if dist_sq >= reach * reach:
+        return None
+    dist = math.sqrt(dist_sq)
+    if dist == 0:
+        # Centre on the segment's axis: push along the segment normal
+        length = math.sqrt(segment.length_sq) or 1.0
+        return -segment.dy / length, segment.dx / length, reach
+    return dx / dist, dy / dist, reach - dist
+
+
+# ============== BROADPHASE ==============
+class SpatialHash:
+    """Uniform grid keyed by (column, row); only occupied cells are kept."""
+
+    def __init__(self, cell=CELL):
+        self.cell = cell
+        self.cells = {}
+
+    def key(self, x, y):
+        return (int(x // self.cell), int(y // self.cell))
+
+    def insert(self, key, item):
+        bucket = self.cells.get(key)
+        if bucket is None:
+            bucket = self.cells[key] = []
+        bucket.append(item)
+
+    def insert_box(self, x1, y1, x2, y2, item):
+        """Add item to every cell the box overlaps."""
+        c1, r1 = self.key(x1, y1)
+        c2, r2 = self.key(x2, y2)
+        for col in range(c1, c2 + 1):
+            for row in range(r1, r2 + 1):
+                self.insert((col, row), item)
+
+    def get(self, key):
+        return self.cells.get(key, ())
+
+    def clear(self):
+        # Drop the buckets too: keeping every cell a body ever visited would
+        # make a frame's pass over the cells grow with the ground covered
+        self.cells.clear()
+
+
+# ============== WORLD ==============
+class CollisionWorld:
+    """Ragdolls and their blood against the gallows, the floor and each other.
+
+    Call step() once per frame after the ragdolls have updated.
+    """
+
+    def __init__(self, segments=GALLOWS, floor_y=FLOOR_Y, cell=CELL):
+        self.floor_y = floor_y
+        self.ragdolls = []
+        self.static = SpatialHash(cell)
+        self.dynamic = SpatialHash(cell)
+        self.segments = [Segment(*s) for s in segments]
+        # Bin each segment into every cell from which a circle could touch it
+        reach = cell / 2
+        for seg in self.segments:
+            pad = seg.radius + reach
+            self.static.insert_box(min(seg.x1, seg.x2) - pad, min(seg.y1, seg.y2) - pad,
+                                   max(seg.x1, seg.x2) + pad, max(seg.y1, seg.y2) + pad, seg)
+
+    def add(self, ragdoll):
+        """Joints collide with the scene inside the ragdoll's own solver."""
+        self.ragdolls.append(ragdoll)
+        ragdoll.collider = self
+
+    def remove(self, ragdoll):
+        self.ragdolls.remove(ragdoll)
+        ragdoll.collider = None
+
+    def collide(self, ragdoll):
+        """Push one ragdoll's joints out of the gallows and the floor.
+
+        Called by Ragdoll.update after every solver substep, so contacts
+        and constraints settle together.
+        """
+        hits = 0
+        for i, p in enumerate(ragdoll.points):
+            if not p.locked:
+                hits += self._static_point(p, HEAD_RADIUS if i == HEAD else JOINT_RADIUS)
+        return hits
+
+    def step(self):
+        """Once per frame: blood against the scene, ragdolls against each other."""
+        contacts = 0
+        dynamic = self.dynamic
+        dynamic.clear()
+        for body, ragdoll in enumerate(self.ragdolls):
+            for i, p in enumerate(ragdoll.points):
+                if not p.locked:
+                    dynamic.insert(dynamic.key(p.x, p.y), (p, HEAD_RADIUS if i == HEAD else JOINT_RADIUS, body))
+            for b in ragdoll.blood_particles:
+                contacts += self._static_particle(b)
+        return contacts + self._bodies()
+
+    def _static_point(self, p, r):
+        hits = 0
+        for seg in self.static.get(self.static.key(p.x, p.y)):
+            hit = push_out(p.x, p.y, r, seg)
+            if hit is not None:
+                self._resolve_point(p, *hit)
+                hits += 1
+        if p.y + r > self.floor_y:
+            self._resolve_point(p, 0.0, -1.0, p.y + r - self.floor_y)
+            hits += 1
+        return hits
+
+    def _resolve_point(self, p, nx, ny, depth):
+        p.x += nx * depth
+        p.y += ny * depth
+        # Verlet velocity is x - old_x: damp its tangential part for friction
+        vx, vy = p.x - p.old_x, p.y - p.old_y
+        vn = vx * nx + vy * ny
+        tx, ty = vx - vn * nx, vy - vn * ny
+        p.old_x += tx * (1 - FRICTION)
+        p.old_y += ty * (1 - FRICTION)
+
+    def _static_particle(self, b):
+        hits = 0
+        r = b.size
+        for seg in self.static.get(self.static.key(b.x, b.y)):
+            hit = push_out(b.x, b.y, r, seg)
+            if hit is not None:
+                self._splat(b, *hit)
+                hits += 1
+        if b.y > self.floor_y:  # Particles sit on the floor by their centre
+            self._splat(b, 0.0, -1.0, b.y - self.floor_y)
+            hits += 1
+        return hits
+
+    def _splat(self, b, nx, ny, depth):
+        """Blood sticks: lose the normal velocity, slide a little."""
+        b.x += nx * depth
+        b.y += ny * depth
+        vn = b.vx * nx + b.vy * ny
+        if vn < 0:
+            b.vx = (b.vx - vn * nx) * FRICTION
+            b.vy = (b.vy - vn * ny) * FRICTION
+
+    def _bodies(self):
+        """Joints of different ragdolls push each other apart equally."""
+        hits = 0
+        cells = self.dynamic.cells
+        for (col, row), bucket in cells.items():
+            # Own cell, then the half of the neighbours ahead of it, so each
+            # pair of cells is visited once
+            for dc, dr in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+                other = bucket if dc == dr == 0 else cells.get((col + dc, row + dr))
+                if not other:
+                    continue
+                for i, (p, r, body) in enumerate(bucket):
+                    for q, s, other_body in (other[i + 1:] if other is bucket else other):
+                        if body == other_body:
+                            continue  # Own joints are kept apart by the sticks
+                        dx, dy = q.x - p.x, q.y - p.y
+                        reach = r + s
+                        dist_sq = dx * dx + dy * dy
+                        if dist_sq >= reach * reach or dist_sq == 0:
+                            continue
+                        dist = math.sqrt(dist_sq)
+                        shift = (reach - dist) / dist * 0.5
+                        p.x -= dx * shift
+                        p.y -= dy * shift
+                        q.x += dx * shift
+                        q.y += dy * shift
+                        hits += 1
+        return hits
@@ -0,0 +1,309 @@
+# Crypto utilities shared by both front ends and the room host
+#
+# CryptoManager encrypts through a pluggable backend. The default, Fernet,
+# produces base64 text tokens (AES-128-CBC then HMAC-SHA256) and is paired
+# with a separate MD5 of the plaintext. The AEAD backends (AES-GCM,
+# ChaCha20-Poly1305) encrypt and authenticate in one pass and produce raw
+# bytes: version (u8) | timestamp (u64) | sequence (u32) | nonce | sealed.
+# The header and the session's room ID are the associated data, so a token
+# only opens in the room it was sent to, and its sequence number cannot be
+# altered. Keys name their backend, so a key restored from the journal
+# picks the right one.
+
+import hashlib
+import base64
+import math
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    print("Installing cryptography package...")
+    import subprocess
+    import sys
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "cryptography", "-q"])
+    from cryptography.fernet import Fernet, InvalidToken
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+# ============== CONFIGURATION ==============
+TOKEN_TTL = 600             # Seconds a token stays valid (Fernet TTL)
+REPLAY_CAPACITY = 100_000   # Tokens per Bloom filter generation
+REPLAY_ERROR_RATE = 1e-4    # False positive rate of each generation
+REPLAY_RECENT = 4096        # Most recent tokens remembered exactly
+CRYPTO_BACKEND = 'fernet'   # Backend for new sessions: fernet, aesgcm, chacha20poly1305
+CLOCK_SKEW = 60             # Seconds a token's timestamp may run ahead (as Fernet allows)
+
+
+# ============== BACKENDS ==============
+class FernetBackend:
+    """Base64 Fernet tokens; integrity of the plaintext is the MD5's job."""
+    name = 'fernet'
+    label = 'AES-128'  # What the UI reports
+    integrity = 'MD5'
+    separate_digest = True  # An MD5 of the plaintext travels with the token
+
+    def __init__(self, key=None, room_id=0):
+        if key is None:
+            key = Fernet.generate_key()
+        else:
+            key = self._ensure_valid_key(key)
+        self.key = key
+        self._fernet = Fernet(key)
+
+    @staticmethod
+    def _ensure_valid_key(key):
+        try:
+            Fernet(key)
+            return key
+        except:
+            hash_bytes = hashlib.sha256(key).digest()
+            return base64.urlsafe_b64encode(hash_bytes)
+
+    def encrypt(self, data):
+        return self._fernet.encrypt(data)
+
+    def decrypt(self, token, ttl=None):
+        return self._fernet.decrypt(token, ttl=ttl)
+
+    def sequence(self, token):
+        return None
+
+
+class AEADBackend:
+    """One-pass authenticated encryption with raw-bytes tokens.
+
+    The cipher object is built once per session. Nonces are random rather
+    than derived from the sequence number, because a session restored from
+    the journal starts counting again under the same key.
+    """
+    name = ''
+    label = ''
+    integrity = ''
+    algorithm = None
+    version = 0
+    separate_digest = False  # The tag already authenticates the plaintext
+    HEADER = struct.Struct('>BQI')  # version, timestamp, sequence
+    ROOM = struct.Struct('<I')      # As the wire carries it
+    NONCE_SIZE = 12
+    TAG_SIZE = 16
+    KEY_SIZE = 32  # AES-256 or ChaCha20
+
+    def __init__(self, key=None, room_id=0):
+        prefix = self.name.encode('ascii') + b':'
+        if key is None:
+            secret = os.urandom(self.KEY_SIZE)
+        elif key.startswith(prefix):
+            secret = base64.urlsafe_b64decode(key[len(prefix):])
+        else:
+            secret = hashlib.sha256(key).digest()
+        self.key = prefix + base64.urlsafe_b64encode(secret)
+        self._aead = self.algorithm(secret)
+        self._room = self.ROOM.pack(room_id)
+        self.sent = 0
+
+    def encrypt(self, data):
+        self.sent += 1
+        header = self.HEADER.pack(self.version, int(time.time()), self.sent)
+        nonce = os.urandom(self.NONCE_SIZE)
+        return header + nonce + self._aead.encrypt(nonce, data, header + self._room)
+
+    def decrypt(self, token, ttl=None):
+        # Same contract as Fernet: InvalidToken for anything that does not open
+        start = self.HEADER.size + self.NONCE_SIZE
+        if len(token) < start + self.TAG_SIZE or token[0] != self.version:
+            raise InvalidToken
+        token = bytes(token)
+        header = token[:self.HEADER.size]
+        try:
+            data = self._aead.decrypt(token[self.HEADER.size:start], token[start:], header + self._room)
+        except InvalidTag:
+            raise InvalidToken
+        timestamp = self.HEADER.unpack(header)[1]
+        now = int(time.time())
+        if timestamp > now + CLOCK_SKEW or (ttl is not None and timestamp + ttl < now):
+            raise InvalidToken
+        return data
+
+    def sequence(self, token):
+        """Sequence number of a token that has already been decrypted."""
+        return self.HEADER.unpack_from(token)[2]
+
+
+class AESGCMBackend(AEADBackend):
+    name = 'aesgcm'
+    label = 'AES-256-GCM'
+    integrity = 'GCM tag'
+    algorithm = AESGCM
+    version = 1
+
+
+class ChaCha20Poly1305Backend(AEADBackend):
+    name = 'chacha20poly1305'
+    label = 'ChaCha20-Poly1305'
+    integrity = 'Poly1305 tag'
+    algorithm = ChaCha20Poly1305
+    version = 2
+
+
+BACKENDS = {backend.name: backend for backend in (FernetBackend, AESGCMBackend, ChaCha20Poly1305Backend)}
+
+
+def key_backend(key):
+    """Name of the backend a key belongs to; other keys are Fernet keys."""
+    name = key.partition(b':')[0].decode('ascii', 'replace')
+    return name if name in BACKENDS else FernetBackend.name
+
+
+# ============== CRYPTO UTILITIES ==============
+class CryptoManager:
+    def __init__(self, key=None, ttl=None, replay_guard=None, backend=None, room_id=0):
+        if backend is None:
+            backend = CRYPTO_BACKEND if key is None else key_backend(key)
+        self.cipher = BACKENDS[backend](key, room_id)
+        self.key = self.cipher.key
+        self.ttl = ttl
+        self.replay_guard = replay_guard
+        self.separate_digest = self.cipher.separate_digest
+        self.received = 0  # Highest sequence number accepted (AEAD backends)
+    
+    def encrypt(self, plaintext):
+        return self.cipher.encrypt(plaintext.encode('utf-8'))
+    
+    def decrypt(self, ciphertext):
+        # Authenticate (and check the TTL) before the token touches the guard,
+        # so forged tokens cannot fill it up
+        plaintext = self.cipher.decrypt(ciphertext, ttl=self.ttl)
+        # Every check passes before any state changes
+        sequence = self.cipher.sequence(ciphertext)
+        if sequence is not None and sequence <= self.received:
+            raise ReplayError("Token is not newer than one already received")
+        if self.replay_guard is not None and not self.replay_guard.check(ciphertext):
+            raise ReplayError("Token was already received")
+        if sequence is not None:
+            self.received = sequence
+        return plaintext.decode('utf-8')
+    
+    @staticmethod
+    def generate_md5(text):
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+    
+    def digest(self, text):
+        """Hash sent next to the token: hex MD5, or '' when the backend's tag covers it."""
+        return self.generate_md5(text) if self.separate_digest else ''
+    
+    def verify_integrity(self, text, expected_hash):
+        if not self.separate_digest:
+            return True  # decrypt() has already authenticated the plaintext
+        return self.generate_md5(text) == expected_hash
+    
+    def get_key(self):
+        return self.key
+
+
+# ============== REPLAY PROTECTION ==============
+class ReplayError(InvalidToken):
+    """A token that was already accepted was presented again."""
+
+
+class ReplayGuardFull(InvalidToken):
+    """More tokens arrived within one window than the guard was sized for."""
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, digest):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+    
+    def add(self, digest):
+        bits = self.bits
+        for pos in self._positions(digest):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, digest):
+        bits = self.bits
+        for pos in self._positions(digest):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+    
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+
+class ReplayGuard:
+    """Remembers accepted tokens for a time window at constant memory.
+
+    The most recent tokens are kept exactly; older ones live in two rotating
+    Bloom filter generations that each span `window` seconds. Fernet's TTL
+    check rejects anything older than the window, so tokens only have to be
+    remembered until they expire.
+
+    `capacity` is the number of tokens expected per window. A generation is
+    only discarded once every token in it has expired, so when one fills up
+    early, new tokens are refused (ReplayGuardFull, counted in `refused`)
+    rather than forgetting ones that could still be replayed.
+
+    One guard may be shared by sessions on several threads; check() holds
+    a lock.
+    """
+    def __init__(self, window=TOKEN_TTL, capacity=REPLAY_CAPACITY,
+                 error_rate=REPLAY_ERROR_RATE, recent=REPLAY_RECENT):
+        self.window = window
+        self.recent_limit = recent
+        self.recent = OrderedDict()  # digest -> None, exact recent window
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = BloomFilter(capacity, error_rate)
+        self.rotated_at = time.monotonic()
+        self.refused = 0
+        self._lock = threading.Lock()
+    
+    def _rotate(self, now):
+        self.current, self.previous = self.previous, self.current
+        self.current.clear()
+        self.rotated_at = now
+    
+    def check(self, token):
+        """Record the token; False if it has been seen before.
+
+        Raises ReplayGuardFull if the current generation is at capacity.
+        """
+        digest = hashlib.sha256(token).digest()
+        with self._lock:
+            return self._check(digest)
+    
+    def _check(self, digest):
+        now = time.monotonic()
+        if now - self.rotated_at >= self.window:
+            self._rotate(now)
+        
+        if digest in self.recent:
+            return False
+        if digest in self.current or digest in self.previous:
+            return False
+        if self.current.count >= self.current.capacity:
+            self.refused += 1
+            raise ReplayGuardFull(f"Replay guard full: more than {self.current.capacity} tokens "
+                                  f"within {self.window} s")
+        
+        self.recent[digest] = None
+        if len(self.recent) > self.recent_limit:
+            self.recent.popitem(last=False)
+        self.current.add(digest)
+        return True
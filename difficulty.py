@@ -0,0 +1,213 @@
+# Word difficulty index
+#
+# An offline pass scores every word in a word list, vectorized over the
+# whole list, and stores the words sorted by score. Picking a random word
+# inside a difficulty band is then two binary searches and one slice, so
+# it stays O(log n) on multi-million-word lists.
+#
+# Usage: python difficulty.py build words.txt words.npz
+#        python difficulty.py pick words.npz 0.4 0.6
+#        python difficulty.py            (benchmark on a synthetic list)
+
+import random
+import sys
+import time
+
+import numpy as np
+
+# ============== CONFIGURATION ==============
+MAX_WRONG_GUESSES = 6
+ALPHABET = 26
+MIN_WORD = 2
+MAX_WORD = 20  # The word input box and room snapshots hold at most 20 letters
+
+# Raw score = weighted sum of the features below. The stored difficulty is
+# the raw score's percentile in the list, so bands hold predictable shares
+WEIGHTS = {
+    'wrong_guesses': 1.0,   # Misses before a frequency guesser solves it
+    'rarity': 0.5,          # Mean -log(frequency) of the word's letters
+    'unique_letters': 0.15, # More distinct letters, more to find
+    'length': -0.05,        # Long words give away more per correct guess
+}
+
+# Difficulty bands for callers that don't want to pick numbers
+EASY = (0.0, 0.33)
+MEDIUM = (0.33, 0.66)
+HARD = (0.66, 1.0)
+
+
+# ============== SCORING ==============
+def normalize(words, max_len=MAX_WORD):
+    """Upper-case, alphabetic, 2 to max_len letters, no duplicates."""
+    seen = set()
+    out = []
+    for w in words:
+        w = w.strip().upper()
+        if MIN_WORD <= len(w) <= max_len and w.isascii() and w.isalpha() and w not in seen:
+            seen.add(w)
+            out.append(w)
+    return out
+
+
+def letter_masks(blob, offsets):
+    """(n, 26) bool matrix: which letters each word contains."""
+    n = len(offsets) - 1
+    codes = np.frombuffer(blob, dtype=np.uint8) - ord('A')
+    rows = np.repeat(np.arange(n), np.diff(offsets))
+    present = np.zeros((n, ALPHABET), dtype=bool)
+    present[rows, codes] = True
+    return present
+
+
+def features(blob, offsets):
+    """Per-word feature arrays, computed over the whole list at once."""
+    present = letter_masks(blob, offsets)
+    lengths = np.diff(offsets).astype(np.float32)
+    unique = present.sum(axis=1)
+
+    # Share of words containing each letter; the guesser tries letters in
+    # that order, so a word costs every miss ranked above its rarest letter
+    frequency = present.mean(axis=0)
+    rank = np.empty(ALPHABET, dtype=np.int16)
+    rank[np.argsort(-frequency, kind='stable')] = np.arange(ALPHABET)
+    last_needed = np.where(present, rank, -1).max(axis=1)
+    wrong = np.minimum(last_needed + 1 - unique, MAX_WRONG_GUESSES)
+
+    information = -np.log(np.maximum(frequency, 1e-9))
+    rarity = (present * information).sum(axis=1) / unique
+
+    return {
+        'wrong_guesses': wrong.astype(np.float32),
+        'rarity': rarity.astype(np.float32),
+        'unique_letters': unique.astype(np.float32),
+        'length': lengths,
+    }
+
+
+def score(blob, offsets):
+    feats = features(blob, offsets)
+    return sum(weight * feats[name] for name, weight in WEIGHTS.items())
+
+
+def percentiles(sorted_raw):
+    """0..1 difficulty for already sorted raw scores; ties share a value."""
+    n = len(sorted_raw)
+    below = np.searchsorted(sorted_raw, sorted_raw, side='left')
+    upto = np.searchsorted(sorted_raw, sorted_raw, side='right')
+    return ((below + upto - 1) / (2 * max(n - 1, 1))).astype(np.float32)
+
+
+def pack(words):
+    """Words as one ASCII blob plus int64 offsets (no per-word objects)."""
+    blob = ''.join(words).encode('ascii')
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum([len(w) for w in words], out=offsets[1:])
+    return blob, offsets
+
+
+# ============== INDEX ==============
+class DifficultyIndex:
+    """Words sorted by difficulty (0 = easiest, 1 = hardest)."""
+
+    def __init__(self, scores, blob, offsets):
+        self.scores = scores
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, words, max_len=MAX_WORD):
+        """Index the playable words; longer ones are dropped, not truncated."""
+        blob, offsets = pack(normalize(words, max_len))
+        if len(offsets) < 2:
+            raise ValueError("Word list has no usable words")
+        raw = score(blob, offsets)
+        order = np.argsort(raw, kind='stable')
+
+        # Reorder the blob to match the sorted scores
+        lengths = np.diff(offsets)[order]
+        starts = offsets[:-1][order]
+        sorted_offsets = np.zeros_like(offsets)
+        np.cumsum(lengths, out=sorted_offsets[1:])
+        src = np.frombuffer(blob, dtype=np.uint8)
+        positions = np.repeat(starts - sorted_offsets[:-1], lengths) + np.arange(sorted_offsets[-1])
+        return cls(percentiles(raw[order]), src[positions].tobytes(), sorted_offsets)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['scores'], data['blob'].tobytes(), data['offsets'])
+
+    def save(self, path):
+        np.savez(path, scores=self.scores, offsets=self.offsets,
+                 blob=np.frombuffer(self.blob, dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.scores)
+
+    def word(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].decode('ascii')
+
+    def band(self, lo, hi):
+        """Index range [start, stop) of words with lo <= difficulty <= hi."""
+        # Bounds must match the array's dtype, or numpy converts the whole
+        # array for every search
+        start = int(np.searchsorted(self.scores, np.float32(lo), side='left'))
+        stop = int(np.searchsorted(self.scores, np.float32(hi), side='right'))
+        return start, stop
+
+    def pick(self, lo=0.0, hi=1.0, rng=random):
+        start, stop = self.band(lo, hi)
+        if start >= stop:
+            raise LookupError(f"No words with difficulty in [{lo}, {hi}]")
+        return self.word(rng.randrange(start, stop))
+
+    def difficulty(self, word):
+        """Score of a word in the index, or None (linear scan; for tools)."""
+        target = word.strip().upper().encode('ascii')
+        at = self.blob.find(target)
+        while at != -1:
+            i = int(np.searchsorted(self.offsets, at, side='right')) - 1
+            if self.offsets[i] == at and self.offsets[i + 1] == at + len(target):
+                return float(self.scores[i])
+            at = self.blob.find(target, at + 1)
+        return None
+
+
+def _synthetic_words(n, seed=1):
+    """English-ish random words: letters drawn by English frequency."""
+    letters = np.frombuffer(b"ETAOINSHRDLCUMWFGYPBVKJXQZ", dtype=np.uint8)
+    weights = np.array([12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8, 2.8,
+                        2.4, 2.4, 2.2, 2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.15, 0.15, 0.1, 0.07])
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 13, size=n)
+    chars = rng.choice(letters, size=int(lengths.sum()), p=weights / weights.sum())
+    blob = chars.tobytes().decode('ascii')
+    ends = np.cumsum(lengths)
+    return [blob[e - l:e] for e, l in zip(ends.tolist(), lengths.tolist())]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == 'build':
+        with open(sys.argv[2], encoding='utf-8', errors='ignore') as f:
+            index = DifficultyIndex.build(f)
+        index.save(sys.argv[3])
+        print(f"Indexed {len(index):,} words -> {sys.argv[3]}")
+    elif len(sys.argv) == 5 and sys.argv[1] == 'pick':
+        print(DifficultyIndex.load(sys.argv[2]).pick(float(sys.argv[3]), float(sys.argv[4])))
+    else:
+        n = 2_000_000
+        words = _synthetic_words(n)
+        start = time.perf_counter()
+        index = DifficultyIndex.build(words)
+        built = time.perf_counter() - start
+        print(f"Scored and sorted {len(index):,} words in {built:.2f}s")
+
+        picks = 100_000
+        start = time.perf_counter()
+        for _ in range(picks):
+            index.pick(*MEDIUM)
+        elapsed = time.perf_counter() - start
+        print(f"pick(MEDIUM): {elapsed / picks * 1e6:.2f} us each")
+        for name, band in (('easy', EASY), ('medium', MEDIUM), ('hard', HARD)):
+            start, stop = index.band(*band)
+            print(f"  {name:<6} {stop - start:>9,} words, e.g. {index.pick(*band)}")
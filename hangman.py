@@ -3,20 +3,17 @@
 
 import tkinter as tk
 from tkinter import messagebox
-import threading
-import hashlib
-import base64
+import queue
 import random
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-try:
-    from cryptography.fernet import Fernet
-except ImportError:
-    print("Installing cryptography package...")
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "cryptography", "-q"])
-    from cryptography.fernet import Fernet
+from crypto_utils import CryptoManager, ReplayGuard, TOKEN_TTL
+from adversary import AttackContext, Message, random_attack
+from results import ResultsStore
+from telemetry import Telemetry
+from physics import Ragdoll, L_HAND, R_HAND, L_FOOT, R_FOOT
 
 # ============== CONFIGURATION ==============
 COLORS = {
@@ -35,51 +32,126 @@ COLORS = {
 
 MAX_WRONG_GUESSES = 6
 ATTACK_PROBABILITY = 0.2  # 20% chance of simulated attack
+CRYPTO_WORKERS = 2
+RESULT_POLL_MS = 30  # How often the Tk loop picks up finished crypto jobs
+TRANSMIT_DELAY_MS = 500  # Simulated network delay before the attack check
+VERIFY_DELAY_MS = 800
+START_DELAY_MS = 500
 
-# ============== CRYPTO UTILITIES ==============
-class CryptoManager:
-    def __init__(self, key=None):
-        if key is None:
-            self.key = Fernet.generate_key()
-        else:
-            self.key = self._ensure_valid_key(key)
-        self.cipher = Fernet(self.key)
-    
-    def _ensure_valid_key(self, key):
-        try:
-            Fernet(key)
-            return key
-        except:
-            hash_bytes = hashlib.sha256(key).digest()
-            return base64.urlsafe_b64encode(hash_bytes)
-    
-    def encrypt(self, plaintext):
-        return self.cipher.encrypt(plaintext.encode('utf-8'))
+# ============== VIEW MODEL ==============
+# Applies a flat list of (widget, options) pairs inside Tcl, so a whole
+# batch of widget updates costs one round trip from Python.
+_APPLY_PROC = '''
+proc hangman_apply {changes} {
+    foreach {path options} $changes {
+        $path configure {*}$options
+    }
+}
+'''
+
+
+class ViewModel:
+    """Tracks widget options and only sends the ones that changed.
+
+    Changes made while handling an event are queued and flushed together
+    from an idle callback, in a single Tcl call.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.applied = {}  # widget path -> {option: value}
+        self.pending = {}  # widget path -> {option: value}
+        self._flush_scheduled = False
+        root.tk.eval(_APPLY_PROC)
     
-    def decrypt(self, ciphertext):
-        return self.cipher.decrypt(ciphertext).decode('utf-8')
+    def track(self, widget, *options):
+        """Seed the cache with the widget's current option values."""
+        state = self.applied.setdefault(str(widget), {})
+        for option in options:
+            state[option] = str(widget.cget(option))
     
-    @staticmethod
-    def generate_md5(text):
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
+    def set(self, widget, **options):
+        path = str(widget)
+        applied = self.applied.setdefault(path, {})
+        pending = self.pending.get(path)
+        for option, value in options.items():
+            value = str(value)
+            if pending is not None and option in pending:
+                pending[option] = value
+            elif applied.get(option) != value:
+                if pending is None:
+                    pending = self.pending[path] = {}
+                pending[option] = value
+        if self.pending and not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after_idle(self.flush)
     
-    @staticmethod
-    def verify_integrity(text, expected_hash):
-        return CryptoManager.generate_md5(text) == expected_hash
-    
-    def get_key(self):
-        return self.key
+    def flush(self):
+        self._flush_scheduled = False
+        changes = []
+        for path, options in self.pending.items():
+            applied = self.applied[path]
+            args = []
+            for option, value in options.items():
+                if applied.get(option) != value:
+                    applied[option] = value
+                    args.extend(('-' + option, value))
+            if args:
+                changes.extend((path, tuple(args)))
+        self.pending = {}
+        if changes:
+            self.root.tk.call('hangman_apply', tuple(changes))
 
 
 # ============== HANGMAN GRAPHICS ==============
+FRAME_MS = 16  # ~60 Hz ragdoll animation
+STALL_FRAMES = 2  # A tick this many frames after the last one is a stall
+MAX_CANVAS_PARTICLES = 48
+
+# The ragdoll is simulated in the pygame version's logical units and mapped
+# onto this canvas: beam (x=250, y=80) -> (150, 30), floor y=600 -> 260.
+RAGDOLL_SCALE = 230 / 520
+RAGDOLL_OFFSET_X = 150 - 250 * RAGDOLL_SCALE
+RAGDOLL_OFFSET_Y = 30 - 80 * RAGDOLL_SCALE
+
+# Moves and reconfigures a batch of canvas items in one round trip
+_CANVAS_PROC = '''
+proc hangman_canvas_apply {canvas moves configs} {
+    foreach {item coords} $moves {
+        $canvas coords $item {*}$coords
+    }
+    foreach {item options} $configs {
+        $canvas itemconfigure $item {*}$options
+    }
+}
+'''
+
+
+def _blend(color, bg, alpha):
+    """Mix an (r, g, b) color into a hex background; Tk has no per-item alpha."""
+    r2, g2, b2 = int(bg[1:3], 16), int(bg[3:5], 16), int(bg[5:7], 16)
+    r, g, b = color
+    return '#%02x%02x%02x' % (
+        int(r2 + (r - r2) * alpha),
+        int(g2 + (g - g2) * alpha),
+        int(b2 + (b - b2) * alpha)
+    )
+
+
 class HangmanCanvas:
     def __init__(self, parent, width=280, height=280):
         self.canvas = tk.Canvas(
             parent, width=width, height=height,
             bg=COLORS['bg_dark'], highlightthickness=0
         )
+        self.canvas.tk.eval(_CANVAS_PROC)
         self.wrong_guesses = 0
+        self.ragdoll = Ragdoll(250, 100)
+        self.telemetry = None
+        self._after_id = None
+        self._last_tick = None
+        self._item_options = {}  # item -> last options sent
         self._draw_gallows()
+        self._create_items()
     
     def _draw_gallows(self):
         c = self.canvas
@@ -89,27 +161,163 @@ class HangmanCanvas:
         c.create_line(150, 30, 150, 55, fill=COLORS['gallows'], width=3)
         c.create_line(50, 70, 90, 30, fill=COLORS['gallows'], width=3)
     
-    def add_wrong_guess(self):
-        self.wrong_guesses += 1
+    def _create_items(self):
+        """Create every ragdoll item once; frames only move or hide them."""
         c = self.canvas
         body_color = COLORS['body']
         
-        if self.wrong_guesses == 1:  # Head
-            c.create_oval(130, 55, 170, 95, outline=body_color, width=3, tags='body')
-        elif self.wrong_guesses == 2:  # Body
-            c.create_line(150, 95, 150, 170, fill=body_color, width=3, tags='body')
-        elif self.wrong_guesses == 3:  # Left arm
-            c.create_line(150, 115, 115, 145, fill=body_color, width=3, tags='body')
-        elif self.wrong_guesses == 4:  # Right arm
-            c.create_line(150, 115, 185, 145, fill=body_color, width=3, tags='body')
-        elif self.wrong_guesses == 5:  # Left leg
-            c.create_line(150, 170, 115, 220, fill=body_color, width=3, tags='body')
-        elif self.wrong_guesses == 6:  # Right leg
-            c.create_line(150, 170, 185, 220, fill=body_color, width=3, tags='body')
+        # Particles first so they sit behind the body
+        self.particle_items = [
+            c.create_oval(0, 0, 0, 0, fill=body_color, outline='', state='hidden')
+            for _ in range(MAX_CANVAS_PARTICLES)
+        ]
+        self.rope_item = c.create_line(0, 0, 0, 0, fill=COLORS['gallows'], width=2, state='hidden')
+        self.rope_end_item = c.create_line(0, 0, 0, 0, fill=COLORS['gallows'], width=2, state='hidden')
+        self.head_item = c.create_oval(0, 0, 0, 0, outline=body_color, width=3, state='hidden')
+        
+        self._rebind_sticks()
+        self.stick_items = {}
+        for stage, sticks in self.stage_sticks:
+            self.stick_items[stage] = [
+                c.create_line(0, 0, 0, 0, fill=body_color, width=3, state='hidden')
+                for _ in sticks
+            ]
+        self.end_items = {
+            stage: c.create_oval(0, 0, 0, 0, fill=body_color, outline='', state='hidden')
+            for stage in (3, 4, 5, 6)
+        }
+        self.end_joints = {3: L_HAND, 4: R_HAND, 5: L_FOOT, 6: R_FOOT}
+        
+        self._all_items = (
+            self.particle_items + [self.rope_item, self.rope_end_item, self.head_item]
+            + [item for items in self.stick_items.values() for item in items]
+            + list(self.end_items.values())
+        )
+        for item in self._all_items:
+            self._item_options[item] = {'state': 'hidden'}
+    
+    def add_wrong_guess(self):
+        self.wrong_guesses += 1
+        if self._after_id is None:
+            self._tick()
     
     def reset(self):
         self.wrong_guesses = 0
-        self.canvas.delete('body')
+        self.stop()
+        self.ragdoll.reset(250, 100)  # Same points and sticks, so items stay bound
+        moves, configs = [], []
+        for item in self._all_items:
+            self._config(configs, item, state='hidden')
+        self._apply(moves, configs)
+    
+    def stop(self):
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        self._last_tick = None
+    
+    def _rebind_sticks(self):
+        """(stage, sticks) in the order the body appears."""
+        r = self.ragdoll
+        self.stage_sticks = [
+            (2, [r.torso_stick]),
+            (3, r.l_arm_sticks),
+            (4, r.r_arm_sticks),
+            (5, r.l_leg_sticks),
+            (6, r.r_leg_sticks)
+        ]
+    
+    def _tick(self):
+        now = time.perf_counter()
+        if self.telemetry and self._last_tick is not None:
+            elapsed = now - self._last_tick
+            if elapsed > STALL_FRAMES * FRAME_MS / 1000:
+                self.telemetry.stall(elapsed - FRAME_MS / 1000, int(elapsed * 1000 / FRAME_MS) - 1)
+        self._last_tick = now
+        self.ragdoll.wrong_count = self.wrong_guesses
+        self.ragdoll.update()
+        self._render()
+        self._after_id = self.canvas.after(FRAME_MS, self._tick)
+    
+    # ----- Batched rendering -----
+    def _config(self, configs, item, **options):
+        last = self._item_options[item]
+        changed = []
+        for key, value in options.items():
+            if last.get(key) != value:
+                last[key] = value
+                changed.extend(('-' + key, value))
+        if changed:
+            configs.extend((item, tuple(changed)))
+    
+    def _apply(self, moves, configs):
+        if moves or configs:
+            self.canvas.tk.call(
+                'hangman_canvas_apply', str(self.canvas), tuple(moves), tuple(configs)
+            )
+    
+    def _render(self):
+        r = self.ragdoll
+        s = RAGDOLL_SCALE
+        ox, oy = RAGDOLL_OFFSET_X, RAGDOLL_OFFSET_Y
+        moves, configs = [], []
+        
+        # Blood particles (newest ones, faded towards the background)
+        particles = r.blood_particles[-MAX_CANVAS_PARTICLES:]
+        for i, item in enumerate(self.particle_items):
+            if i < len(particles) and particles[i].life > 0:
+                b = particles[i]
+                x, y, rad = ox + b.x * s, oy + b.y * s, max(1.0, b.size * s)
+                moves.extend((item, (x - rad, y - rad, x + rad, y + rad)))
+                # Quantize the fade so the fill only changes every few frames
+                alpha = (int(b.life) // 32) / 8
+                self._config(configs, item, state='normal', fill=_blend(b.color, COLORS['bg_dark'], alpha))
+            else:
+                self._config(configs, item, state='hidden')
+        
+        # Rope
+        ax, ay = ox + r.anchor.x * s, oy + r.anchor.y * s
+        hx, hy = ox + r.head.x * s, oy + r.head.y * s
+        if not r.rope_snapped:
+            moves.extend((self.rope_item, (ax, ay, hx, hy)))
+            self._config(configs, self.rope_end_item, state='hidden')
+        else:
+            moves.extend((self.rope_item, (ax, ay, ax, ay + 80 * s)))
+            moves.extend((self.rope_end_item, (hx, hy, hx + 5 * s, hy - 30 * s)))
+            self._config(configs, self.rope_end_item, state='normal')
+        self._config(configs, self.rope_item, state='normal')
+        
+        # Head (pop scale)
+        if self.wrong_guesses >= 1 and r.pop_progress[1] > 0:
+            rad = 18 * s * r.pop_progress[1]
+            moves.extend((self.head_item, (hx - rad, hy - rad, hx + rad, hy + rad)))
+            self._config(configs, self.head_item, state='normal')
+        else:
+            self._config(configs, self.head_item, state='hidden')
+        
+        # Limbs (grow out from their first joint)
+        for stage, sticks in self.stage_sticks:
+            progress = r.pop_progress[stage] if self.wrong_guesses >= stage else 0
+            for stick, item in zip(sticks, self.stick_items[stage]):
+                if progress > 0:
+                    x1, y1 = stick.p1.x, stick.p1.y
+                    x2 = x1 + (stick.p2.x - x1) * progress
+                    y2 = y1 + (stick.p2.y - y1) * progress
+                    moves.extend((item, (ox + x1 * s, oy + y1 * s, ox + x2 * s, oy + y2 * s)))
+                    self._config(configs, item, state='normal')
+                else:
+                    self._config(configs, item, state='hidden')
+            if stage in self.end_items:
+                item = self.end_items[stage]
+                if progress > 0.8:
+                    p = r.points[self.end_joints[stage]]
+                    x, y = ox + p.x * s, oy + p.y * s
+                    moves.extend((item, (x - 2, y - 2, x + 2, y + 2)))
+                    self._config(configs, item, state='normal')
+                else:
+                    self._config(configs, item, state='hidden')
+        
+        self._apply(moves, configs)
     
     def pack(self, **kwargs):
         self.canvas.pack(**kwargs)
@@ -117,7 +325,7 @@ class HangmanCanvas:
 
 # ============== MAIN GAME APPLICATION ==============
 class HangmanGame:
-    def __init__(self):
+    def __init__(self, results=None, telemetry=None):
         self.root = tk.Tk()
         self.root.title("Hangman - Secure Communication Demo")
         self.root.geometry("800x650")
@@ -140,8 +348,26 @@ class HangmanGame:
         self.game_active = False
         self.attack_occurred = False
         self.crypto = None
-        
+        self.results = results
+        self.telemetry = telemetry
+        self.started_at = None
+        self.attack_name = None  # Attack applied to the word in transit, if any
+        self.word_set_clock = None  # perf_counter() at _set_word, for telemetry
+        self.guess_clock = None  # perf_counter() at the last guess or game start
+        self.channel = AttackContext()  # What the simulated attacker has seen
+        self.replay_guard = ReplayGuard()  # Receiver side, shared by every session
+        self.overlay = None  # Player 2 hand-over window, built on first use
+        
+        # Crypto runs on a worker pool; results come back through a queue
+        # that the Tk loop polls, so the UI never blocks on encryption
+        self.crypto_pool = ThreadPoolExecutor(max_workers=CRYPTO_WORKERS)
+        self.crypto_results = queue.Queue()
+        self.generation = 0  # Bumped on new game so stale results are dropped
+        
+        self.view = ViewModel(self.root)
         self._create_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(RESULT_POLL_MS, self._poll_crypto_results)
     
     def _create_ui(self):
         # Main container
@@ -165,6 +391,7 @@ class HangmanGame:
         
         # Hangman canvas
         self.hangman = HangmanCanvas(left)
+        self.hangman.telemetry = self.telemetry
         self.hangman.pack(pady=10)
         
         # Word display
@@ -297,6 +524,16 @@ class HangmanGame:
             command=self._new_game
         )
         self.new_game_btn.pack(fill='x', ipady=5)
+        
+        # Seed the view model with the widgets that change during a game
+        for label in (self.word_label, self.message_label, self.session_status,
+                      self.encryption_status, self.integrity_status,
+                      self.attack_status, self.attempts_label):
+            self.view.track(label, 'text', 'fg')
+        self.view.track(self.set_word_btn, 'state')
+        self.view.track(self.show_word_check, 'state')
+        for btn in self.letter_buttons.values():
+            self.view.track(btn, 'state', 'bg')
     
     def _create_keyboard(self):
         self.letter_buttons = {}
@@ -344,25 +581,34 @@ class HangmanGame:
         # Clear the entry immediately so Player 2 can't see it
         self.word_entry.delete(0, 'end')
         self.word_entry.config(state='disabled')
-        self.set_word_btn.config(state='disabled')
-        self.show_word_check.config(state='disabled')
+        self.view.set(self.set_word_btn, state='disabled')
+        self.view.set(self.show_word_check, state='disabled')
         
         # Start secure session
         self.secret_word = word
-        self.crypto = CryptoManager()
+        self.word_set_clock = time.perf_counter()
+        self.view.set(self.encryption_status, text="● Encryption: Encrypting...", fg=COLORS['warning'])
+        self._run_crypto_job(self._encrypt_word, self._word_encrypted, word, self.replay_guard)
+    
+    @staticmethod
+    def _encrypt_word(word, replay_guard):
+        """Worker thread: open a session and encrypt the word."""
+        crypto = CryptoManager(ttl=TOKEN_TTL, replay_guard=replay_guard)
+        return crypto, crypto.encrypt(word), crypto.digest(word)
+    
+    def _word_encrypted(self, future):
+        self.crypto, self.encrypted_word, self.md5_hash = future.result()
         
         # Update status - Session
-        self.session_status.config(
+        self.view.set(
+            self.session_status,
             text="● Session: Secure tunnel active",
             fg=COLORS['success']
         )
         
-        # Encrypt the word
-        self.encrypted_word = self.crypto.encrypt(word)
-        self.md5_hash = self.crypto.generate_md5(word)
-        
-        self.encryption_status.config(
-            text="● Encryption: AES-128 applied",
+        self.view.set(
+            self.encryption_status,
+            text=f"● Encryption: {self.crypto.cipher.label} applied",
             fg=COLORS['success']
         )
         
@@ -371,14 +617,21 @@ class HangmanGame:
     
     def _show_player2_transition(self):
         """Show a fullscreen overlay for Player 2 to take over."""
-        # Create overlay
+        if self.overlay is None:
+            self._create_overlay()
+        self.view.set(self.overlay_length_label, text=f"Word length: {len(self.secret_word)} letters")
+        self.overlay.deiconify()
+        self.overlay.grab_set()  # Modal
+    
+    def _create_overlay(self):
+        """Build the hand-over window once; it is hidden between games."""
         self.overlay = tk.Toplevel(self.root)
         self.overlay.title("Player 2's Turn")
         self.overlay.geometry("500x350")
         self.overlay.configure(bg=COLORS['bg_dark'])
         self.overlay.resizable(False, False)
         self.overlay.transient(self.root)
-        self.overlay.grab_set()  # Modal
+        self.overlay.protocol("WM_DELETE_WINDOW", self._player2_ready)
         
         # Center
         self.overlay.update_idletasks()
@@ -407,12 +660,13 @@ class HangmanGame:
             fg=COLORS['text_light'], bg=COLORS['bg_dark']
         ).pack(pady=15)
         
-        tk.Label(
+        self.overlay_length_label = tk.Label(
             self.overlay,
-            text=f"Word length: {len(self.secret_word)} letters",
+            text="",
             font=('Segoe UI', 12),
             fg=COLORS['text_muted'], bg=COLORS['bg_dark']
-        ).pack(pady=5)
+        )
+        self.overlay_length_label.pack(pady=5)
         
         tk.Button(
             self.overlay,
@@ -425,103 +679,132 @@ class HangmanGame:
         ).pack(pady=30)
     
     def _player2_ready(self):
-        """Player 2 clicked ready - close overlay and simulate transmission."""
-        self.overlay.destroy()
+        """Player 2 clicked ready - hide overlay and simulate transmission."""
+        self.overlay.grab_release()
+        self.overlay.withdraw()
         self._simulate_transmission()
     
     def _simulate_transmission(self):
-        self.message_label.config(text="Transmitting encrypted data...", fg=COLORS['warning'])
-        self.root.update()
+        self.view.set(self.message_label, text="Transmitting encrypted data...", fg=COLORS['warning'])
         
         # Simulate network delay
-        self.root.after(500, self._check_for_attack)
+        self._after_in_game(TRANSMIT_DELAY_MS, self._check_for_attack)
     
     def _check_for_attack(self):
+        sent = Message(self.encrypted_word, self.md5_hash)
+        
         # Simulate attacker with configurable probability
         if random.random() < ATTACK_PROBABILITY:
             self.attack_occurred = True
-            self.attack_status.config(
-                text="● Attack: DATA MODIFIED!",
+            attack = random_attack()
+            self.attack_name = attack.name
+            self.view.set(
+                self.attack_status,
+                text=f"● Attack: {attack.name.replace('_', ' ').upper()}!",
                 fg=COLORS['danger']
             )
             
-            # Modify encrypted data
-            modified = list(self.encrypted_word)
-            if len(modified) > 20:
-                modified[15] = modified[15] ^ 0xFF  # Flip bits
-            self.encrypted_word = bytes(modified)
+            # Tamper with the data in transit
+            self.encrypted_word, self.md5_hash = attack.apply(sent, self.channel)
             
-            self.message_label.config(
+            self.view.set(
+                self.message_label,
                 text="⚠️ ATTACKER INTERCEPTED DATA!",
                 fg=COLORS['danger']
             )
         else:
-            self.attack_status.config(
+            self.view.set(
+                self.attack_status,
                 text="● Attack: None detected",
                 fg=COLORS['success']
             )
+        self.channel.history.append(sent)
         
-        self.root.after(800, self._verify_integrity)
+        self._after_in_game(VERIFY_DELAY_MS, self._verify_integrity)
     
     def _verify_integrity(self):
-        self.message_label.config(text="Verifying integrity with MD5...", fg=COLORS['warning'])
-        self.root.update()
-        
+        self.view.set(self.message_label, text=f"Verifying integrity with {self.crypto.cipher.integrity}...",
+                      fg=COLORS['warning'])
+        self._run_crypto_job(
+            self._check_integrity, self._integrity_checked,
+            self.crypto, self.encrypted_word, self.md5_hash
+        )
+    
+    @staticmethod
+    def _check_integrity(crypto, encrypted_word, md5_hash):
+        """Worker thread: decrypt and verify the MD5 (or the AEAD tag)."""
         try:
-            # Decrypt
-            decrypted = self.crypto.decrypt(self.encrypted_word)
-            
-            # Verify MD5
-            if self.crypto.verify_integrity(decrypted, self.md5_hash):
-                self.integrity_status.config(
-                    text="● Integrity: VERIFIED ✓",
-                    fg=COLORS['success']
-                )
-                self.root.after(500, self._start_game)
-            else:
-                self._integrity_failed()
+            decrypted = crypto.decrypt(encrypted_word)
         except Exception:
+            return False
+        return crypto.verify_integrity(decrypted, md5_hash)
+    
+    def _integrity_checked(self, future):
+        ok = future.result()
+        if self.telemetry:
+            self.telemetry.integrity(time.perf_counter() - self.word_set_clock, ok)
+            if self.attack_name:
+                self.telemetry.attack(self.attack_name, not ok)
+        if ok:
+            self.view.set(
+                self.integrity_status,
+                text="● Integrity: VERIFIED ✓",
+                fg=COLORS['success']
+            )
+            self._after_in_game(START_DELAY_MS, self._start_game)
+        else:
             self._integrity_failed()
     
     def _integrity_failed(self):
-        self.integrity_status.config(
+        self.view.set(
+            self.integrity_status,
             text="● Integrity: FAILED ✗",
             fg=COLORS['danger']
         )
-        self.message_label.config(
+        self.view.set(
+            self.message_label,
             text="⚠️ INTEGRITY BREACH! Data was tampered!",
             fg=COLORS['danger']
         )
-        self.word_label.config(text="TAMPERED!", fg=COLORS['danger'])
+        self.view.set(self.word_label, text="TAMPERED!", fg=COLORS['danger'])
+        
+        self._record_result(won=False, integrity_failed=True)
         
         # Disable game
-        self.set_word_btn.config(state='disabled')
+        self.view.set(self.set_word_btn, state='disabled')
         for btn in self.letter_buttons.values():
-            btn.config(state='disabled')
+            self.view.set(btn, state='disabled')
     
     def _start_game(self):
         self.game_active = True
+        self.started_at = time.time()
+        self.guess_clock = time.perf_counter()
         self.revealed = ['_'] * len(self.secret_word)
         self._update_word_display()
         
-        self.message_label.config(
+        self.view.set(
+            self.message_label,
             text="Game started! Guess the word.",
             fg=COLORS['success']
         )
         
         # Disable word entry, enable keyboard
         self.word_entry.config(state='disabled')
-        self.set_word_btn.config(state='disabled')
+        self.view.set(self.set_word_btn, state='disabled')
         
         for btn in self.letter_buttons.values():
-            btn.config(state='normal')
+            self.view.set(btn, state='normal')
     
     def _guess_letter(self, letter):
         if not self.game_active or letter in self.guessed_letters:
             return
         
         self.guessed_letters.add(letter)
-        self.letter_buttons[letter].config(state='disabled')
+        self.view.set(self.letter_buttons[letter], state='disabled')
+        if self.telemetry:
+            now = time.perf_counter()
+            self.telemetry.guess(now - self.guess_clock, letter, letter in self.secret_word)
+            self.guess_clock = now
         
         if letter in self.secret_word:
             # Correct guess
@@ -530,8 +813,8 @@ class HangmanGame:
                     self.revealed[i] = letter
             
             self._update_word_display()
-            self.letter_buttons[letter].config(bg=COLORS['success'])
-            self.message_label.config(text="Correct! ✓", fg=COLORS['success'])
+            self.view.set(self.letter_buttons[letter], bg=COLORS['success'])
+            self.view.set(self.message_label, text="Correct! ✓", fg=COLORS['success'])
             
             # Check win
             if '_' not in self.revealed:
@@ -540,43 +823,55 @@ class HangmanGame:
             # Wrong guess
             self.wrong_guesses += 1
             self.hangman.add_wrong_guess()
-            self.letter_buttons[letter].config(bg=COLORS['danger'])
+            self.view.set(self.letter_buttons[letter], bg=COLORS['danger'])
             
             remaining = MAX_WRONG_GUESSES - self.wrong_guesses
             color = COLORS['success'] if remaining > 2 else (COLORS['warning'] if remaining > 1 else COLORS['danger'])
-            self.attempts_label.config(text=f"● Attempts: {remaining} left", fg=color)
-            self.message_label.config(text="Wrong! ✗", fg=COLORS['danger'])
+            self.view.set(self.attempts_label, text=f"● Attempts: {remaining} left", fg=color)
+            self.view.set(self.message_label, text="Wrong! ✗", fg=COLORS['danger'])
             
             # Check lose
             if self.wrong_guesses >= MAX_WRONG_GUESSES:
                 self._game_lost()
     
     def _update_word_display(self):
-        self.word_label.config(text=' '.join(self.revealed), fg=COLORS['text_light'])
+        self.view.set(self.word_label, text=' '.join(self.revealed), fg=COLORS['text_light'])
     
     def _game_won(self):
         self.game_active = False
-        self.word_label.config(fg=COLORS['success'])
-        self.message_label.config(text="🎉 YOU WIN!", fg=COLORS['success'])
+        self._record_result(won=True)
+        self.view.set(self.word_label, fg=COLORS['success'])
+        self.view.set(self.message_label, text="🎉 YOU WIN!", fg=COLORS['success'])
         
         for btn in self.letter_buttons.values():
-            btn.config(state='disabled')
+            self.view.set(btn, state='disabled')
     
     def _game_lost(self):
         self.game_active = False
+        self._record_result(won=False)
         self.revealed = list(self.secret_word)
         self._update_word_display()
-        self.word_label.config(fg=COLORS['danger'])
-        self.message_label.config(
+        self.view.set(self.word_label, fg=COLORS['danger'])
+        self.view.set(
+            self.message_label,
             text=f"💀 GAME OVER! Word was: {self.secret_word}",
             fg=COLORS['danger']
         )
         
         for btn in self.letter_buttons.values():
-            btn.config(state='disabled')
+            self.view.set(btn, state='disabled')
+    
+    def _record_result(self, won, integrity_failed=False):
+        if self.results:
+            duration = time.time() - self.started_at if self.started_at else 0.0
+            self.results.record(
+                "Player 2", len(self.secret_word), len(self.guessed_letters),
+                self.wrong_guesses, duration, won, integrity_failed
+            )
     
     def _new_game(self):
         # Reset all state
+        self.generation += 1
         self.secret_word = ""
         self.encrypted_word = None
         self.md5_hash = ""
@@ -585,29 +880,67 @@ class HangmanGame:
         self.revealed = []
         self.game_active = False
         self.attack_occurred = False
+        self.attack_name = self.word_set_clock = self.guess_clock = None
         self.crypto = None
+        self.started_at = None
         
         # Reset UI
         self.hangman.reset()
-        self.word_label.config(text="_ _ _ _ _", fg=COLORS['text_light'])
-        self.message_label.config(text="Enter a word to start", fg=COLORS['text_muted'])
+        self.view.set(self.word_label, text="_ _ _ _ _", fg=COLORS['text_light'])
+        self.view.set(self.message_label, text="Enter a word to start", fg=COLORS['text_muted'])
         
         self.word_entry.config(state='normal', show='●')
         self.word_entry.delete(0, 'end')
-        self.set_word_btn.config(state='normal')
+        self.view.set(self.set_word_btn, state='normal')
         self.show_word_var.set(False)
-        self.show_word_check.config(state='normal')
+        self.view.set(self.show_word_check, state='normal')
         
         # Reset status
-        self.session_status.config(text="● Session: Not started", fg=COLORS['text_muted'])
-        self.encryption_status.config(text="● Encryption: Pending", fg=COLORS['text_muted'])
-        self.integrity_status.config(text="● Integrity: Pending", fg=COLORS['text_muted'])
-        self.attack_status.config(text="● Attack: None", fg=COLORS['text_muted'])
-        self.attempts_label.config(text=f"● Attempts: {MAX_WRONG_GUESSES} left", fg=COLORS['success'])
+        self.view.set(self.session_status, text="● Session: Not started", fg=COLORS['text_muted'])
+        self.view.set(self.encryption_status, text="● Encryption: Pending", fg=COLORS['text_muted'])
+        self.view.set(self.integrity_status, text="● Integrity: Pending", fg=COLORS['text_muted'])
+        self.view.set(self.attack_status, text="● Attack: None", fg=COLORS['text_muted'])
+        self.view.set(self.attempts_label, text=f"● Attempts: {MAX_WRONG_GUESSES} left", fg=COLORS['success'])
         
         # Reset keyboard
         for letter, btn in self.letter_buttons.items():
-            btn.config(state='disabled', bg=COLORS['bg_dark'])
+            self.view.set(btn, state='disabled', bg=COLORS['bg_dark'])
+    
+    # ----- Background crypto -----
+    def _after_in_game(self, delay_ms, callback):
+        """root.after for one game's chain: dropped once NEW GAME is pressed."""
+        generation = self.generation
+
+        def fire():
+            if generation != self.generation:
+                return
+            callback()
+        self.root.after(delay_ms, fire)
+
+    def _run_crypto_job(self, job, callback, *args):
+        """Run job on the crypto pool and hand its future to callback on the Tk thread."""
+        generation = self.generation
+        future = self.crypto_pool.submit(job, *args)
+        future.add_done_callback(lambda f: self.crypto_results.put((generation, callback, f)))
+    
+    def _poll_crypto_results(self):
+        while True:
+            try:
+                generation, callback, future = self.crypto_results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                callback(future)
+        self.root.after(RESULT_POLL_MS, self._poll_crypto_results)
+    
+    def _on_close(self):
+        self.hangman.stop()
+        self.crypto_pool.shutdown(wait=False, cancel_futures=True)
+        if self.results:
+            self.results.close()
+        if self.telemetry:
+            self.telemetry.close()
+        self.root.destroy()
     
     def run(self):
         self.root.mainloop()
@@ -620,5 +953,10 @@ if __name__ == "__main__":
     print("=" * 50)
     print("\nStarting game...")
     
-    game = HangmanGame()
+    results = telemetry = None
+    if "--results" in sys.argv:
+        results = ResultsStore(sys.argv[sys.argv.index("--results") + 1])
+    if "--telemetry" in sys.argv:
+        telemetry = Telemetry(sys.argv[sys.argv.index("--telemetry") + 1])
+    game = HangmanGame(results=results, telemetry=telemetry)
     game.run()
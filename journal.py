@@ -0,0 +1,537 @@
+# Crash-safe game-state journal
+#
+# Every state transition of a game is appended to a journal segment as a
+# small checksummed record. A background writer thread group-commits: it
+# gathers whatever was appended during one commit interval, writes it in a
+# single call and fsyncs once, so the game loop never waits for the disk.
+# Periodic snapshots compact the live state of every room into one file and
+# start a new segment; restore loads the latest snapshot and replays only
+# the segments written after it.
+#
+# The secret word is never written in plaintext. The journal keeps the
+# tokens exactly as they were sent and received, plus the game's
+# session key wrapped (encrypted) with a separate journal key. Restoring a
+# room unwraps the session key and decrypts the token in memory.
+#
+# The journal key comes from the `key` argument, the HANGMAN_JOURNAL_KEY
+# environment variable or `key_file`, in that order. Without any of them it
+# is kept as journal.key (owner-only) inside the journal directory, which
+# only protects the words until someone copies the whole directory.
+
+import glob
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, one process per directory is up to the caller
+    fcntl = None
+
+from cryptography.fernet import Fernet
+
+from adversary import Message
+from crypto_utils import CryptoManager
+from rooms import MAX_WRONG_GUESSES, STATES
+
+# ============== CONFIGURATION ==============
+COMMIT_INTERVAL = 0.005  # Seconds a record may wait for its group commit
+SNAPSHOT_EVERY = 10_000  # Records between snapshots
+KEY_FILE = "journal.key"  # Default key location, inside the journal directory
+KEY_ENV = "HANGMAN_JOURNAL_KEY"
+LOCK_FILE = "journal.lock"  # Held while a Journal has the directory open
+
+# Record types
+RESET = 1   # Room created or new game
+WORD = 2    # sealed session key, sent token, md5, received token, received md5
+START = 3   # attack detected flag
+GUESS = 4   # letter, wrong count, state after the guess
+REMOVE = 5
+
+RECORD_HEADER = struct.Struct('<II')  # body length, crc32 of everything after the header
+RECORD_KIND = struct.Struct('<BI')    # type, room_id
+FIELD = struct.Struct('<H')
+GUESS_BODY = struct.Struct('<cBB')    # letter, wrong count, state index
+START_BODY = struct.Struct('<B')
+
+
+def _record(kind, room_id, body=b''):
+    payload = RECORD_KIND.pack(kind, room_id) + body
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _pack_fields(*fields):
+    return b''.join(FIELD.pack(len(f)) + f for f in fields)
+
+
+def _unpack_fields(body):
+    fields = []
+    offset = 0
+    while offset < len(body):
+        (size,) = FIELD.unpack_from(body, offset)
+        offset += FIELD.size
+        fields.append(bytes(body[offset:offset + size]))
+        offset += size
+    return fields
+
+
+def iter_records(data):
+    """(type, room_id, body) for each intact record; stops at a torn tail."""
+    view = memoryview(data)
+    offset = 0
+    end = len(data)
+    while offset + RECORD_HEADER.size <= end:
+        size, crc = RECORD_HEADER.unpack_from(view, offset)
+        start = offset + RECORD_HEADER.size
+        payload = view[start:start + size]
+        if size < RECORD_KIND.size or len(payload) < size or zlib.crc32(payload) != crc:
+            return
+        kind, room_id = RECORD_KIND.unpack_from(payload)
+        yield kind, room_id, payload[RECORD_KIND.size:]
+        offset = start + size
+
+
+def _fsync_dir(directory):
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class JournalLocked(RuntimeError):
+    """Another Journal already has the directory open."""
+
+
+def lock_directory(directory):
+    """An open file holding an exclusive lock on the journal directory."""
+    f = open(os.path.join(directory, LOCK_FILE), 'ab')
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            raise JournalLocked(f"Journal {directory} is already open") from None
+    return f
+
+
+def load_key(path):
+    """Read the journal key, creating it (owner-only) on first use."""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_mode & 0o077:
+                os.chmod(path, 0o600)
+            return f.read().strip()
+    except FileNotFoundError:
+        key = Fernet.generate_key()
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+            f.flush()
+            os.fsync(f.fileno())
+        return key
+
+
+# ============== ROOM STATE ==============
+class RoomState:
+    """What the journal knows about one room; holds no plaintext."""
+    __slots__ = ('state', 'sealed_key', 'encrypted_word', 'md5_hash', 'received',
+                 'attack_detected', 'guessed', 'wrong_count')
+
+    def __init__(self):
+        self.state = "SET_WORD"
+        self.sealed_key = None
+        self.encrypted_word = None
+        self.md5_hash = ""
+        self.received = None
+        self.attack_detected = False
+        self.guessed = []
+        self.wrong_count = 0
+
+    def records(self, room_id):
+        """The shortest record sequence that rebuilds this state."""
+        out = [_record(RESET, room_id)]
+        if self.sealed_key is None:
+            return out
+        out.append(_record(WORD, room_id, _pack_fields(
+            self.sealed_key, self.encrypted_word, self.md5_hash.encode('ascii'),
+            self.received.token, self.received.md5_hash.encode('ascii'))))
+        if self.state in ("GUESSING", "GAME_OVER"):
+            out.append(_record(START, room_id, START_BODY.pack(self.attack_detected)))
+        # Only the last guess needs the final counters
+        for char in self.guessed[:-1]:
+            out.append(_record(GUESS, room_id, GUESS_BODY.pack(char.encode('ascii'), 0, 2)))
+        if self.guessed:
+            out.append(_record(GUESS, room_id, GUESS_BODY.pack(
+                self.guessed[-1].encode('ascii'), self.wrong_count, STATES.index(self.state))))
+        return out
+
+
+def apply_record(rooms, kind, room_id, body):
+    if kind == RESET:
+        rooms[room_id] = RoomState()
+    elif kind == REMOVE:
+        rooms.pop(room_id, None)
+    else:
+        room = rooms.setdefault(room_id, RoomState())
+        if kind == WORD:
+            sealed_key, token, md5, recv_token, recv_md5 = _unpack_fields(body)
+            room.sealed_key = sealed_key
+            room.encrypted_word = token
+            room.md5_hash = md5.decode('ascii')
+            room.received = Message(recv_token, recv_md5.decode('ascii'))
+            room.state = "TRANSITION"
+        elif kind == START:
+            room.attack_detected = bool(START_BODY.unpack(body)[0])
+            room.state = "GUESSING"
+        elif kind == GUESS:
+            char, wrong, state = GUESS_BODY.unpack(body)
+            room.guessed.append(char.decode('ascii'))
+            room.wrong_count = wrong
+            room.state = STATES[state]
+
+
+# ============== JOURNAL ==============
+class Journal:
+    def __init__(self, directory, key=None, key_file=None, commit_interval=COMMIT_INTERVAL,
+                 snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # Two writers would delete each other's segments on snapshot
+        self._lock = lock_directory(directory)
+        try:
+            if key is None and os.environ.get(KEY_ENV):
+                key = os.environ[KEY_ENV].encode('ascii')
+            if key is None:
+                key = load_key(key_file or os.path.join(directory, KEY_FILE))
+            self.cipher = Fernet(key)
+        except BaseException:
+            self._lock.close()
+            raise
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        self.since_snapshot = 0
+
+        self.pending = queue.Queue()
+        self.appended = 0
+        self.durable = 0  # Records known to be on disk
+        self.errors = 0   # Records lost to a failed write or fsync
+        self.first_lost = None  # Append number of the first lost record
+        self.error = None
+        self.snapshot_errors = 0  # Failed snapshots; their records are still in the segments
+        self.stopped = False  # The writer thread has exited
+        self._durable_changed = threading.Condition()
+
+        self.segment = max(self._numbers("segment"), default=0) + 1
+        self._file = self._open_segment(self.segment)
+        self._writer = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    # ----- Files -----
+    def _path(self, kind, number):
+        return os.path.join(self.directory, f"{kind}-{number:08d}.bin")
+
+    def _numbers(self, kind):
+        return sorted(int(os.path.basename(p)[len(kind) + 1:-4])
+                      for p in glob.glob(os.path.join(self.directory, f"{kind}-*.bin")))
+
+    def _open_segment(self, number):
+        f = open(self._path("segment", number), 'ab')
+        _fsync_dir(self.directory)
+        return f
+
+    # ----- Hot path -----
+    def _append(self, data):
+        if self.stopped:
+            raise RuntimeError("Journal writer has stopped") from self.error
+        self.appended += 1
+        self.since_snapshot += 1
+        self.pending.put(data)
+
+    def reset(self, room_id):
+        self._append(_record(RESET, room_id))
+
+    def word_set(self, room_id, game):
+        sealed_key = self.cipher.encrypt(game.crypto.get_key())
+        self._append(_record(WORD, room_id, _pack_fields(
+            sealed_key, game.encrypted_word, game.md5_hash.encode('ascii'),
+            game.received.token, game.received.md5_hash.encode('ascii'))))
+
+    def start(self, room_id, attack_detected):
+        self._append(_record(START, room_id, START_BODY.pack(attack_detected)))
+
+    def guess(self, room_id, char, wrong_count, state):
+        if len(char) != 1 or not 'A' <= char <= 'Z':
+            raise ValueError(f"Journaled guesses are one letter A-Z, not {char!r}")
+        self._append(_record(GUESS, room_id, GUESS_BODY.pack(
+            char.encode('ascii'), wrong_count, STATES.index(state))))
+
+    def remove(self, room_id):
+        self._append(_record(REMOVE, room_id))
+
+    def sync(self, timeout=None):
+        """Block until everything appended so far is on disk.
+
+        False on timeout, if a write or fsync failed for any record
+        appended so far (the exception is kept in `error`), or if the
+        writer has stopped.
+        """
+        target = self.appended
+        with self._durable_changed:
+            done = self._durable_changed.wait_for(
+                lambda: self.durable + self.errors >= target or self.stopped, timeout)
+            return (done and self.durable + self.errors >= target
+                    and (self.first_lost is None or self.first_lost > target))
+
+    # ----- Snapshots -----
+    def snapshot_due(self):
+        return self.since_snapshot >= self.snapshot_every
+
+    def snapshot(self, games):
+        """Compact the live state of `games` (room_id -> game) into a snapshot.
+
+        Encoding happens here, so the snapshot matches the records appended
+        so far; the writer thread does the file work.
+        """
+        data = b''.join(rec for room_id, game in games.items()
+                        for rec in self.capture(game).records(room_id))
+        self.since_snapshot = 0
+        self.pending.put(('snapshot', data))
+
+    def capture(self, game):
+        room = RoomState()
+        room.state = game.state if game.state in STATES else "SET_WORD"
+        if game.encrypted_word is not None and room.state != "SET_WORD":
+            room.sealed_key = self.cipher.encrypt(game.crypto.get_key())
+            room.encrypted_word = game.encrypted_word
+            room.md5_hash = game.md5_hash
+            room.received = game.received
+            room.attack_detected = game.attack_detected
+            room.guessed = sorted(game.guessed)
+            room.wrong_count = game.wrong_count
+        else:
+            room.state = "SET_WORD"  # Nothing to keep until a word is set
+        return room
+
+    def _write_snapshot(self, data):
+        # Everything before the marker belongs to the old segment
+        self._file.close()
+        self.segment += 1
+        self._file = self._open_segment(self.segment)
+        path = self._path("snapshot", self.segment)
+        with open(path + ".tmp", 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        _fsync_dir(self.directory)
+        # The snapshot covers every older segment and snapshot
+        for number in self._numbers("segment"):
+            if number < self.segment:
+                os.remove(self._path("segment", number))
+        for number in self._numbers("snapshot"):
+            if number < self.segment:
+                os.remove(self._path("snapshot", number))
+
+    # ----- Background writer -----
+    def _write_loop(self):
+        running = True
+        try:
+            while running:
+                try:
+                    item = self.pending.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                # Group commit: take everything that arrives within one interval
+                batch = []
+                count = 0
+                deadline = time.monotonic() + self.commit_interval
+                while True:
+                    if item is None:
+                        running = False
+                        break
+                    if isinstance(item, tuple):
+                        self._commit(batch, count)
+                        batch, count = [], 0
+                        self._snapshot_or_report(item[1])
+                    else:
+                        batch.append(item)
+                        count += 1
+                    try:
+                        item = self.pending.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                self._commit(batch, count)
+        except BaseException as e:
+            self.error = e  # Unexpected: appends and sync() report it from here on
+            raise
+        finally:
+            try:
+                self._file.close()
+            except (OSError, ValueError):
+                pass
+            with self._durable_changed:
+                self.stopped = True
+                self._durable_changed.notify_all()
+
+    def _snapshot_or_report(self, data):
+        """A failed snapshot loses nothing: the segments it would have
+        replaced are still there, and the writer keeps going."""
+        try:
+            self._write_snapshot(data)
+        except OSError as e:
+            self.snapshot_errors += 1
+            self.error = e
+
+    def _commit(self, batch, count):
+        if not batch:
+            return
+        try:
+            self._file.write(b''.join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except (OSError, ValueError) as e:  # ValueError: no segment could be reopened
+            with self._durable_changed:
+                if self.first_lost is None:
+                    self.first_lost = self.durable + self.errors + 1
+                self.errors += count
+                self.error = e
+                self._durable_changed.notify_all()
+            self._roll_segment()
+            return
+        with self._durable_changed:
+            self.durable += count
+            self._durable_changed.notify_all()
+
+    def _roll_segment(self):
+        """After a failed write: later records go to a new segment, so a torn
+        record in this one cannot hide them from restore."""
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self.segment += 1
+        try:
+            self._file = self._open_segment(self.segment)
+        except OSError as e:
+            self.error = e
+
+    def close(self):
+        """Flush everything appended so far, stop the writer and unlock the directory."""
+        self.pending.put(None)
+        self._writer.join()
+        self._lock.close()
+
+    # ----- Restore -----
+    def restore(self):
+        """Latest snapshot plus the journal tail: room_id -> RoomState."""
+        rooms = {}
+        snapshots = [n for n in self._numbers("snapshot") if n < self.segment]
+        first = 0
+        if snapshots:
+            first = snapshots[-1]
+            with open(self._path("snapshot", first), 'rb') as f:
+                for record in iter_records(f.read()):
+                    apply_record(rooms, *record)
+        for number in self._numbers("segment"):
+            if first <= number < self.segment:
+                with open(self._path("segment", number), 'rb') as f:
+                    for record in iter_records(f.read()):
+                        apply_record(rooms, *record)
+        return rooms
+
+    def restore_into(self, game, room, replay_guard=None):
+        """Load a RoomState into a GameRoom or HangmanGame.
+
+        game.crypto is a session without a TTL and is only meant for the
+        restored game; a caller that keeps one session across games has to
+        start a new one for the next game.
+        """
+        game.state = room.state
+        game.guessed = set(room.guessed)
+        game.wrong_count = room.wrong_count
+        game.attack_detected = room.attack_detected
+        if room.sealed_key is None:
+            game.status_msg = "Player 1: Enter Secret Word"
+            return
+        key = self.cipher.decrypt(room.sealed_key)
+        # No TTL: the received token reached this host before the restart.
+        # Its age now is the downtime, not time spent on the wire, and a
+        # TRANSITION room still has to check it in start_guessing()
+        game.crypto = CryptoManager(key, replay_guard=replay_guard,
+                                    room_id=getattr(game, 'room_id', 0))
+        game.encrypted_word = room.encrypted_word
+        game.md5_hash = room.md5_hash
+        game.received = room.received
+        # The token that produced the word in play; the TTL does not apply
+        # to a game that was already accepted
+        token = room.encrypted_word
+        if room.state in ("GUESSING", "GAME_OVER") and not room.attack_detected:
+            token = room.received.token
+            if replay_guard is not None:
+                replay_guard.check(token)  # Accepted before the restart: not again
+        game.word = game.crypto.cipher.decrypt(token).decode('utf-8')
+        game.status_msg = {
+            "TRANSITION": "Word Encrypted!",
+            "GUESSING": "⚠️ INTEGRITY BREACH!" if room.attack_detected else "Integrity OK - Start Guessing!",
+            "GAME_OVER": "DEFEAT - Player 1 Wins!" if room.wrong_count >= MAX_WRONG_GUESSES
+                         else "VICTORY - Player 2 Wins!",
+        }[room.state]
+
+
+def _play(directory, rooms, results):
+    """Child process: play games with a journal, then die without closing it."""
+    import random
+    from rooms import RoomManager
+
+    manager = RoomManager(journal=Journal(directory, snapshot_every=2000))
+    for _ in range(rooms):
+        manager.create_room()
+    for room in manager.rooms.values():
+        if random.random() < 0.9:
+            room.set_word(random.choice(["PYTHON", "GALLOWS", "CIPHER", "JOURNAL"]))
+        if room.state == "TRANSITION" and random.random() < 0.9:
+            room.start_guessing()
+        for char in random.sample("ABCDEFGHIJKLMNOPQRSTUVWXYZ", random.randint(0, 12)):
+            room.handle_guess(char)
+        manager.tick()
+    manager.journal.sync()
+    results.put({rid: (r.state, r.word, sorted(r.guessed), r.wrong_count)
+                 for rid, r in manager.rooms.items()})
+    results.close()
+    results.join_thread()
+    os._exit(1)  # Crash: no close(), no final snapshot
+
+
+if __name__ == "__main__":
+    import multiprocessing as mp
+    import tempfile
+    from rooms import RoomManager
+
+    directory = tempfile.mkdtemp()
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    child = ctx.Process(target=_play, args=(directory, 500, results))
+    child.start()
+    expected = results.get()
+    child.join()
+    print(f"Crashed with {len(expected)} rooms, files: {sorted(os.listdir(directory))}")
+
+    start = time.perf_counter()
+    journal = Journal(directory)
+    manager = RoomManager(journal=journal)
+    count = manager.restore()
+    elapsed = time.perf_counter() - start
+    restored = {rid: (r.state, r.word, sorted(r.guessed), r.wrong_count)
+                for rid, r in manager.rooms.items()}
+    print(f"Restored {count} rooms in {elapsed * 1000:.1f} ms, "
+          f"match: {restored == expected}")
+    journal.close()
+    plaintext = any(word.encode() in open(os.path.join(directory, name), 'rb').read()
+                    for name in os.listdir(directory)
+                    for word in ("PYTHON", "GALLOWS", "CIPHER", "JOURNAL"))
+    print(f"Plaintext words on disk: {plaintext}")
@@ -0,0 +1,439 @@
+# Ragdoll physics simulation (no rendering, safe to run headless)
+
+import math
+import random
+
+# ================= CONFIGURATION =================
+GRAVITY = 0.6
+DAMPING = 0.92  # slightly less damping for more swing
+FLOOR_Y = 600
+MAX_BLOOD_PARTICLES = 120  # Bursts beyond this are dropped, not queued
+
+# Constraint solver: 'xpbd' (compliant, mass-weighted, joint limits) or
+# 'pbd' (the original equal-split Gauss-Seidel, kept for comparison)
+SOLVER = 'xpbd'
+ITERATIONS = {'xpbd': 3, 'pbd': 5}  # Substeps for xpbd
+ROPE_COMPLIANCE = 0.002  # Stick stretch per unit force per frame^2; 0 is rigid
+
+# Joint indices into Ragdoll.points
+ANCHOR = 0
+HEAD = 1
+NECK = 2
+PELVIS = 3
+L_ELBOW = 4
+L_HAND = 5
+R_ELBOW = 6
+R_HAND = 7
+L_KNEE = 8
+L_FOOT = 9
+R_KNEE = 10
+R_FOOT = 11
+
+# Rest pose: joint offsets from the gallows anchor, by joint index
+REST_POSE = (
+    (0, 0), (0, 40), (0, 65), (0, 130),
+    (-30, 80), (-50, 100), (30, 80), (50, 100),
+    (-15, 170), (-15, 210), (15, 170), (15, 210)
+)
+
+# Joint masses by index. A heavy torso and light extremities let limbs
+# swing off the body instead of dragging it; locked joints are immovable
+JOINT_MASS = (1, 4, 3, 5, 1.5, 1, 1.5, 1, 2, 1.5, 2, 1.5)
+
+# Angular limits (parent, pivot, child, min, max): the bend at `pivot`
+# between parent->pivot and pivot->child, in degrees from the rest pose
+JOINT_LIMITS = (
+    (HEAD, NECK, PELVIS, -45, 45),
+    (NECK, L_ELBOW, L_HAND, -15, 150),
+    (NECK, R_ELBOW, R_HAND, -150, 15),
+    (NECK, PELVIS, L_KNEE, -60, 60),
+    (NECK, PELVIS, R_KNEE, -60, 60),
+    (PELVIS, L_KNEE, L_FOOT, -90, 30),
+    (PELVIS, R_KNEE, R_FOOT, -30, 90),
+)
+
+
+# Skeleton parent of each joint; a joint limit swings the child's whole
+# subtree so nothing below it gets stretched
+PARENT = (None, ANCHOR, HEAD, NECK, NECK, L_ELBOW, NECK, R_ELBOW, PELVIS, L_KNEE, PELVIS, R_KNEE)
+
+
+def subtree(joint):
+    """The joint and everything hanging off it."""
+    joints = [joint]
+    for j in joints:
+        joints += [i for i, parent in enumerate(PARENT) if parent == j]
+    return tuple(joints)
+
+
+def bend(a, o, b):
+    """Signed angle (radians) at o between a->o and o->b."""
+    ux, uy = o[0] - a[0], o[1] - a[1]
+    vx, vy = b[0] - o[0], b[1] - o[1]
+    return math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+
+def _limit_bounds():
+    bounds = []
+    for a, o, b, lo, hi in JOINT_LIMITS:
+        rest = bend(REST_POSE[a], REST_POSE[o], REST_POSE[b])
+        bounds.append((a, o, b, rest + math.radians(lo), rest + math.radians(hi), subtree(b)))
+    return tuple(bounds)
+
+
+LIMIT_BOUNDS = _limit_bounds()
+TAU = 2 * math.pi
+
+# ================= PHYSICS CLASSES =================
+# Slotted so hundreds of ragdolls stay small and attribute access stays fast
+class Point:
+    __slots__ = ('x', 'y', 'old_x', 'old_y', 'locked')
+
+    def __init__(self, x, y, locked=False):
+        self.x, self.y = x, y
+        self.old_x, self.old_y = x, y
+        self.locked = locked
+
+class Stick:
+    __slots__ = ('p1', 'p2', 'length', 'compliance')
+
+    def __init__(self, p1, p2, length=None, compliance=0.0):
+        self.p1, self.p2 = p1, p2
+        self.compliance = compliance
+        if length is None:
+            self.length = math.hypot(p2.x - p1.x, p2.y - p1.y)
+        else:
+            self.length = length
+
+class BloodParticle:
+    __slots__ = ('x', 'y', 'vx', 'vy', 'size', 'color', 'life')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.vx = random.uniform(-3, 3)
+        self.vy = random.uniform(-1, 3)
+        self.size = random.uniform(2, 5)
+        self.color = (random.randint(180, 255), 0, 0) # Varied blood red
+        self.life = 255
+        
+    def update(self):
+        self.x += self.vx
+        self.y += self.vy
+        self.vy += 0.2  # Gravity
+        self.life -= 4
+        if self.y > FLOOR_Y: # Floor splatter
+            self.y = FLOOR_Y
+            self.vx *= 0.5
+            self.vy = 0
+
+# ================= PHYSICS SIMULATION =================
+class Ragdoll:
+    # Front ends override this with a particle class that knows how to draw itself
+    particle_class = BloodParticle
+
+    __slots__ = (
+        'points', 'sticks', 'wrong_count', 'anchor', 'head', 'rope',
+        'torso_stick', 'l_arm_sticks', 'r_arm_sticks', 'l_leg_sticks',
+        'r_leg_sticks', 'sway_timer', 'death_timer', 'pop_progress',
+        'prev_wrong_count', 'blood_particles', 'rope_snapped', '_constraints',
+        'solver', 'iterations', '_limits', 'collider'
+    )
+
+    def __init__(self, x, y, solver=SOLVER, iterations=None):
+        self.solver = solver
+        self.iterations = ITERATIONS[solver] if iterations is None else iterations
+        self.points = []
+        self.sticks = []
+        self.wrong_count = 0
+        
+        # Origin (Gallows anchor)
+        self.anchor = Point(x, y, locked=True)
+        self.points.append(self.anchor)
+        
+        # Head (Pivot)
+        head_x, head_y = x, y + 40
+        self.head = Point(head_x, head_y) # HEAD
+        self.points.append(self.head)
+        self.rope = Stick(self.anchor, self.head, length=40, compliance=ROPE_COMPLIANCE)
+        self.sticks.append(self.rope)
+        
+        # Neck
+        neck = Point(head_x, head_y + 25) # NECK
+        self.points.append(neck)
+        self.sticks.append(Stick(self.head, neck)) # Head-Neck
+        
+        # Pelvis
+        pelvis = Point(head_x, head_y + 90) # PELVIS
+        self.points.append(pelvis)
+        self.torso_stick = Stick(neck, pelvis)
+        self.sticks.append(self.torso_stick)
+        
+        # Arms
+        l_elbow = Point(head_x - 30, head_y + 40) # L_ELBOW
+        l_hand = Point(head_x - 50, head_y + 60)  # L_HAND
+        self.points.extend([l_elbow, l_hand])
+        self.l_arm_sticks = [Stick(neck, l_elbow), Stick(l_elbow, l_hand)]
+        self.sticks.extend(self.l_arm_sticks)
+
+        r_elbow = Point(head_x + 30, head_y + 40) # R_ELBOW
+        r_hand = Point(head_x + 50, head_y + 60)  # R_HAND
+        self.points.extend([r_elbow, r_hand])
+        self.r_arm_sticks = [Stick(neck, r_elbow), Stick(r_elbow, r_hand)]
+        self.sticks.extend(self.r_arm_sticks)
+        
+        # Legs
+        l_knee = Point(head_x - 15, head_y + 130) # L_KNEE
+        l_foot = Point(head_x - 15, head_y + 170) # L_FOOT
+        self.points.extend([l_knee, l_foot])
+        self.l_leg_sticks = [Stick(pelvis, l_knee), Stick(l_knee, l_foot)]
+        self.sticks.extend(self.l_leg_sticks)
+
+        r_knee = Point(head_x + 15, head_y + 130) # R_KNEE
+        r_foot = Point(head_x + 15, head_y + 170) # R_FOOT
+        self.points.extend([r_knee, r_foot])
+        self.r_leg_sticks = [Stick(pelvis, r_knee), Stick(r_knee, r_foot)]
+        self.sticks.extend(self.r_leg_sticks)
+        
+        self.sway_timer = 0
+        self.death_timer = 0
+        
+        # Pop/Growth Animation Progress (0.0 to 1.0) for each stage (0-6)
+        self.pop_progress = [0.0] * 7
+        self.prev_wrong_count = 0
+        
+        self.blood_particles = []
+        self.rope_snapped = False
+        self._constraints = None
+        self._limits = None
+        self.collider = None  # Set by collision.CollisionWorld.add
+
+    def reset(self, x, y):
+        """Back to the rest pose at (x, y), reusing every point and stick."""
+        for p, (dx, dy) in zip(self.points, REST_POSE):
+            p.x = p.old_x = x + dx
+            p.y = p.old_y = y + dy
+            p.locked = False
+        self.anchor.locked = True
+        if self.rope not in self.sticks:
+            self.sticks.insert(0, self.rope)
+        self._constraints = None
+        self.wrong_count = 0
+        self.sway_timer = 0
+        self.death_timer = 0
+        self.pop_progress[:] = [0.0] * 7
+        self.prev_wrong_count = 0
+        self.blood_particles.clear()
+        self.rope_snapped = False
+
+    def _bleed(self, count):
+        room = MAX_BLOOD_PARTICLES - len(self.blood_particles)
+        neck = self.points[NECK]
+        for _ in range(min(count, room)):
+            self.blood_particles.append(self.particle_class(neck.x, neck.y))
+
+    def update(self):
+        # Update Pop Animations
+        pop = self.pop_progress
+        for i in range(min(self.wrong_count + 1, len(pop))):
+            if pop[i] < 1.0:
+                pop[i] = min(pop[i] + 0.1, 1.0) # Fast pop
+                
+        # Update Blood
+        if self.blood_particles:
+            for b in self.blood_particles:
+                b.update()
+            self.blood_particles = [b for b in self.blood_particles if b.life > 0]
+                
+        # Death animation pulls the body before the solve, so what gets
+        # drawn already satisfies the constraints
+        self._animate_death()
+
+        # Constraints
+        # If part is not fully grown, maybe we should constrain it tightly to start? 
+        # No, let physics run, we just draw it growing.
+        if self.solver == 'xpbd':
+            # Substeps instead of iterations: each one integrates and
+            # solves once, which converges far faster than re-solving one
+            # large step (the "small steps" form of XPBD)
+            h = 1.0 / self.iterations
+            damping, gravity = DAMPING ** h, GRAVITY * h * h
+            for _ in range(self.iterations):
+                self._integrate(damping, gravity)
+                self._solve_xpbd(h)
+                if self.collider is not None:
+                    self.collider.collide(self)
+        else:
+            self._integrate(DAMPING, GRAVITY)
+            self._solve_pbd()
+            if self.collider is not None:
+                self.collider.collide(self)
+
+    def _integrate(self, damping, gravity):
+        # Physics (Verlet)
+        rope_snapped = self.rope_snapped
+        for p in self.points:
+            if not p.locked:
+                x, y = p.x, p.y
+                vx = (x - p.old_x) * damping
+                vy = (y - p.old_y) * damping
+                p.old_x, p.old_y = x, y
+                x += vx
+                y += vy + gravity
+                
+                # Floor collision if rope snapped
+                if rope_snapped and y > FLOOR_Y:
+                   y = FLOOR_Y
+                   x -= vx * 0.5 # Friction
+                p.x, p.y = x, y
+
+    def _inverse_mass(self, i):
+        p = self.points[i]
+        return 0.0 if p.locked else 1.0 / JOINT_MASS[i]
+
+    def _solve_pbd(self):
+        # Stick endpoints are cached as tuples; cleared when the stick list changes
+        hypot = math.hypot
+        constraints = self._constraints
+        if constraints is None:
+            constraints = self._constraints = [(s.p1, s.p2, s.length, not s.p1.locked, not s.p2.locked) for s in self.sticks]
+        for _ in range(self.iterations):
+            for p1, p2, length, move1, move2 in constraints:
+                x1, y1, x2, y2 = p1.x, p1.y, p2.x, p2.y
+                dx = x2 - x1
+                dy = y2 - y1
+                dist = hypot(dx, dy)
+                if dist == 0: continue
+                diff = (length - dist) / dist * 0.5
+                offset_x, offset_y = dx * diff, dy * diff
+                if move1:
+                    p1.x = x1 - offset_x
+                    p1.y = y1 - offset_y
+                if move2:
+                    p2.x = x2 + offset_x
+                    p2.y = y2 + offset_y
+
+    def _solve_xpbd(self, h):
+        """One extended position-based dynamics iteration for a substep of
+        h frames.
+
+        Each stick correction is weighted by the endpoints' inverse masses
+        and softened by its compliance, so compliant sticks stretch by the
+        same amount whatever the substep count, and joint limits are
+        enforced in the same pass.
+        """
+        constraints = self._constraints
+        if constraints is None:
+            index = {id(p): i for i, p in enumerate(self.points)}
+            constraints = self._constraints = []
+            for s in self.sticks:
+                w1 = self._inverse_mass(index[id(s.p1)])
+                w2 = self._inverse_mass(index[id(s.p2)])
+                if w1 + w2 > 0:
+                    constraints.append((s.p1, s.p2, s.length, w1, w2, s.compliance))
+            points = self.points
+            self._limits = [(points[a], points[o], points[b], lo, hi,
+                             [points[j] for j in moved if not points[j].locked])
+                            for a, o, b, lo, hi, moved in LIMIT_BOUNDS]
+        limits = self._limits
+        scale = 1.0 / (h * h)  # Compliance is per frame^2, alpha~ = compliance / dt^2
+
+        hypot, atan2, cos, sin = math.hypot, math.atan2, math.cos, math.sin
+        # A single iteration per substep, so the XPBD multiplier starts at
+        # zero every time and needs no storage
+        for p1, p2, length, w1, w2, compliance in constraints:
+            dx = p2.x - p1.x
+            dy = p2.y - p1.y
+            dist = hypot(dx, dy)
+            if dist == 0:
+                continue
+            dl = (length - dist) / (w1 + w2 + compliance * scale) / dist
+            dx *= dl
+            dy *= dl
+            p1.x -= w1 * dx
+            p1.y -= w1 * dy
+            p2.x += w2 * dx
+            p2.y += w2 * dy
+
+        # Joint limits, root to leaf: swing the child's subtree about the
+        # pivot back to the nearest bound. A rigid rotation leaves every
+        # stick length alone, and turning the parent side instead would
+        # swing the torso around an elbow
+        for a, o, b, lo, hi, moved in limits:
+            ox, oy = o.x, o.y
+            ux, uy = ox - a.x, oy - a.y
+            vx, vy = b.x - ox, b.y - oy
+            angle = atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+            if lo <= angle <= hi:
+                continue
+            # Nearest bound around the circle: a joint bent past 180 degrees
+            # wraps, and must not be swung back the long way round
+            to_lo = (lo - angle + math.pi) % TAU - math.pi
+            to_hi = (hi - angle + math.pi) % TAU - math.pi
+            turn = to_lo if abs(to_lo) < abs(to_hi) else to_hi
+            c, s = cos(turn), sin(turn)
+            for p in moved:
+                rx, ry = p.x - ox, p.y - oy
+                p.x = ox + rx * c - ry * s
+                p.y = oy + rx * s + ry * c
+                # Turn the previous position too: a limit redirects the
+                # motion, it mustn't kick the limb (or it fights the floor)
+                rx, ry = p.old_x - ox, p.old_y - oy
+                p.old_x = ox + rx * c - ry * s
+                p.old_y = oy + rx * s + ry * c
+
+        # Floor contact last, so limits can't leave a joint under it
+        if self.rope_snapped:
+            for p in self.points:
+                if p.y > FLOOR_Y:
+                    p.y = FLOOR_Y
+                    p.old_x += (p.x - p.old_x) * 0.5  # Friction
+
+    def _pull(self, p, dx, dy):
+        """Move a joint and give it that much velocity per frame, however
+        many substeps the frame is split into."""
+        keep = 1.0 - 1.0 / self.iterations if self.solver == 'xpbd' else 0.0
+        p.x += dx
+        p.y += dy
+        p.old_x += dx * keep
+        p.old_y += dy * keep
+
+    def _animate_death(self):
+        # Death Animation Logic
+        if self.wrong_count >= 6 and self.pop_progress[6] >= 1.0:
+            self.death_timer += 1
+            
+            # Phase 1: STRUGGLE & BLEED (~2 sec)
+            if self.death_timer < 120:
+                # Add blood spurts from neck
+                if random.random() < 0.3:
+                    self._bleed(1) # Neck
+                
+                # Hands reach up toward rope desperately
+                points, head = self.points, self.head
+                target_y = head.y - 10
+                self._pull(points[L_HAND], (head.x - 20 - points[L_HAND].x) * 0.03, (target_y - points[L_HAND].y) * 0.05)
+                self._pull(points[R_HAND], (head.x + 20 - points[R_HAND].x) * 0.03, (target_y - points[R_HAND].y) * 0.05)
+                
+                # Elbows bend up
+                self._pull(points[L_ELBOW], 0, (head.y + 10 - points[L_ELBOW].y) * 0.03)
+                self._pull(points[R_ELBOW], 0, (head.y + 10 - points[R_ELBOW].y) * 0.03)
+                
+                # Body trembles
+                if random.random() < 0.2: self._pull(head, random.choice([-1, 1]), 0)
+                
+            # Phase 2: ROPE SNAP & FALL
+            elif self.death_timer == 120:
+                self.rope_snapped = True
+                # Remove rope constraint
+                if self.rope in self.sticks:
+                    self.sticks.remove(self.rope)
+                self.head.locked = False # Ensure it falls
+                self._constraints = None
+                # Add MASSIVE blood burst
+                self._bleed(20)
+
+            # Phase 3: LYING DEAD
+            elif self.death_timer > 120:
+                # Just gravity taking over (handled in Verlet loop)
+                pass
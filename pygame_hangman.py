@@ -1,17 +1,18 @@
+import asyncio
 import pygame
-import math
 import sys
 import random
-import hashlib
-import base64
 import time
 
-try:
-    from cryptography.fernet import Fernet
-except ImportError:
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "cryptography"])
-    from cryptography.fernet import Fernet
+import physics
+from physics import L_HAND, R_HAND, L_FOOT, R_FOOT
+from collision import CollisionWorld, GALLOWS
+from crypto_utils import CryptoManager, ReplayGuard, TOKEN_TTL
+from adversary import AttackContext, Message, random_attack, receive
+from results import ResultsStore
+from journal import Journal
+from rooms import is_letter
+from telemetry import Telemetry
 
 # Initialize Pygame
 pygame.init()
@@ -34,80 +35,81 @@ TEXT_DIM = (50, 50, 55)        # Very dim
 ROPE_COLOR = (90, 70, 50)      # Dark hemp
 STICKMAN_COLOR = (180, 175, 170) # Pale gray/bone color
 
-# Fonts
-FONT_TITLE = pygame.font.SysFont('segoeui', 56, bold=True)
-FONT_HEADING = pygame.font.SysFont('segoeui', 36)
-FONT_BODY = pygame.font.SysFont('segoeui', 26)
-FONT_SMALL = pygame.font.SysFont('consolas', 18)
-FONT_WORD = pygame.font.SysFont('consolas', 60, bold=True)         
-
-# Physics Constants
-GRAVITY = 0.6
-DAMPING = 0.92  # slightly less damping for more swing
-
-# ================= CRYPTO UTILITIES =================
-class CryptoManager:
-    def __init__(self):
-        self.key = Fernet.generate_key()
-        self.cipher = Fernet(self.key)
-    
-    def encrypt(self, plaintext):
-        return self.cipher.encrypt(plaintext.encode('utf-8'))
-    
-    def decrypt(self, ciphertext):
-        return self.cipher.decrypt(ciphertext).decode('utf-8')
-    
-    @staticmethod
-    def generate_md5(text):
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
-    
-    @staticmethod
-    def verify_integrity(text, expected_hash):
-        return CryptoManager.generate_md5(text) == expected_hash
+# On-screen keyboard layout (draw_game and click hit-testing)
+KEY_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+KEY_ORIGIN = (450, 300)
+KEY_SIZE = 65
+KEY_STEP = 75
+KEYS_PER_ROW = 7
+
+# Only these events reach the queue; mouse motion is sampled once per frame
+ALLOWED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]
+HIT_CELL = 50
+
+# Async loop (run_async): input is polled this often between frames, a
+# tick later than this share of a frame counts as a missed deadline
+POLL_INTERVAL = 1 / 240
+MISS_TOLERANCE = 0.5
+STALL_FRAMES = 2  # run(): a frame taking this many frame times is a stall
+STATS_INTERVAL = 5.0  # Seconds between deadline miss reports
+
+# Internal render resolution as a fraction of the window's. Below 1 the
+# frame is drawn smaller and upscaled once (cheaper fill, softer image)
+RENDER_SCALE = 1.0
+SMOOTH_UPSCALE = False  # Bilinear instead of nearest-neighbour upscaling
+
+# Fonts (name, logical size, bold); loaded per render scale by the Viewport
+FONT_TITLE = ('segoeui', 56, True)
+FONT_HEADING = ('segoeui', 36, False)
+FONT_BODY = ('segoeui', 26, False)
+FONT_SMALL = ('consolas', 18, False)
+FONT_WORD = ('consolas', 60, True)
+
+# ================= LAYOUT =================
+# Layout, hit-testing and physics all work in logical units on a
+# WIDTH x HEIGHT canvas. A Viewport maps logical units to render pixels.
+class Viewport:
+    __slots__ = ('scale', 'size', '_fonts')
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.size = (max(1, round(WIDTH * scale)), max(1, round(HEIGHT * scale)))
+        self._fonts = {}
+
+    def pt(self, x, y):
+        s = self.scale
+        return (round(x * s), round(y * s))
+
+    def len(self, v):
+        """A length or line width; never thinner than one pixel."""
+        return max(1, round(v * self.scale))
+
+    def rect(self, r):
+        s = self.scale
+        return pygame.Rect(round(r.x * s), round(r.y * s), round(r.w * s), round(r.h * s))
+
+    def font(self, spec):
+        font = self._fonts.get(spec)
+        if font is None:
+            name, size, bold = spec
+            font = self._fonts[spec] = pygame.font.SysFont(name, self.len(size), bold=bold)
+        return font
 
 # ================= PHYSICS CLASSES =================
-class Point:
-    def __init__(self, x, y, locked=False):
-        self.x, self.y = x, y
-        self.old_x, self.old_y = x, y
-        self.locked = locked
-
-class Stick:
-    def __init__(self, p1, p2, length=None):
-        self.p1, self.p2 = p1, p2
-        if length is None:
-            self.length = math.hypot(p2.x - p1.x, p2.y - p1.y)
-        else:
-            self.length = length
-
-class BloodParticle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-3, 3)
-        self.vy = random.uniform(-1, 3)
-        self.size = random.uniform(2, 5)
-        self.color = (random.randint(180, 255), 0, 0) # Varied blood red
-        self.life = 255
-        
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.2  # Gravity
-        self.life -= 4
-        if self.y > 600: # Floor splatter
-            self.y = 600
-            self.vx *= 0.5
-            self.vy = 0
-
-    def draw(self, screen):
-        if self.life > 0:
-            s = pygame.Surface((int(self.size*2), int(self.size*2)), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*self.color, int(self.life)), (int(self.size), int(self.size)), int(self.size))
-            screen.blit(s, (int(self.x-self.size), int(self.y-self.size)))
+class BloodParticle(physics.BloodParticle):
+    __slots__ = ()
+
+    def draw(self, screen, view):
+        size = self.size * view.scale
+        if self.life > 0 and size >= 1:
+            s = pygame.Surface((int(size*2), int(size*2)), pygame.SRCALPHA)
+            pygame.draw.circle(s, (*self.color, int(self.life)), (int(size), int(size)), int(size))
+            screen.blit(s, (int(self.x*view.scale - size), int(self.y*view.scale - size)))
 
 # ================= UI COMPONENTS =================
 class Button:
+    __slots__ = ('rect', 'text', 'color', 'hover_color', 'action', 'is_hovered')
+
     def __init__(self, x, y, w, h, text, color, hover_color, action=None):
         self.rect = pygame.Rect(x, y, w, h)
         self.text = text
@@ -116,12 +118,13 @@ class Button:
         self.action = action
         self.is_hovered = False
 
-    def draw(self, screen):
+    def draw(self, screen, view):
         color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(screen, (10, 10, 10), self.rect.move(3, 3), border_radius=10)
-        pygame.draw.rect(screen, color, self.rect, border_radius=10)
-        txt_surf = FONT_BODY.render(self.text, True, TEXT_WHITE)
-        txt_rect = txt_surf.get_rect(center=self.rect.center)
+        rect = view.rect(self.rect)
+        pygame.draw.rect(screen, (10, 10, 10), rect.move(view.len(3), view.len(3)), border_radius=view.len(10))
+        pygame.draw.rect(screen, color, rect, border_radius=view.len(10))
+        txt_surf = view.font(FONT_BODY).render(self.text, True, TEXT_WHITE)
+        txt_rect = txt_surf.get_rect(center=rect.center)
         screen.blit(txt_surf, txt_rect)
 
     def check_hover(self, pos):
@@ -132,6 +135,11 @@ class Button:
             self.action()
 
 class InputBox:
+    __slots__ = (
+        'rect', 'color_inactive', 'color_active', 'color', 'text', 'font',
+        'active', 'is_password'
+    )
+
     def __init__(self, x, y, w, h, font, is_password=False):
         self.rect = pygame.Rect(x, y, w, h)
         self.color_inactive = TEXT_GRAY
@@ -156,251 +164,128 @@ class InputBox:
                 self.text += event.unicode.upper()
         return None
 
-    def draw(self, screen):
+    def draw(self, screen, view):
         display_text = '●' * len(self.text) if self.is_password else self.text
-        txt_surface = self.font.render(display_text, True, TEXT_WHITE)
-        pygame.draw.rect(screen, PANEL_BG, self.rect, border_radius=8)
-        pygame.draw.rect(screen, self.color, self.rect, 2, border_radius=8)
-        screen.blit(txt_surface, (self.rect.x + 15, self.rect.y + 10))
+        txt_surface = view.font(self.font).render(display_text, True, TEXT_WHITE)
+        rect = view.rect(self.rect)
+        pygame.draw.rect(screen, PANEL_BG, rect, border_radius=view.len(8))
+        pygame.draw.rect(screen, self.color, rect, view.len(2), border_radius=view.len(8))
+        screen.blit(txt_surface, (rect.x + view.len(15), rect.y + view.len(10)))
+
+def key_rect(i):
+    row, col = divmod(i, KEYS_PER_ROW)
+    return pygame.Rect(KEY_ORIGIN[0] + col * KEY_STEP, KEY_ORIGIN[1] + row * KEY_STEP, KEY_SIZE, KEY_SIZE)
+
+class HitGrid:
+    """Uniform grid over the screen so a click or hover test only checks one cell."""
+    __slots__ = ('cell', 'cells')
+
+    def __init__(self, cell=HIT_CELL):
+        self.cell = cell
+        self.cells = {}
+
+    def add(self, rect, target):
+        cell = self.cell
+        for cx in range(rect.left // cell, (rect.right - 1) // cell + 1):
+            for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+                self.cells.setdefault((cx, cy), []).append((rect, target))
+
+    def hit(self, pos):
+        for rect, target in self.cells.get((pos[0] // self.cell, pos[1] // self.cell), ()):
+            if rect.collidepoint(pos):
+                return target
+        return None
 
 # ================= PHYSICS SIMULATION =================
-class Ragdoll:
-    def __init__(self, x, y):
-        self.points = []
-        self.sticks = []
-        self.wrong_count = 0
-        
-        # Origin (Gallows anchor)
-        self.anchor = Point(x, y, locked=True)
-        self.points.append(self.anchor)
-        
-        # Head (Pivot)
-        head_x, head_y = x, y + 40
-        self.head = Point(head_x, head_y) # 1
-        self.points.append(self.head)
-        self.rope = Stick(self.anchor, self.head, length=40)
-        self.sticks.append(self.rope)
-        
-        # Neck
-        neck = Point(head_x, head_y + 25) # 2
-        self.points.append(neck)
-        self.sticks.append(Stick(self.head, neck)) # Head-Neck
-        
-        # Pelvis
-        pelvis = Point(head_x, head_y + 90) # 3
-        self.points.append(pelvis)
-        self.torso_stick = Stick(neck, pelvis)
-        self.sticks.append(self.torso_stick)
-        
-        # Arms
-        l_elbow = Point(head_x - 30, head_y + 40) # 4
-        l_hand = Point(head_x - 50, head_y + 60)  # 5
-        self.points.extend([l_elbow, l_hand])
-        self.l_arm_sticks = [Stick(neck, l_elbow), Stick(l_elbow, l_hand)]
-        self.sticks.extend(self.l_arm_sticks)
-
-        r_elbow = Point(head_x + 30, head_y + 40) # 6
-        r_hand = Point(head_x + 50, head_y + 60)  # 7
-        self.points.extend([r_elbow, r_hand])
-        self.r_arm_sticks = [Stick(neck, r_elbow), Stick(r_elbow, r_hand)]
-        self.sticks.extend(self.r_arm_sticks)
-        
-        # Legs
-        l_knee = Point(head_x - 15, head_y + 130) # 8
-        l_foot = Point(head_x - 15, head_y + 170) # 9
-        self.points.extend([l_knee, l_foot])
-        self.l_leg_sticks = [Stick(pelvis, l_knee), Stick(l_knee, l_foot)]
-        self.sticks.extend(self.l_leg_sticks)
-
-        r_knee = Point(head_x + 15, head_y + 130) # 10
-        r_foot = Point(head_x + 15, head_y + 170) # 11
-        self.points.extend([r_knee, r_foot])
-        self.r_leg_sticks = [Stick(pelvis, r_knee), Stick(r_knee, r_foot)]
-        self.sticks.extend(self.r_leg_sticks)
-        
-        self.sway_timer = 0
-        self.death_timer = 0
-        
-        # Pop/Growth Animation Progress (0.0 to 1.0) for each stage (0-6)
-        self.pop_progress = [0.0] * 7
-        self.prev_wrong_count = 0
-        
-        self.blood_particles = []
-        self.rope_snapped = False
-
-    def update(self):
-        # Update Pop Animations
-        for i in range(len(self.pop_progress)):
-            if i <= self.wrong_count and self.pop_progress[i] < 1.0:
-                self.pop_progress[i] += 0.1 # Fast pop
-                if self.pop_progress[i] > 1.0: self.pop_progress[i] = 1.0
-                
-        # Update Blood
-        for b in self.blood_particles[:]:
-            b.update()
-            if b.life <= 0:
-                self.blood_particles.remove(b)
-                
-        # Physics (Verlet)
-        for p in self.points:
-            if not p.locked:
-                vx = (p.x - p.old_x) * DAMPING
-                vy = (p.y - p.old_y) * DAMPING
-                p.old_x, p.old_y = p.x, p.y
-                p.x += vx
-                p.y += vy
-                p.y += GRAVITY
-                
-                # Floor collision if rope snapped
-                if self.rope_snapped and p.y > 600:
-                   p.y = 600
-                   p.x -= vx * 0.5 # Friction
-
-        # Constraints
-        for _ in range(5):
-            for s in self.sticks:
-                # If part is not fully grown, maybe we should constrain it tightly to start? 
-                # No, let physics run, we just draw it growing.
-                dx = s.p2.x - s.p1.x
-                dy = s.p2.y - s.p1.y
-                dist = math.hypot(dx, dy)
-                if dist == 0: continue
-                diff = (s.length - dist) / dist * 0.5
-                offset_x, offset_y = dx * diff, dy * diff
-                if not s.p1.locked:
-                    s.p1.x -= offset_x
-                    s.p1.y -= offset_y
-                if not s.p2.locked:
-                    s.p2.x += offset_x
-                    s.p2.y += offset_y
-                    
-        # Death Animation Logic
-        if self.wrong_count >= 6 and self.pop_progress[6] >= 1.0:
-            self.death_timer += 1
-            
-            # Phase 1: STRUGGLE & BLEED (~2 sec)
-            if self.death_timer < 120:
-                # Add blood spurts from neck
-                if random.random() < 0.3:
-                    self.blood_particles.append(BloodParticle(self.points[2].x, self.points[2].y)) # Neck
-                
-                # Hands reach up toward rope desperately
-                target_y = self.head.y - 10
-                self.points[5].y += (target_y - self.points[5].y) * 0.05
-                self.points[7].y += (target_y - self.points[7].y) * 0.05
-                self.points[5].x += (self.head.x - 20 - self.points[5].x) * 0.03
-                self.points[7].x += (self.head.x + 20 - self.points[7].x) * 0.03
-                
-                # Elbows bend up
-                self.points[4].y += (self.head.y + 10 - self.points[4].y) * 0.03
-                self.points[6].y += (self.head.y + 10 - self.points[6].y) * 0.03
-                
-                # Body trembles
-                if random.random() < 0.2: self.head.x += random.choice([-1, 1])
-                
-            # Phase 2: ROPE SNAP & FALL
-            elif self.death_timer == 120:
-                self.rope_snapped = True
-                # Remove rope constraint
-                if self.rope in self.sticks:
-                    self.sticks.remove(self.rope)
-                self.head.locked = False # Ensure it falls
-                # Add MASSIVE blood burst
-                for _ in range(20):
-                     self.blood_particles.append(BloodParticle(self.points[2].x, self.points[2].y))
-
-            # Phase 3: LYING DEAD
-            elif self.death_timer > 120:
-                # Just gravity taking over (handled in Verlet loop)
-                pass
-
-    def draw(self, screen, wrong_count):
+class Ragdoll(physics.Ragdoll):
+    particle_class = BloodParticle
+    __slots__ = ()
+
+    def draw(self, screen, view, wrong_count):
         self.wrong_count = wrong_count
+        pt, w = view.pt, view.len
         
         # Draw Blood
         for b in self.blood_particles:
-            b.draw(screen)
+            b.draw(screen, view)
             
         # Draw Rope (if not snapped)
+        anchor, head = self.anchor, self.head
         if not self.rope_snapped:
-             pygame.draw.line(screen, ROPE_COLOR, (self.anchor.x, self.anchor.y), (self.head.x, self.head.y), 3)
+             pygame.draw.line(screen, ROPE_COLOR, pt(anchor.x, anchor.y), pt(head.x, head.y), w(3))
         else:
              # Draw broken rope hanging from gallows
-             pygame.draw.line(screen, ROPE_COLOR, (self.anchor.x, self.anchor.y), (self.anchor.x, self.anchor.y + 80), 3)
+             pygame.draw.line(screen, ROPE_COLOR, pt(anchor.x, anchor.y), pt(anchor.x, anchor.y + 80), w(3))
              # Draw broken rope attached to head (falling)
-             pygame.draw.line(screen, ROPE_COLOR, (self.head.x, self.head.y), (self.head.x + 5, self.head.y - 30), 3)
+             pygame.draw.line(screen, ROPE_COLOR, pt(head.x, head.y), pt(head.x + 5, head.y - 30), w(3))
 
         # 1. Head (Pop Scale)
         if wrong_count >= 1:
             scale = self.pop_progress[1]
             if scale > 0:
-                radius = int(18 * scale)
-                pygame.draw.circle(screen, STICKMAN_COLOR, (int(self.head.x), int(self.head.y)), radius, 2)
+                radius = int(18 * scale * view.scale)
+                pygame.draw.circle(screen, STICKMAN_COLOR, pt(head.x, head.y), radius, w(2))
         
         # 2. Torso (Grow Down)
         if wrong_count >= 2:
-            self._draw_stick_growing(screen, self.torso_stick, self.pop_progress[2])
-            
-        # 3. Left Arm (Grow Out)
-        if wrong_count >= 3:
-            prog = self.pop_progress[3]
-            for s in self.l_arm_sticks: self._draw_stick_growing(screen, s, prog)
-            # Draw Hand
-            if prog > 0.8:
-                pygame.draw.circle(screen, STICKMAN_COLOR, (int(self.points[5].x), int(self.points[5].y)), 4)
-            
-        # 4. Right Arm (Grow Out)
-        if wrong_count >= 4:
-            prog = self.pop_progress[4]
-            for s in self.r_arm_sticks: self._draw_stick_growing(screen, s, prog)
-            # Draw Hand
-            if prog > 0.8:
-                pygame.draw.circle(screen, STICKMAN_COLOR, (int(self.points[7].x), int(self.points[7].y)), 4)
-            
-        # 5. Left Leg (Grow Down)
-        if wrong_count >= 5:
-            prog = self.pop_progress[5]
-            for s in self.l_leg_sticks: self._draw_stick_growing(screen, s, prog)
-            # Draw Foot
-            if prog > 0.8:
-                pygame.draw.circle(screen, STICKMAN_COLOR, (int(self.points[9].x), int(self.points[9].y)), 4)
-            
-        # 6. Right Leg (Grow Down)
-        if wrong_count >= 6:
-            prog = self.pop_progress[6]
-            for s in self.r_leg_sticks: self._draw_stick_growing(screen, s, prog)
-            # Draw Foot
+            self._draw_stick_growing(screen, view, self.torso_stick, self.pop_progress[2])
+        
+        # 3-6. Arms and legs (Grow Out / Down), then the hand or foot
+        for stage, sticks, end in ((3, self.l_arm_sticks, L_HAND), (4, self.r_arm_sticks, R_HAND),
+                                   (5, self.l_leg_sticks, L_FOOT), (6, self.r_leg_sticks, R_FOOT)):
+            if wrong_count < stage:
+                break
+            prog = self.pop_progress[stage]
+            for s in sticks: self._draw_stick_growing(screen, view, s, prog)
             if prog > 0.8:
-                pygame.draw.circle(screen, STICKMAN_COLOR, (int(self.points[11].x), int(self.points[11].y)), 4)
+                p = self.points[end]
+                pygame.draw.circle(screen, STICKMAN_COLOR, pt(p.x, p.y), w(4))
 
-    def _draw_stick_growing(self, screen, stick, progress):
+    def _draw_stick_growing(self, screen, view, stick, progress):
         if progress <= 0: return
-        start = (stick.p1.x, stick.p1.y)
+        start = view.pt(stick.p1.x, stick.p1.y)
         
         # Calculate grown end point
         end_x = stick.p1.x + (stick.p2.x - stick.p1.x) * progress
         end_y = stick.p1.y + (stick.p2.y - stick.p1.y) * progress
-        end = (end_x, end_y)
+        end = view.pt(end_x, end_y)
         
-        pygame.draw.line(screen, STICKMAN_COLOR, start, end, 4)
+        pygame.draw.line(screen, STICKMAN_COLOR, start, end, view.len(4))
 
 # ================= MAIN GAME CLASS =================
 class HangmanGame:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(TITLE)
+    def __init__(self, results=None, journal=None, recorder=None, screen=None,
+                 window_size=None, render_scale=RENDER_SCALE, telemetry=None):
+        if screen is None:
+            screen = pygame.display.set_mode(window_size or (WIDTH, HEIGHT))
+            pygame.display.set_caption(TITLE)
+        self.screen = screen  # Any surface; offline rendering passes its own
+        self.set_render_scale(render_scale)
         self.clock = pygame.time.Clock()
-        self.crypto = CryptoManager()
+        self.crypto = CryptoManager(ttl=TOKEN_TTL, replay_guard=ReplayGuard())
         
         self.state = "INTRO"
         self.ragdoll = Ragdoll(WIDTH//4, 100)  # Match gallows beam position
+        self.collisions = CollisionWorld()
+        self.collisions.add(self.ragdoll)
         
         self.word = ""
         self.encrypted_word = None
+        self.md5_hash = ""
+        self.received = None  # Message as it arrived after the channel
+        self.channel = AttackContext()  # What the simulated attacker has seen
         self.guessed = set()
         self.wrong_count = 0
         self.status_msg = "Waiting..."
         self.attack_detected = False
+        self.results = results
+        self.journal = journal
+        self.recorder = recorder
+        self.telemetry = telemetry
+        self.started_at = None
+        self.attack_name = None  # Attack applied to the word in transit, if any
+        self.word_set_clock = None  # perf_counter() at set_word, for telemetry
+        self.guess_clock = None  # perf_counter() at the last guess or game start
         
         # Clean UI
         self.input_box = InputBox(WIDTH//2 - 150, HEIGHT//2 - 20, 300, 50, FONT_HEADING, is_password=True)
@@ -410,36 +295,108 @@ class HangmanGame:
         self.btn_set = Button(WIDTH//2 - 120, HEIGHT//2 + 60, 240, 60, "ENCRYPT WORD", ACCENT, (255, 60, 60), self.set_word)
         self.btn_ready = Button(WIDTH//2 - 180, HEIGHT//2 + 100, 360, 70, "START GUESSING", SUCCESS, (20, 240, 120), self.start_guessing)
         self.btn_restart = Button(WIDTH - 220, HEIGHT - 100, 180, 60, "NEW GAME", DARK_BG, (30, 30, 30), self.reset_game)
+        
+        # Clickable widgets per screen; key tiles map to their letter
+        self.key_rects = [key_rect(i) for i in range(len(KEY_LETTERS))]
+        self.hit_grids = {state: HitGrid() for state in ("INTRO", "SET_WORD", "TRANSITION", "GUESSING", "GAME_OVER")}
+        self.hit_grids["SET_WORD"].add(self.btn_set.rect, self.btn_set)
+        self.hit_grids["TRANSITION"].add(self.btn_ready.rect, self.btn_ready)
+        for state in ("GUESSING", "GAME_OVER"):
+            for char, rect in zip(KEY_LETTERS, self.key_rects):
+                self.hit_grids[state].add(rect, char)
+        self.hit_grids["GAME_OVER"].add(self.btn_restart.rect, self.btn_restart)
+        self.hovered = None
+        
+        # Pick up a game that was in progress when the last run died
+        if journal:
+            saved = journal.restore().get(0)
+            if saved and saved.sealed_key is not None:
+                journal.restore_into(self, saved, self.crypto.replay_guard)
+                self.started_at = time.time()
+                self.guess_clock = time.perf_counter()
+
+    def set_render_scale(self, render_scale):
+        """Fit the logical canvas into the screen (letterboxed) and draw at
+        render_scale of that size."""
+        sw, sh = self.screen.get_size()
+        self.fit = min(sw / WIDTH, sh / HEIGHT)
+        self.frame_rect = pygame.Rect(0, 0, round(WIDTH * self.fit), round(HEIGHT * self.fit))
+        self.frame_rect.center = (sw // 2, sh // 2)
+        self.screen.fill((0, 0, 0))
+        self.frame = self.screen.subsurface(self.frame_rect)
+        self.view = Viewport(self.fit * render_scale)
+        if self.view.size == self.frame_rect.size:
+            self.canvas = self.frame  # Native resolution: draw straight into the window
+        else:
+            self.canvas = pygame.Surface(self.view.size, 0, self.screen)
 
     def reset_game(self):
+        if self.crypto.ttl is None:
+            # Restored from the journal without a TTL: only for that game
+            self.crypto = CryptoManager(ttl=TOKEN_TTL, replay_guard=self.crypto.replay_guard)
         self.state = "SET_WORD"
         self.word = ""
         self.guessed = set()
         self.wrong_count = 0
-        self.ragdoll = Ragdoll(WIDTH//4, 100)
+        self.ragdoll.reset(WIDTH//4, 100)
         self.input_box.text = ""
         self.input_box.active = True
         self.attack_detected = False
+        self.attack_name = self.word_set_clock = self.guess_clock = None
         self.status_msg = "Player 1: Enter Secret Word"
+        if self.journal:
+            # A new game is a good point to compact the journal
+            self.journal.snapshot({0: self})
 
     def set_word(self):
         text = self.input_box.text.strip().upper()
         if len(text) > 1 and text.isalpha():
             self.word = text
             self.encrypted_word = self.crypto.encrypt(text)
+            self.md5_hash = self.crypto.digest(text)
             self.state = "TRANSITION"
             self.status_msg = "Word Encrypted!"
+            
+            # Simulated attacker tampers with the data in transit
+            sent = Message(self.encrypted_word, self.md5_hash)
+            self.received = sent
+            self.attack_name = None
             if random.random() < 0.2:
-                self.attack_detected = True
+                attack = random_attack()
+                self.attack_name = attack.name
+                self.received = attack.apply(sent, self.channel)
+            self.word_set_clock = time.perf_counter()
+            self.channel.history.append(sent)
+            if self.journal:
+                self.journal.word_set(0, self)
 
     def start_guessing(self):
         self.state = "GUESSING"
+        self.started_at = time.time()
+        
+        # Player 2's side verifies what actually arrived. An attack that
+        # slips through (e.g. a replayed token) changes the word in play.
+        text = receive(self.crypto, self.received)
+        self.attack_detected = text is None
+        if text is not None:
+            self.word = text
+        
         self.status_msg = "Integrity OK - Start Guessing!"
         if self.attack_detected:
             self.status_msg = "⚠️ INTEGRITY BREACH!"
+        if self.journal:
+            self.journal.start(0, self.attack_detected)
+        if self.telemetry:
+            now = self.guess_clock = time.perf_counter()
+            if self.word_set_clock is not None:
+                self.telemetry.integrity(now - self.word_set_clock, not self.attack_detected)
+            if self.attack_name:
+                self.telemetry.attack(self.attack_name, self.attack_detected)
 
     def handle_guess(self, char):
-        if char in self.guessed or self.state != "GUESSING":
+        # Keys like 'É' or 'ß' (upper-cased to 'SS') are not on the keyboard
+        # and cannot be journaled: ignore them
+        if not is_letter(char) or char in self.guessed or self.state != "GUESSING":
             return
         self.guessed.add(char)
         if char not in self.word:
@@ -447,53 +404,77 @@ class HangmanGame:
             if self.wrong_count >= 6:
                 self.state = "GAME_OVER"
                 self.status_msg = "DEFEAT - Player 1 Wins!"
+                self.record_result(won=False)
         else:
             if all(c in self.guessed for c in self.word):
                 self.state = "GAME_OVER"
                 self.status_msg = "VICTORY - Player 2 Wins!"
+                self.record_result(won=True)
+        if self.journal:
+            self.journal.guess(0, char, self.wrong_count, self.state)
+        if self.telemetry and self.guess_clock is not None:
+            now = time.perf_counter()
+            self.telemetry.guess(now - self.guess_clock, char, char in self.word)
+            self.guess_clock = now
+
+    def record_result(self, won):
+        if self.results:
+            self.results.record(
+                "Player 2", len(self.word), len(self.guessed), self.wrong_count,
+                time.time() - self.started_at, won, self.attack_detected
+            )
+
+    def update_physics(self):
+        # Simulation runs before drawing so draw_game only reads state
+        if self.state in ["GUESSING", "GAME_OVER"]:
+            self.ragdoll.wrong_count = self.wrong_count
+            self.ragdoll.update()
+            self.collisions.step()
+
+    def blit_centered(self, surf, y):
+        """Blit horizontally centred at logical height y."""
+        self.canvas.blit(surf, surf.get_rect(midtop=self.view.pt(WIDTH//2, y)))
 
     def draw_intro(self):
-        title = FONT_TITLE.render("HANGMAN", True, TEXT_WHITE)
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, 200))
-        sub = FONT_BODY.render("Secure Communication Demo", True, TEXT_GRAY)
-        self.screen.blit(sub, (WIDTH//2 - sub.get_width()//2, 280))
-        start = FONT_HEADING.render("Press SPACE to Start", True, ACCENT)
-        self.screen.blit(start, (WIDTH//2 - start.get_width()//2, 400))
+        font = self.view.font
+        self.blit_centered(font(FONT_TITLE).render("HANGMAN", True, TEXT_WHITE), 200)
+        self.blit_centered(font(FONT_BODY).render("Secure Communication Demo", True, TEXT_GRAY), 280)
+        self.blit_centered(font(FONT_HEADING).render("Press SPACE to Start", True, ACCENT), 400)
 
     def draw_set_word(self):
-        title = FONT_HEADING.render("PLAYER 1: Set Secret Word", True, ACCENT)
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//2 - 100))
-        self.input_box.draw(self.screen)
-        self.btn_set.draw(self.screen)
-        note = FONT_SMALL.render("(Input hidden for security)", True, TEXT_GRAY)
-        self.screen.blit(note, (WIDTH//2 - note.get_width()//2, HEIGHT//2 + 130))
+        font = self.view.font
+        self.blit_centered(font(FONT_HEADING).render("PLAYER 1: Set Secret Word", True, ACCENT), HEIGHT//2 - 100)
+        self.input_box.draw(self.canvas, self.view)
+        self.btn_set.draw(self.canvas, self.view)
+        note = font(FONT_SMALL).render("(Input hidden for security)", True, TEXT_GRAY)
+        self.blit_centered(note, HEIGHT//2 + 130)
 
     def draw_transition(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT))
+        overlay = pygame.Surface(self.view.size)
         overlay.set_alpha(220)
         overlay.fill(DARK_BG)
-        self.screen.blit(overlay, (0, 0))
-        warn = FONT_TITLE.render("PLAYER 1 LOOK AWAY!", True, ACCENT)
-        self.screen.blit(warn, (WIDTH//2 - warn.get_width()//2, HEIGHT//2 - 80))
-        self.btn_ready.draw(self.screen)
+        self.canvas.blit(overlay, (0, 0))
+        self.blit_centered(self.view.font(FONT_TITLE).render("PLAYER 1 LOOK AWAY!", True, ACCENT), HEIGHT//2 - 80)
+        self.btn_ready.draw(self.canvas, self.view)
 
     def draw_game(self):
+        screen, view = self.canvas, self.view
+        pt, w, font = view.pt, view.len, view.font
+        
         # 1. Left Side: Gallows (dark wood look)
-        pygame.draw.line(self.screen, GALLOWS_COLOR, (40, 620), (320, 620), 8)  # Base
-        pygame.draw.line(self.screen, GALLOWS_COLOR, (80, 620), (80, 80), 6)    # Pole
-        pygame.draw.line(self.screen, GALLOWS_COLOR, (80, 80), (WIDTH//4, 80), 6) # Top beam
-        pygame.draw.line(self.screen, GALLOWS_COLOR, (80, 140), (140, 80), 4)   # Support
+        # Base, pole, top beam and support; the same segments collide
+        for x1, y1, x2, y2, thickness in GALLOWS:
+            pygame.draw.line(screen, GALLOWS_COLOR, pt(x1, y1), pt(x2, y2), w(thickness))
         # Noose hint (always visible)
-        pygame.draw.line(self.screen, ROPE_COLOR, (WIDTH//4, 80), (WIDTH//4, 100), 3) 
+        pygame.draw.line(screen, ROPE_COLOR, pt(WIDTH//4, 80), pt(WIDTH//4, 100), w(3))
         
-        self.ragdoll.update()
-        self.ragdoll.draw(self.screen, self.wrong_count)
+        self.ragdoll.draw(screen, view, self.wrong_count)
         
         # 2. Right Side: UI
         # Status
         status_col = ACCENT if "BREACH" in self.status_msg else TEXT_GRAY
-        status_surf = FONT_BODY.render(f"STATUS: {self.status_msg}", True, status_col)
-        self.screen.blit(status_surf, (450, 50))
+        status_surf = font(FONT_BODY).render(f"STATUS: {self.status_msg}", True, status_col)
+        screen.blit(status_surf, pt(450, 50))
         
         # Word
         display_word = []
@@ -504,18 +485,13 @@ class HangmanGame:
                 display_word.append("_")
         
         word_txt = "  ".join(display_word)
-        word_surf = FONT_WORD.render(word_txt, True, TEXT_WHITE)
-        self.screen.blit(word_surf, (450, 150))
+        word_surf = font(FONT_WORD).render(word_txt, True, TEXT_WHITE)
+        screen.blit(word_surf, pt(450, 150))
         
         # Keyboard
-        start_x, start_y = 450, 300
-        letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-        for i, char in enumerate(letters):
-            row = i // 7
-            col = i % 7
-            x = start_x + col * 75
-            y = start_y + row * 75
-            
+        key_font = font(FONT_HEADING)
+        for char, key in zip(KEY_LETTERS, self.key_rects):
+            rect = view.rect(key)
             # Button Colors
             bg_col = (15, 15, 15)
             border_col = (40, 40, 40)
@@ -532,86 +508,277 @@ class HangmanGame:
                     txt_col = (150, 50, 50)
             
             # Draw Key
-            rect = pygame.Rect(x, y, 65, 65)
-            pygame.draw.rect(self.screen, bg_col, rect, border_radius=12)
-            pygame.draw.rect(self.screen, border_col, rect, 2, border_radius=12)
+            pygame.draw.rect(screen, bg_col, rect, border_radius=w(12))
+            pygame.draw.rect(screen, border_col, rect, w(2), border_radius=w(12))
             
-            char_surf = FONT_HEADING.render(char, True, txt_col)
+            char_surf = key_font.render(char, True, txt_col)
             char_rect = char_surf.get_rect(center=rect.center)
-            self.screen.blit(char_surf, char_rect)
+            screen.blit(char_surf, char_rect)
             
         if self.state == "GAME_OVER":
             if self.wrong_count >= 6:
-                t = FONT_TITLE.render("DEFEAT", True, ACCENT)
-                st = FONT_BODY.render(f"Word was: {self.word}", True, TEXT_WHITE)
+                t = font(FONT_TITLE).render("DEFEAT", True, ACCENT)
+                st = font(FONT_BODY).render(f"Word was: {self.word}", True, TEXT_WHITE)
                 
                 # Draw "Dying in Regret" text maybe? Or keep it subtle
-                regret_txt = FONT_SMALL.render("The stickman perished in despair...", True, (100, 50, 50))
-                self.screen.blit(regret_txt, (100, 50)) # near gallows
+                regret_txt = font(FONT_SMALL).render("The stickman perished in despair...", True, (100, 50, 50))
+                screen.blit(regret_txt, pt(100, 50)) # near gallows
             else:
-                t = FONT_TITLE.render("VICTORY", True, SUCCESS)
-                st = FONT_BODY.render("Encryption Verified", True, TEXT_GRAY)
-
-            self.screen.blit(t, (450, 600))
-            self.screen.blit(st, (450, 660))
-            self.btn_restart.draw(self.screen)
-
-    def run(self):
+                t = font(FONT_TITLE).render("VICTORY", True, SUCCESS)
+                st = font(FONT_BODY).render("Encryption Verified", True, TEXT_GRAY)
+
+            screen.blit(t, pt(450, 600))
+            screen.blit(st, pt(450, 660))
+            self.btn_restart.draw(screen, view)
+
+    def update_hover(self, pos):
+        target = self.hit_grids[self.state].hit(pos)
+        if target is not self.hovered:
+            if isinstance(self.hovered, Button):
+                self.hovered.is_hovered = False
+            if isinstance(target, Button):
+                target.is_hovered = True
+            self.hovered = target
+
+    def handle_click(self, pos):
+        target = self.hit_grids[self.state].hit(pos)
+        if isinstance(target, Button):
+            target.click()
+        elif target is not None:
+            self.handle_guess(target)
+
+    def seed(self, seed):
+        """Make every random choice of the game (attacks, blood) repeatable."""
+        random.seed(seed)
+        self.channel.rng.seed(seed)
+
+    def step(self, events, mouse_pos):
+        """One frame of input and simulation; False once the window is closed."""
         running = True
-        while running:
-            pos = pygame.mouse.get_pos()
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
             
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
+            # Global Keyboard Handling for Game Logic
+            elif event.type == pygame.KEYDOWN:
+                if self.state == "INTRO" and event.key == pygame.K_SPACE:
+                    self.reset_game()
                 
-                # Global Keyboard Handling for Game Logic
-                if event.type == pygame.KEYDOWN:
-                    if self.state == "INTRO" and event.key == pygame.K_SPACE:
-                        self.reset_game()
-                    
-                    elif self.state == "GUESSING":
-                        if event.unicode.isalpha():
-                            self.handle_guess(event.unicode.upper())
+                elif self.state == "GUESSING":
+                    if event.unicode.isalpha():
+                        self.handle_guess(event.unicode.upper())
                 
-                # UI Event Handling
-                if self.state == "SET_WORD":
-                    res = self.input_box.handle_event(event)
-                    if res: # Enter presesd
+                elif self.state == "SET_WORD":
+                    if self.input_box.handle_event(event): # Enter pressed
                         self.set_word()
-                    self.btn_set.check_hover(pos)
-                    if event.type == pygame.MOUSEBUTTONDOWN and self.btn_set.is_hovered:
-                        self.btn_set.click()
-                
-                elif self.state == "TRANSITION":
-                    self.btn_ready.check_hover(pos)
-                    if event.type == pygame.MOUSEBUTTONDOWN and self.btn_ready.is_hovered:
-                        self.btn_ready.click()
-                
-                elif self.state == "GAME_OVER":
-                    self.btn_restart.check_hover(pos)
-                    if event.type == pygame.MOUSEBUTTONDOWN and self.btn_restart.is_hovered:
-                        self.btn_restart.click()
             
-            # Drawing
-            self.screen.fill(DARK_BG)
-            
-            if self.state == "INTRO":
-                self.draw_intro()
-            elif self.state == "SET_WORD":
-                self.draw_set_word()
-            elif self.state == "TRANSITION":
-                self.draw_set_word() # Keep BG
-                self.draw_transition() # Overlay
-            elif self.state in ["GUESSING", "GAME_OVER"]:
-                self.draw_game()
-                
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if self.state == "SET_WORD":
+                    self.input_box.handle_event(event)
+                self.handle_click(event.pos)
+        
+        # One hover test per frame, however much the mouse moved
+        self.update_hover(mouse_pos)
+        
+        self.update_physics()
+        return running
+
+    def render(self):
+        self.canvas.fill(DARK_BG)
+        
+        if self.state == "INTRO":
+            self.draw_intro()
+        elif self.state == "SET_WORD":
+            self.draw_set_word()
+        elif self.state == "TRANSITION":
+            self.draw_set_word() # Keep BG
+            self.draw_transition() # Overlay
+        elif self.state in ["GUESSING", "GAME_OVER"]:
+            self.draw_game()
+        
+        # One scaling pass per frame when not drawing at window resolution
+        if self.canvas is not self.frame:
+            scale = pygame.transform.smoothscale if SMOOTH_UPSCALE else pygame.transform.scale
+            scale(self.canvas, self.frame.get_size(), self.frame)
+
+    def to_logical(self, pos):
+        """Window pixel -> logical units."""
+        return (int((pos[0] - self.frame_rect.x) / self.fit), int((pos[1] - self.frame_rect.y) / self.fit))
+
+    def poll_input(self):
+        """Queued events and the mouse position, in logical units."""
+        # Input is converted to logical units, so recordings and
+        # hit-testing don't depend on the window size
+        events = pygame.event.get()
+        for i, event in enumerate(events):
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                events[i] = pygame.event.Event(event.type, {**event.dict, 'pos': self.to_logical(event.pos)})
+        return events, self.to_logical(pygame.mouse.get_pos())
+
+    def close(self):
+        if self.results:
+            self.results.close()
+        if self.journal:
+            self.journal.close()
+        if self.recorder:
+            self.recorder.save()
+        if self.telemetry:
+            self.telemetry.close()
+        pygame.quit()
+
+    def run(self):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(ALLOWED_EVENTS)
+        if self.recorder:
+            self.recorder.start(self)
+        running = True
+        while running:
+            events, mouse_pos = self.poll_input()
+            if self.recorder:
+                self.recorder.capture(events, mouse_pos)
+            running = self.step(events, mouse_pos)
+            self.render()
             pygame.display.flip()
-            self.clock.tick(FPS)
+            elapsed = self.clock.tick(FPS) / 1000
+            if self.telemetry and elapsed > STALL_FRAMES / FPS:
+                self.telemetry.stall(elapsed - 1 / FPS, int(elapsed * FPS) - 1)
             
-        pygame.quit()
+        self.close()
         sys.exit()
 
+    # ================= ASYNC LOOP =================
+    # The same frame as run(), split into tasks on one asyncio event loop:
+    # input polling, a fixed-rate physics tick and rendering. Network
+    # reads, journal flushes or crypto offloads passed in as `background`
+    # share the loop and only run while the frame tasks are sleeping.
+    async def run_async(self, background=(), fps=FPS):
+        """Play until the window closes. `background` holds coroutine
+        functions taking the game; they are cancelled on exit."""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(ALLOWED_EVENTS)
+        if self.recorder:
+            self.recorder.start(self)
+        self.frame_stats = FrameStats(1 / fps, self.telemetry)
+        self._events = []
+        self._ticked = asyncio.Event()
+        self._stopped = asyncio.Event()
+        tasks = [asyncio.create_task(self._poll_task(), name="poll"),
+                 asyncio.create_task(self._tick_task(1 / fps), name="tick"),
+                 asyncio.create_task(self._render_task(), name="render")]
+        tasks += [asyncio.create_task(job(self)) for job in background]
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.frame_stats.report(final=True)
+            self.close()
+
+    def offload(self, func, *args):
+        """Await blocking work (crypto, disk) on a thread, not the loop."""
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _poll_task(self):
+        # Drains the OS queue more often than frames are drawn, so input
+        # arriving during a long background step isn't held up a frame
+        while True:
+            events, self._mouse_pos = self.poll_input()
+            self._events += events
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def _tick_task(self, period):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            # Input that arrived since the last poll counts for this frame
+            events, self._mouse_pos = self.poll_input()
+            events = self._events + events
+            self._events = []
+            if self.recorder:
+                self.recorder.capture(events, self._mouse_pos)
+            if not self.step(events, self._mouse_pos):
+                self._stopped.set()
+                return
+            self._ticked.set()
+
+            deadline += period
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            late = loop.time() - deadline
+            self.frame_stats.woke(late)
+            if late > period:
+                # A frame or more behind: drop the lost ticks instead of
+                # running them back to back
+                deadline = loop.time()
+
+    async def _render_task(self):
+        while True:
+            await self._ticked.wait()
+            self._ticked.clear()
+            self.render()
+            pygame.display.flip()
+            self.frame_stats.frames += 1
+
+
+class FrameStats:
+    """Frame deadline misses, reported every STATS_INTERVAL seconds."""
+
+    def __init__(self, period, telemetry=None):
+        self.period = period
+        self.telemetry = telemetry
+        self.frames = 0
+        self.misses = 0
+        self.dropped = 0      # Ticks skipped to catch up
+        self.worst = 0.0      # Largest lateness seen, in seconds
+        self._since = time.monotonic()
+        self._reported = 0
+
+    def woke(self, late):
+        """A tick woke `late` seconds after its deadline."""
+        if late > self.period * MISS_TOLERANCE:
+            self.misses += 1
+            self.dropped += int(late // self.period)
+            self.worst = max(self.worst, late)
+            if self.telemetry:
+                self.telemetry.stall(late, int(late // self.period))
+        self.report()
+
+    def report(self, final=False):
+        now = time.monotonic()
+        if not final and now - self._since < STATS_INTERVAL:
+            return
+        if self.misses > self._reported or final:
+            print(f"Frames: {self.frames}, deadline misses: {self.misses} "
+                  f"({self.dropped} ticks dropped, worst {self.worst * 1000:.1f} ms late)")
+        self._since = now
+        self._reported = self.misses
+
+
 if __name__ == "__main__":
-    game = HangmanGame()
-    game.run()
+    recorder = journal = results = telemetry = None
+    if "--results" in sys.argv:
+        results = ResultsStore(sys.argv[sys.argv.index("--results") + 1])
+    if "--telemetry" in sys.argv:
+        telemetry = Telemetry(sys.argv[sys.argv.index("--telemetry") + 1])
+    if "--record" in sys.argv:
+        # No journal: a restored game could not be replayed from the recording
+        if "--journal" in sys.argv:
+            sys.exit("--record and --journal cannot be combined")
+        from render import Recorder
+        recorder = Recorder(sys.argv[sys.argv.index("--record") + 1])
+    if "--journal" in sys.argv:
+        journal = Journal(sys.argv[sys.argv.index("--journal") + 1])
+    # --window 3840x2160 for wall displays, --render-scale 0.5 for weak kiosks
+    window_size = None
+    if "--window" in sys.argv:
+        window_size = tuple(int(v) for v in sys.argv[sys.argv.index("--window") + 1].split('x'))
+    render_scale = RENDER_SCALE
+    if "--render-scale" in sys.argv:
+        render_scale = float(sys.argv[sys.argv.index("--render-scale") + 1])
+    game = HangmanGame(results=results, journal=journal, recorder=recorder,
+                       window_size=window_size, render_scale=render_scale,
+                       telemetry=telemetry)
+    if "--async" in sys.argv:
+        asyncio.run(game.run_async())
+    else:
+        game.run()
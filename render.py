@@ -0,0 +1,270 @@
+# Offline rendering of recorded games to image sequences
+#
+# A recording is the seed plus the input of every frame (events and mouse
+# position). Replaying it through HangmanGame.step()/render() on an
+# off-screen surface reproduces live play exactly, so highlight clips of
+# the death sequence can be rendered without a display.
+#
+# Frames are split into contiguous ranges, one per worker process. Each
+# worker fast-forwards the simulation to the start of its range without
+# drawing, then renders its frames and hands them to a background writer
+# thread, so PNG encoding and disk writes overlap with drawing.
+#
+# Usage: python pygame_hangman.py --record game.json   (play and record)
+#        python render.py game.json frames/ [workers]  (numbered PNGs)
+#        python render.py game.json - [workers] | ffmpeg -f rawvideo \
+#            -pix_fmt rgb24 -s 1000x700 -r 60 -i - clip.mp4
+#
+# Recordings contain every key pressed, including the secret word.
+
+import json
+import os
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+# ============== CONFIGURATION ==============
+EVENT_FIELDS = ('key', 'unicode', 'mod', 'pos', 'button')
+WRITE_QUEUE = 16  # Frames a worker may render ahead of its writer
+COPY_CHUNK = 1 << 20
+
+
+# ============== RECORDING ==============
+def encode_event(event):
+    return [event.type, {k: getattr(event, k) for k in EVENT_FIELDS if hasattr(event, k)}]
+
+
+def decode_event(data):
+    kind, attrs = data
+    if 'pos' in attrs:
+        attrs['pos'] = tuple(attrs['pos'])
+    return pygame.event.Event(kind, attrs)
+
+
+class Recorder:
+    """Captures a live game's per-frame input; pass as HangmanGame(recorder=...)."""
+
+    def __init__(self, path, seed=None):
+        self.path = path
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.frame = 0
+        self.inputs = []  # [frame, mouse_x, mouse_y, events], only when something changed
+        self._last_pos = None
+
+    def start(self, game):
+        game.seed(self.seed)
+
+    def capture(self, events, mouse_pos):
+        encoded = [encode_event(e) for e in events]
+        if encoded or mouse_pos != self._last_pos:
+            self.inputs.append([self.frame, mouse_pos[0], mouse_pos[1], encoded])
+            self._last_pos = mouse_pos
+        self.frame += 1
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump({'seed': self.seed, 'frames': self.frame, 'inputs': self.inputs}, f)
+
+
+class Recording:
+    def __init__(self, seed, frames, inputs):
+        self.seed = seed
+        self.frames = frames
+        self.inputs = inputs
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['seed'], data['frames'], data['inputs'])
+
+    def __iter__(self):
+        """(events, mouse_pos) for every frame."""
+        pending = iter(self.inputs)
+        nxt = next(pending, None)
+        mouse_pos = (0, 0)
+        for frame in range(self.frames):
+            events = []
+            if nxt is not None and nxt[0] == frame:
+                mouse_pos = (nxt[1], nxt[2])
+                events = [decode_event(e) for e in nxt[3]]
+                nxt = next(pending, None)
+            yield events, mouse_pos
+
+
+# ============== WORKER ==============
+class FrameWriter:
+    """Background thread that writes rendered frames in order."""
+
+    def __init__(self, target, raw):
+        self.target = target
+        self.raw = raw
+        self.frames = queue.Queue(maxsize=WRITE_QUEUE)
+        self._file = open(target, 'wb') if raw else None
+        self._thread = threading.Thread(target=self._write_loop, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, number, surface):
+        if self.raw:
+            self.frames.put((number, pygame.image.tobytes(surface, 'RGB')))
+        else:
+            self.frames.put((number, surface.copy()))
+
+    def _write_loop(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                break
+            number, frame = item
+            if self.raw:
+                self._file.write(frame)
+            else:
+                pygame.image.save(frame, os.path.join(self.target, f"frame_{number:06d}.png"))
+
+    def close(self):
+        self.frames.put(None)
+        self._thread.join()
+        if self._file:
+            self._file.close()
+
+
+def render_range(recording_path, start, stop, target, raw):
+    """Worker: simulate frames [0, stop), draw and write frames [start, stop)."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame_hangman
+
+    recording = Recording.load(recording_path)
+    surface = pygame.Surface((pygame_hangman.WIDTH, pygame_hangman.HEIGHT))
+    game = pygame_hangman.HangmanGame(screen=surface)
+    game.seed(recording.seed)
+    writer = FrameWriter(target, raw)
+    try:
+        for frame, (events, mouse_pos) in enumerate(recording):
+            if frame >= stop:
+                break
+            game.step(events, mouse_pos)
+            if frame >= start:
+                game.render()
+                writer.put(frame, surface)
+    finally:
+        writer.close()
+    return stop - start
+
+
+# ============== RENDERER ==============
+def split(frames, parts):
+    bounds = [frames * i // parts for i in range(parts + 1)]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def render(recording_path, output, workers=None):
+    """Render every frame to numbered PNGs in `output`, or raw RGB to a file
+    ('-' for stdout) when `output` ends in .rgb or is '-'."""
+    workers = workers or os.cpu_count() or 1
+    frames = Recording.load(recording_path).frames
+    raw = output == '-' or output.endswith('.rgb')
+    ranges = split(frames, workers)
+
+    parts_dir = None
+    if raw:
+        parts_dir = tempfile.mkdtemp()
+        targets = [os.path.join(parts_dir, f"part{i}.rgb") for i in range(len(ranges))]
+    else:
+        os.makedirs(output, exist_ok=True)
+        targets = [output] * len(ranges)
+
+    try:
+        with ProcessPoolExecutor(len(ranges), mp_context=mp.get_context('spawn')) as pool:
+            futures = [pool.submit(render_range, recording_path, a, b, t, raw)
+                       for (a, b), t in zip(ranges, targets)]
+            if not raw:
+                return sum(f.result() for f in futures)
+            # Stream each part as soon as it and everything before it is done
+            out = sys.stdout.buffer if output == '-' else open(output, 'wb')
+            try:
+                for future, part in zip(futures, targets):
+                    future.result()
+                    with open(part, 'rb') as f:
+                        shutil.copyfileobj(f, out, COPY_CHUNK)
+            finally:
+                if out is not sys.stdout.buffer:
+                    out.close()
+            return frames
+    finally:
+        if parts_dir:
+            shutil.rmtree(parts_dir)
+
+
+# ============== DEMO ==============
+def _scripted_game(path, seed=7):
+    """Play a losing game live (off-screen) while recording it.
+
+    Returns one RGB frame per loop iteration, as live play drew them.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame_hangman
+    KEYDOWN, CLICK = pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN
+
+    script = {5: [(KEYDOWN, {'key': pygame.K_SPACE, 'unicode': ' ', 'mod': 0})]}
+    frame = 10
+    for char in "GALLOWS":
+        script[frame] = [(KEYDOWN, {'key': ord(char.lower()), 'unicode': char.lower(), 'mod': 0})]
+        frame += 3
+    script[frame] = [(KEYDOWN, {'key': pygame.K_RETURN, 'unicode': '\r', 'mod': 0})]
+    surface = pygame.Surface((pygame_hangman.WIDTH, pygame_hangman.HEIGHT))
+    game = pygame_hangman.HangmanGame(screen=surface, recorder=Recorder(path, seed))
+    script[frame + 20] = [(CLICK, {'pos': game.btn_ready.rect.center, 'button': 1})]
+    frame += 40
+    for char in "AZQXJKV":
+        script[frame] = [(KEYDOWN, {'key': ord(char.lower()), 'unicode': char.lower(), 'mod': 0})]
+        frame += 25
+    total = frame + 240  # Struggle, rope snap and the fall
+
+    live = []
+    game.recorder.start(game)
+    for n in range(total):
+        events = [pygame.event.Event(kind, attrs) for kind, attrs in script.get(n, [])]
+        mouse_pos = game.key_rects[n // 30 % 26].center  # Wander over the keys
+        game.recorder.capture(events, mouse_pos)
+        game.step(events, mouse_pos)
+        game.render()
+        live.append(pygame.image.tobytes(surface, 'RGB'))
+    game.recorder.save()
+    return live
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3:
+        workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        start = time.perf_counter()
+        count = render(sys.argv[1], sys.argv[2], workers)
+        elapsed = time.perf_counter() - start
+        print(f"Rendered {count} frames in {elapsed:.1f}s ({count / elapsed:.0f} fps)", file=sys.stderr)
+    else:
+        work = tempfile.mkdtemp()
+        recording = os.path.join(work, "game.json")
+        live = _scripted_game(recording)
+        size = len(live[0])
+        print(f"Recorded {len(live)} frames of live play")
+
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            raw_path = os.path.join(work, "frames.rgb")
+            render(recording, raw_path, workers)
+            with open(raw_path, 'rb') as f:
+                data = f.read()
+            frames = [data[i:i + size] for i in range(0, len(data), size)]
+            print(f"  {workers} worker(s): raw output identical to live play: {frames == live}")
+
+            start = time.perf_counter()
+            count = render(recording, os.path.join(work, f"png{workers}"), workers)
+            elapsed = time.perf_counter() - start
+            print(f"  {workers} worker(s): {count} PNGs in {elapsed:.1f}s ({count / elapsed:.0f} fps)")
+        shutil.rmtree(work)
@@ -0,0 +1,202 @@
+# Game results and leaderboard store (SQLite, WAL mode)
+#
+# The game loop only ever calls record(), which drops the result on a queue.
+# A background writer thread drains the queue and commits results in
+# batches, so a frame never waits for the disk. Per-player aggregates are
+# kept up to date in the same transaction, which keeps win-rate and
+# leaderboard queries at index-lookup cost no matter how many games exist.
+
+import queue
+import sqlite3
+import threading
+import time
+
+# ============== CONFIGURATION ==============
+DEFAULT_DB = "hangman_results.db"
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5  # Seconds a result may wait before being committed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    player TEXT NOT NULL,
+    word_length INTEGER NOT NULL,
+    guesses INTEGER NOT NULL,
+    wrong_count INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    won INTEGER NOT NULL,
+    integrity_failed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_player ON results (player, finished_at);
+CREATE INDEX IF NOT EXISTS idx_results_finished ON results (finished_at);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    player TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    wrong_total INTEGER NOT NULL,
+    integrity_failures INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_stats_wins ON player_stats (wins DESC, games);
+"""
+
+INSERT_RESULT = """
+INSERT INTO results (finished_at, player, word_length, guesses, wrong_count,
+                     duration, won, integrity_failed)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_STATS = """
+INSERT INTO player_stats (player, games, wins, wrong_total, integrity_failures)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (player) DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    wrong_total = wrong_total + excluded.wrong_total,
+    integrity_failures = integrity_failures + excluded.integrity_failures
+"""
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# ============== RESULTS STORE ==============
+class ResultsStore:
+    def __init__(self, path=DEFAULT_DB, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue()
+        self.written = 0
+        self.errors = 0
+        
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+        
+        self._local = threading.local()  # One read connection per thread
+        self._writer = threading.Thread(target=self._write_loop, name="results-writer", daemon=True)
+        self._writer.start()
+    
+    # ----- Hot path -----
+    def record(self, player, word_length, guesses, wrong_count, duration, won, integrity_failed=False):
+        """Queue one finished game. Never blocks."""
+        self.pending.put((
+            time.time(), player, word_length, guesses, wrong_count,
+            duration, int(won), int(integrity_failed)
+        ))
+    
+    # ----- Background writer -----
+    def _write_loop(self):
+        conn = connect(self.path)
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self.pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.pending.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if item is None:
+                running = False
+            if batch:
+                self._commit(conn, batch)
+        conn.close()
+    
+    def _commit(self, conn, batch):
+        stats = {}
+        for _, player, _, _, wrong, _, won, failed in batch:
+            s = stats.setdefault(player, [0, 0, 0, 0])
+            s[0] += 1
+            s[1] += won
+            s[2] += wrong
+            s[3] += failed
+        try:
+            with conn:
+                conn.executemany(INSERT_RESULT, batch)
+                conn.executemany(UPSERT_STATS, [(p, *s) for p, s in stats.items()])
+            self.written += len(batch)
+        except sqlite3.Error:
+            self.errors += len(batch)
+    
+    def close(self):
+        """Flush everything queued so far and stop the writer."""
+        self.pending.put(None)
+        self._writer.join()
+    
+    # ----- Queries -----
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+    
+    def win_rate(self, player=None):
+        conn = self._reader()
+        if player is None:
+            row = conn.execute("SELECT SUM(games), SUM(wins) FROM player_stats").fetchone()
+        else:
+            row = conn.execute(
+                "SELECT games, wins FROM player_stats WHERE player = ?", (player,)
+            ).fetchone()
+        if not row or not row[0]:
+            return 0.0
+        return row[1] / row[0]
+    
+    def leaderboard(self, limit=10):
+        """Top players by wins: (player, games, wins, win_rate, avg_wrong)."""
+        rows = self._reader().execute(
+            "SELECT player, games, wins, wrong_total FROM player_stats "
+            "ORDER BY wins DESC, games LIMIT ?", (limit,)
+        ).fetchall()
+        return [(p, g, w, w / g, wrong / g) for p, g, w, wrong in rows]
+    
+    def recent(self, player, limit=10):
+        return self._reader().execute(
+            "SELECT finished_at, word_length, guesses, wrong_count, duration, won, integrity_failed "
+            "FROM results WHERE player = ? ORDER BY finished_at DESC LIMIT ?",
+            (player, limit)
+        ).fetchall()
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    store = ResultsStore(path)
+    players = [f"player{i}" for i in range(1000)]
+    n = 1_000_000
+    start = time.perf_counter()
+    for _ in range(n):
+        store.record(random.choice(players), random.randint(2, 12), random.randint(1, 26),
+                     random.randint(0, 6), random.uniform(5, 120), random.random() < 0.4)
+    queued = time.perf_counter() - start
+    store.close()
+    total = time.perf_counter() - start
+    store = ResultsStore(path)
+    start = time.perf_counter()
+    rate = store.win_rate()
+    board = store.leaderboard(5)
+    mine = store.win_rate("player7")
+    history = store.recent("player7")
+    query = time.perf_counter() - start
+    store.close()
+    print(f"record() x{n:,}: {queued / n * 1e6:.2f} us each, all committed after {total:.1f}s")
+    print(f"Win rate {rate:.3f}, top player {board[0][0]} ({board[0][2]} wins)")
+    print(f"Queries: {query * 1000:.2f} ms")
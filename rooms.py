@@ -0,0 +1,222 @@
+# Multi-room host - runs many independent Hangman games in one process
+#
+# Each GameRoom owns its own word, crypto session, guesses and ragdoll.
+# A single RoomManager ticks every active room from one scheduler and only
+# hands the rooms that are currently on screen to the renderer.
+
+import itertools
+import random
+import time
+
+from crypto_utils import CryptoManager, ReplayGuard, TOKEN_TTL
+from adversary import AttackContext, Message, random_attack, receive
+from physics import Ragdoll
+
+# ============== CONFIGURATION ==============
+TICK_RATE = 60
+MAX_WRONG_GUESSES = 6
+ATTACK_PROBABILITY = 0.2  # 20% chance of simulated attack
+RAGDOLL_ORIGIN = (250, 100)  # Gallows beam position (WIDTH//4, 100)
+ROOM_REPLAY_CAPACITY = 1024  # A room only receives one token per game
+MAX_WORD_LENGTH = 20  # Longest secret word (the word input box holds 20 letters)
+
+# Room states in the order their codes are stored (journal, snapshots, batch)
+STATES = ("SET_WORD", "TRANSITION", "GUESSING", "GAME_OVER")
+# States in which the ragdoll is on screen and has to be simulated
+ACTIVE_STATES = ("GUESSING", "GAME_OVER")
+
+
+def is_letter(char):
+    """True for one upper-case ASCII letter, the only guess a room accepts."""
+    return len(char) == 1 and 'A' <= char <= 'Z'
+
+
+def is_word(text):
+    """True for 2 to MAX_WORD_LENGTH upper-case ASCII letters."""
+    return 2 <= len(text) <= MAX_WORD_LENGTH and all('A' <= c <= 'Z' for c in text)
+
+
+def letter_mask(letters):
+    """26-bit mask of upper-case letters, bit 0 = 'A'; anything else is left out."""
+    mask = 0
+    for c in letters:
+        if 'A' <= c <= 'Z':
+            mask |= 1 << (ord(c) - 65)
+    return mask
+
+
+# ============== GAME ROOM ==============
+class GameRoom:
+    """Headless state of a single game, mirroring the pygame game logic."""
+
+    def __init__(self, room_id, ragdoll_factory=Ragdoll, journal=None):
+        self.room_id = room_id
+        self.ragdoll_factory = ragdoll_factory
+        self.journal = journal
+        self.channel = AttackContext()  # Persists across games, like a real wire
+        self.replay_guard = ReplayGuard(capacity=ROOM_REPLAY_CAPACITY, recent=64)
+        self.reset_game()
+
+    def reset_game(self):
+        self.state = "SET_WORD"
+        self.word = ""
+        self.encrypted_word = None
+        self.md5_hash = ""
+        self.received = None
+        self.crypto = None
+        self.guessed = set()
+        self.wrong_count = 0
+        if getattr(self, 'ragdoll', None) is None:
+            self.ragdoll = self.ragdoll_factory(*RAGDOLL_ORIGIN)
+        else:
+            self.ragdoll.reset(*RAGDOLL_ORIGIN)  # Reuse between games
+        self.attack_detected = False
+        self.status_msg = "Player 1: Enter Secret Word"
+        if self.journal:
+            self.journal.reset(self.room_id)
+
+    def set_word(self, text):
+        text = text.strip().upper()
+        if not is_word(text):
+            return False
+        self.word = text
+        self.crypto = CryptoManager(ttl=TOKEN_TTL, replay_guard=self.replay_guard, room_id=self.room_id)
+        self.encrypted_word = self.crypto.encrypt(text)
+        self.md5_hash = self.crypto.digest(text)
+        self.state = "TRANSITION"
+        self.status_msg = "Word Encrypted!"
+        sent = Message(self.encrypted_word, self.md5_hash)
+        self.received = sent
+        if random.random() < ATTACK_PROBABILITY:
+            self.received = random_attack().apply(sent, self.channel)
+        self.channel.history.append(sent)
+        if self.journal:
+            self.journal.word_set(self.room_id, self)
+        return True
+
+    def set_random_word(self, words, lo=0.0, hi=1.0):
+        """Set a word from a DifficultyIndex within a difficulty band."""
+        return self.set_word(words.pick(lo, hi))
+
+    def start_guessing(self):
+        self.state = "GUESSING"
+        text = receive(self.crypto, self.received)
+        self.attack_detected = text is None
+        if text is not None:
+            self.word = text
+        self.status_msg = "Integrity OK - Start Guessing!"
+        if self.attack_detected:
+            self.status_msg = "⚠️ INTEGRITY BREACH!"
+        if self.journal:
+            self.journal.start(self.room_id, self.attack_detected)
+
+    def handle_guess(self, char):
+        if not is_letter(char) or char in self.guessed or self.state != "GUESSING":
+            return
+        self.guessed.add(char)
+        if char not in self.word:
+            self.wrong_count += 1
+            if self.wrong_count >= MAX_WRONG_GUESSES:
+                self.state = "GAME_OVER"
+                self.status_msg = "DEFEAT - Player 1 Wins!"
+        else:
+            if all(c in self.guessed for c in self.word):
+                self.state = "GAME_OVER"
+                self.status_msg = "VICTORY - Player 2 Wins!"
+        if self.journal:
+            self.journal.guess(self.room_id, char, self.wrong_count, self.state)
+
+    def masked_word(self):
+        if self.state == "GAME_OVER":
+            return self.word
+        return ''.join(c if c in self.guessed else '_' for c in self.word)
+
+    def is_active(self):
+        return self.state in ACTIVE_STATES
+
+    def tick(self):
+        self.ragdoll.wrong_count = self.wrong_count
+        self.ragdoll.update()
+
+
+# ============== ROOM MANAGER ==============
+class RoomManager:
+    def __init__(self, tick_rate=TICK_RATE, ragdoll_factory=Ragdoll, journal=None):
+        self.tick_rate = tick_rate
+        self.ragdoll_factory = ragdoll_factory
+        self.journal = journal
+        self.rooms = {}
+        self.visible = []
+        self.frame = 0
+        self._ids = itertools.count(1)
+
+    def create_room(self, room_id=None):
+        if room_id is None:
+            room_id = next(self._ids)
+            while room_id in self.rooms:
+                room_id = next(self._ids)
+        if room_id in self.rooms:
+            raise KeyError(f"Room {room_id!r} already exists")
+        room = GameRoom(room_id, self.ragdoll_factory, self.journal)
+        self.rooms[room_id] = room
+        return room
+
+    def restore(self):
+        """Rebuild every room recorded in the journal."""
+        for room_id, state in self.journal.restore().items():
+            room = GameRoom(room_id, self.ragdoll_factory)  # Not journaled while loading
+            self.journal.restore_into(room, state, room.replay_guard)
+            room.journal = self.journal
+            self.rooms[room_id] = room
+        # Start the next restart from here instead of the old segments
+        self.journal.snapshot(self.rooms)
+        return len(self.rooms)
+
+    def get_room(self, room_id):
+        return self.rooms[room_id]
+
+    def remove_room(self, room_id):
+        room = self.rooms.pop(room_id)
+        if self.journal:
+            self.journal.remove(room_id)
+        if room_id in self.visible:
+            self.visible.remove(room_id)
+        return room
+
+    def set_visible(self, room_ids):
+        """Choose which rooms are handed to the renderer."""
+        self.visible = [rid for rid in room_ids if rid in self.rooms]
+
+    def tick(self):
+        # Rooms waiting for a word have nothing to simulate
+        for room in self.rooms.values():
+            if room.state in ACTIVE_STATES:
+                room.tick()
+        if self.journal and self.journal.snapshot_due():
+            self.journal.snapshot(self.rooms)
+        self.frame += 1
+
+    def render(self, draw_room):
+        for rid in self.visible:
+            draw_room(self.rooms[rid])
+
+    def run(self, draw_room=None, frames=None, on_tick=None):
+        """Fixed-step loop: ticks all rooms, renders only the visible ones."""
+        step = 1.0 / self.tick_rate
+        next_tick = time.perf_counter()
+        count = 0
+        while frames is None or count < frames:
+            if on_tick:
+                on_tick(self)
+            self.tick()
+            if draw_room:
+                self.render(draw_room)
+            count += 1
+
+            next_tick += step
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Running behind - don't try to catch up with a burst of ticks
+                next_tick = time.perf_counter()
@@ -0,0 +1,301 @@
+# Process-pool sharding of game rooms across CPU cores
+#
+# Rooms are assigned to worker processes by room ID. Each worker owns the
+# state, crypto sessions and physics of its rooms and publishes a snapshot
+# of every room into its own shared-memory segment once per tick. The render
+# process never touches game objects - it only reads those snapshots.
+
+import multiprocessing as mp
+import queue
+import struct
+import time
+from multiprocessing import shared_memory
+
+from rooms import MAX_WORD_LENGTH, RoomManager, STATES, TICK_RATE, is_letter, is_word, letter_mask
+
+# ============== SNAPSHOT LAYOUT ==============
+MAX_WORD = MAX_WORD_LENGTH  # Masked word bytes per record
+MAX_PARTICLES = 32  # Blood particles exported per room
+NUM_JOINTS = 12     # Ragdoll.points
+
+STATE_CODES = {name: i for i, name in enumerate(STATES)}
+
+# seq (odd while the worker is writing), frame, room count
+HEADER = struct.Struct('<QQI')
+# room_id, state, wrong_count, guessed mask, flags, masked word,
+# joint x/y pairs, particle count, particle x/y pairs
+RECORD = struct.Struct(
+    f'<qBBIB{MAX_WORD}s{NUM_JOINTS * 2}fB{MAX_PARTICLES * 2}f'
+)
+FLAG_ROPE_SNAPPED = 1
+FLAG_ATTACK = 2
+READ_TIMEOUT = 1.0  # Seconds a reader waits for a shard to finish publishing
+
+
+def shard_for(room_id, num_shards):
+    # Room IDs are integers so they fit the snapshot record
+    return room_id % num_shards
+
+
+def pack_room(buf, offset, room):
+    ragdoll = room.ragdoll
+    joints = []
+    for p in ragdoll.points:
+        joints.append(p.x)
+        joints.append(p.y)
+    particles = ragdoll.blood_particles[-MAX_PARTICLES:]
+    coords = []
+    for b in particles:
+        coords.append(b.x)
+        coords.append(b.y)
+    coords.extend([0.0] * (MAX_PARTICLES * 2 - len(coords)))
+    flags = 0
+    if ragdoll.rope_snapped:
+        flags |= FLAG_ROPE_SNAPPED
+    if room.attack_detected:
+        flags |= FLAG_ATTACK
+    RECORD.pack_into(
+        buf, offset,
+        room.room_id, STATE_CODES[room.state], room.wrong_count,
+        letter_mask(room.guessed), flags,
+        room.masked_word().encode('ascii'),
+        *joints, len(particles), *coords
+    )
+
+
+def unpack_room(data, offset):
+    fields = RECORD.unpack_from(data, offset)
+    room_id, state, wrong_count, mask, flags, word = fields[:6]
+    joints = fields[6:6 + NUM_JOINTS * 2]
+    count = fields[6 + NUM_JOINTS * 2]
+    coords = fields[7 + NUM_JOINTS * 2:]
+    return {
+        'room_id': room_id,
+        'state': STATES[state],
+        'wrong_count': wrong_count,
+        'guessed': {chr(65 + i) for i in range(26) if mask >> i & 1},
+        'rope_snapped': bool(flags & FLAG_ROPE_SNAPPED),
+        'attack_detected': bool(flags & FLAG_ATTACK),
+        'masked_word': word.rstrip(b'\0').decode('ascii'),
+        'joints': list(zip(joints[0::2], joints[1::2])),
+        'particles': list(zip(coords[0:count * 2:2], coords[1:count * 2:2])),
+    }
+
+
+def segment_size(capacity):
+    return HEADER.size + RECORD.size * capacity
+
+
+# ============== WORKER PROCESS ==============
+def _apply_command(manager, cmd, capacity):
+    """Apply one command; an error message for the host, or None."""
+    op, room_id = cmd[0], cmd[1]
+    if op == 'create':
+        if len(manager.rooms) >= capacity:
+            return f"Shard capacity ({capacity} rooms) exceeded"
+        manager.create_room(room_id)
+    elif op == 'remove':
+        manager.remove_room(room_id)
+    elif op == 'set_word':
+        # Checked here so nothing that would not fit a snapshot record gets in
+        if not isinstance(cmd[2], str) or not is_word(cmd[2]):
+            return f"Word must be 2-{MAX_WORD} letters A-Z: {cmd[2]!r}"
+        manager.get_room(room_id).set_word(cmd[2])
+    elif op == 'start':
+        manager.get_room(room_id).start_guessing()
+    elif op == 'guess':
+        if not isinstance(cmd[2], str) or not is_letter(cmd[2]):
+            return f"Guess must be one letter A-Z: {cmd[2]!r}"
+        manager.get_room(room_id).handle_guess(cmd[2])
+    elif op == 'reset':
+        manager.get_room(room_id).reset_game()
+    return None
+
+
+def _publish(buf, manager, seq):
+    # Seqlock: readers retry while seq is odd or has moved
+    HEADER.pack_into(buf, 0, seq + 1, manager.frame, len(manager.rooms))
+    offset = HEADER.size
+    for room in manager.rooms.values():
+        pack_room(buf, offset, room)
+        offset += RECORD.size
+    HEADER.pack_into(buf, 0, seq + 2, manager.frame, len(manager.rooms))
+    return seq + 2
+
+
+def worker_main(shm_name, capacity, commands, tick_rate, errors):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = shm.buf
+    manager = RoomManager(tick_rate)
+    seq = 0
+    step = 1.0 / tick_rate
+    next_tick = time.perf_counter()
+    running = True
+    try:
+        while running:
+            while True:
+                try:
+                    cmd = commands.get_nowait()
+                except queue.Empty:
+                    break
+                if cmd is None:
+                    running = False
+                    break
+                try:
+                    error = _apply_command(manager, cmd, capacity)
+                except KeyError:
+                    continue  # Command for a room this shard no longer owns
+                except Exception as e:
+                    # A bad command must not take the shard and its rooms down
+                    error = f"{type(e).__name__}: {e}"
+                if error is not None:
+                    # Reject the command, keep the shard and its rooms running
+                    errors.put((cmd[0], cmd[1], error))
+
+            manager.tick()
+            seq = _publish(buf, manager, seq)
+
+            next_tick += step
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+    finally:
+        del buf
+        shm.close()
+
+
+# ============== SHARDED HOST ==============
+class ShardedRoomHost:
+    """Routes rooms to worker processes and reads their published snapshots."""
+
+    def __init__(self, num_workers=None, capacity=256, tick_rate=TICK_RATE):
+        self.num_workers = num_workers or mp.cpu_count()
+        self.capacity = capacity
+        self.tick_rate = tick_rate
+        self.segments = []
+        self.queues = []
+        self.workers = []
+        self.replies = None
+
+    def start(self):
+        ctx = mp.get_context('spawn')
+        self.replies = ctx.Queue()
+        for _ in range(self.num_workers):
+            shm = shared_memory.SharedMemory(create=True, size=segment_size(self.capacity))
+            HEADER.pack_into(shm.buf, 0, 0, 0, 0)
+            commands = ctx.Queue()
+            worker = ctx.Process(
+                target=worker_main,
+                args=(shm.name, self.capacity, commands, self.tick_rate, self.replies),
+                daemon=True
+            )
+            worker.start()
+            self.segments.append(shm)
+            self.queues.append(commands)
+            self.workers.append(worker)
+
+    def stop(self):
+        for commands in self.queues:
+            commands.put(None)
+        for worker in self.workers:
+            worker.join(timeout=2)
+            if worker.is_alive():
+                worker.terminate()
+        for shm in self.segments:
+            shm.close()
+            shm.unlink()
+        self.segments, self.queues, self.workers = [], [], []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ----- Commands (routed by room ID) -----
+    def _send(self, room_id, *cmd):
+        self.queues[shard_for(room_id, self.num_workers)].put((cmd[0], room_id) + cmd[1:])
+
+    def create_room(self, room_id):
+        self._send(room_id, 'create')
+
+    def remove_room(self, room_id):
+        self._send(room_id, 'remove')
+
+    def set_word(self, room_id, word):
+        self._send(room_id, 'set_word', word)
+
+    def start_guessing(self, room_id):
+        self._send(room_id, 'start')
+
+    def guess(self, room_id, char):
+        self._send(room_id, 'guess', char)
+
+    def reset_game(self, room_id):
+        self._send(room_id, 'reset')
+
+    def errors(self):
+        """Commands the workers rejected since the last call: (op, room_id, message)."""
+        out = []
+        while True:
+            try:
+                out.append(self.replies.get_nowait())
+            except queue.Empty:
+                return out
+
+    # ----- Snapshots (read-only) -----
+    def _read_shard(self, shard):
+        buf = self.segments[shard].buf
+        deadline = time.monotonic() + READ_TIMEOUT
+        while True:
+            seq, frame, count = HEADER.unpack_from(buf, 0)
+            if not seq & 1:
+                data = bytes(buf[:HEADER.size + RECORD.size * count])
+                if HEADER.unpack_from(buf, 0)[0] == seq:
+                    return frame, count, data
+            time.sleep(0)  # Let a writer in this process finish
+            if time.monotonic() > deadline:
+                # A worker that died mid-publish leaves the sequence odd
+                alive = self.workers[shard].is_alive() if shard < len(self.workers) else None
+                raise TimeoutError(f"Shard {shard} did not publish a consistent snapshot "
+                                   f"within {READ_TIMEOUT} s (worker alive: {alive})")
+
+    def shard_snapshots(self, shard):
+        frame, count, data = self._read_shard(shard)
+        return [unpack_room(data, HEADER.size + i * RECORD.size) for i in range(count)]
+
+    def snapshots(self):
+        rooms = {}
+        for shard in range(self.num_workers):
+            for snap in self.shard_snapshots(shard):
+                rooms[snap['room_id']] = snap
+        return rooms
+
+    def snapshot(self, room_id):
+        for snap in self.shard_snapshots(shard_for(room_id, self.num_workers)):
+            if snap['room_id'] == room_id:
+                return snap
+        return None
+
+    def frames(self):
+        return [self._read_shard(shard)[0] for shard in range(self.num_workers)]
+
+
+if __name__ == "__main__":
+    with ShardedRoomHost(num_workers=2, capacity=32) as host:
+        for rid in range(1, 65):
+            host.create_room(rid)
+            host.set_word(rid, "SHARDED")
+            host.start_guessing(rid)
+        for c in "QZXWVJ":
+            for rid in range(1, 65):
+                host.guess(rid, c)
+        host.create_room(65)  # One past shard 1's capacity: rejected, not fatal
+        time.sleep(1)
+        snap = host.snapshot(1)
+        print(f"Shard frames: {host.frames()}")
+        print(f"Room 1: {snap['state']} wrong={snap['wrong_count']} head={snap['joints'][1]}")
+        print(f"Rejected: {host.errors()}")
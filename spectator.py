@@ -0,0 +1,310 @@
+# Spectator broadcast of live game state
+#
+# Each tick the feed encodes every room once - a full keyframe every
+# KEYFRAME_INTERVAL ticks, otherwise only the fields that changed - and
+# appends the batch to a shared-memory ring buffer. Any number of local
+# spectators attach to the ring by name and read at their own pace, so the
+# cost of publishing does not grow with the audience. Late joiners (and
+# readers that fall a full lap behind) skip deltas until a room's next
+# keyframe arrives. The writer announces the range it is about to overwrite
+# before it writes, so a reader can tell when a message it copied was
+# overwritten underneath it.
+
+import struct
+import time
+from multiprocessing import shared_memory
+
+from rooms import letter_mask
+
+# ============== CONFIGURATION ==============
+KEYFRAME_INTERVAL = 60  # Ticks between full snapshots of a room
+RING_CAPACITY = 1 << 20
+COORD_SCALE = 4  # Joint positions are sent in quarter pixels
+
+# Frame kinds
+KEYFRAME = 1
+DELTA = 2
+
+# Field bits
+F_WORD = 1
+F_GUESSED = 2
+F_WRONG = 4
+F_STATUS = 8
+F_JOINTS = 16
+F_JOINTS_WIDE = 32  # Joint deltas did not fit in a signed byte
+
+RING_HEADER = struct.Struct('<QQ')        # bytes published, bytes reserved (being written)
+MSG_HEADER = struct.Struct('<I')          # message length (0 = wrap marker)
+BATCH_HEADER = struct.Struct('<IH')       # tick, frame count
+FRAME_HEADER = struct.Struct('<BIB')      # kind, room_id, field bits
+WRAP = 0
+
+
+def quantize_joints(points):
+    return [v for p in points for v in (round(p.x * COORD_SCALE), round(p.y * COORD_SCALE))]
+
+
+# ============== ENCODER ==============
+class SnapshotEncoder:
+    """Keeps the last state sent for every room and emits compact frames."""
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.sent = {}  # room_id -> (word, mask, wrong, status, joints)
+
+    def forget(self, room_id):
+        self.sent.pop(room_id, None)
+
+    def encode(self, room, tick):
+        """Return the frame for one room, or b'' if nothing changed."""
+        word = room.masked_word().encode('ascii')
+        mask = letter_mask(room.guessed)
+        wrong = room.wrong_count
+        status = room.status_msg.encode('utf-8')[:255]
+        joints = quantize_joints(room.ragdoll.points)
+
+        last = self.sent.get(room.room_id)
+        keyframe = last is None or (tick + room.room_id) % self.keyframe_interval == 0
+        self.sent[room.room_id] = (word, mask, wrong, status, joints)
+
+        parts = []
+        fields = 0
+        if keyframe or word != last[0]:
+            fields |= F_WORD
+            parts.append(bytes((len(word),)) + word)
+        if keyframe or mask != last[1]:
+            fields |= F_GUESSED
+            parts.append(struct.pack('<I', mask))
+        if keyframe or wrong != last[2]:
+            fields |= F_WRONG
+            parts.append(bytes((wrong,)))
+        if keyframe or status != last[3]:
+            fields |= F_STATUS
+            parts.append(bytes((len(status),)) + status)
+
+        if keyframe:
+            fields |= F_JOINTS
+            parts.append(struct.pack(f'<{len(joints)}i', *joints))
+        else:
+            # Only joints that moved, as deltas against the last sent values
+            changed = 0
+            deltas = []
+            for i in range(0, len(joints), 2):
+                dx = joints[i] - last[4][i]
+                dy = joints[i + 1] - last[4][i + 1]
+                if dx or dy:
+                    changed |= 1 << (i // 2)
+                    deltas.append(dx)
+                    deltas.append(dy)
+            if changed:
+                fields |= F_JOINTS
+                if all(-128 <= d <= 127 for d in deltas):
+                    parts.append(struct.pack(f'<H{len(deltas)}b', changed, *deltas))
+                else:
+                    fields |= F_JOINTS_WIDE
+                    parts.append(struct.pack(f'<H{len(deltas)}i', changed, *deltas))
+
+        if not fields:
+            return b''
+        kind = KEYFRAME if keyframe else DELTA
+        return FRAME_HEADER.pack(kind, room.room_id, fields) + b''.join(parts)
+
+
+def decode_frame(data, offset, rooms, num_joints=12):
+    """Apply one frame to the rooms dict; returns (room_id, new_offset).
+
+    Deltas for rooms that have not seen a keyframe yet are skipped.
+    """
+    kind, room_id, fields = FRAME_HEADER.unpack_from(data, offset)
+    offset += FRAME_HEADER.size
+    state = rooms.get(room_id)
+    if kind == KEYFRAME:
+        state = rooms[room_id] = {'room_id': room_id}
+    apply = state is not None
+
+    if fields & F_WORD:
+        n = data[offset]
+        if apply:
+            state['masked_word'] = bytes(data[offset + 1:offset + 1 + n]).decode('ascii')
+        offset += 1 + n
+    if fields & F_GUESSED:
+        mask = struct.unpack_from('<I', data, offset)[0]
+        if apply:
+            state['guessed'] = {chr(65 + i) for i in range(26) if mask >> i & 1}
+        offset += 4
+    if fields & F_WRONG:
+        if apply:
+            state['wrong_count'] = data[offset]
+        offset += 1
+    if fields & F_STATUS:
+        n = data[offset]
+        if apply:
+            state['status_msg'] = bytes(data[offset + 1:offset + 1 + n]).decode('utf-8', 'replace')
+        offset += 1 + n
+    if fields & F_JOINTS:
+        if kind == KEYFRAME:
+            values = struct.unpack_from(f'<{num_joints * 2}i', data, offset)
+            offset += num_joints * 8
+            state['_q'] = list(values)
+        else:
+            changed = struct.unpack_from('<H', data, offset)[0]
+            offset += 2
+            count = bin(changed).count('1') * 2
+            fmt = f'<{count}i' if fields & F_JOINTS_WIDE else f'<{count}b'
+            deltas = struct.unpack_from(fmt, data, offset)
+            offset += struct.calcsize(fmt)
+            if apply:
+                q = state['_q']
+                k = 0
+                for j in range(num_joints):
+                    if changed >> j & 1:
+                        q[2 * j] += deltas[k]
+                        q[2 * j + 1] += deltas[k + 1]
+                        k += 2
+        if apply:
+            q = state['_q']
+            state['joints'] = [(q[i] / COORD_SCALE, q[i + 1] / COORD_SCALE) for i in range(0, len(q), 2)]
+    return (room_id if apply else None), offset
+
+
+# ============== SHARED-MEMORY RING ==============
+class SpectatorFeed:
+    """Single writer: encodes all rooms once per tick into the ring."""
+
+    def __init__(self, name=None, capacity=RING_CAPACITY, keyframe_interval=KEYFRAME_INTERVAL):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=RING_HEADER.size + capacity)
+        self.name = self.shm.name
+        self.encoder = SnapshotEncoder(keyframe_interval)
+        self.written = 0
+        RING_HEADER.pack_into(self.shm.buf, 0, 0, 0)
+
+    def publish(self, rooms, tick):
+        frames = []
+        for room in rooms:
+            frame = self.encoder.encode(room, tick)
+            if frame:
+                frames.append(frame)
+        body = BATCH_HEADER.pack(tick, len(frames)) + b''.join(frames)
+        self._append(body)
+        return len(body)
+
+    def _append(self, body):
+        size = MSG_HEADER.size + len(body)
+        if size + MSG_HEADER.size > self.capacity:
+            raise ValueError("Tick batch larger than the spectator ring")
+        buf = self.shm.buf
+        pos = self.written % self.capacity
+        skip = self.capacity - pos if pos + size + MSG_HEADER.size > self.capacity else 0
+        end = self.written + skip + size
+        # Reserve first: readers still on anything before end - capacity
+        # see that it is being overwritten
+        RING_HEADER.pack_into(buf, 0, self.written, end)
+        if skip:
+            # Not enough room before the end: mark the wrap and start over at 0
+            MSG_HEADER.pack_into(buf, RING_HEADER.size + pos, WRAP)
+            pos = 0
+        base = RING_HEADER.size + pos
+        MSG_HEADER.pack_into(buf, base, len(body))
+        buf[base + MSG_HEADER.size:base + size] = body
+        self.written = end
+        RING_HEADER.pack_into(buf, 0, end, end)  # Publish
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SpectatorClient:
+    """One subscriber; attaches to a feed by name and keeps its own cursor."""
+
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.capacity = self.shm.size - RING_HEADER.size
+        # Start at the live edge; rooms appear as their keyframes arrive
+        self.read = RING_HEADER.unpack_from(self.shm.buf, 0)[0]
+        self.rooms = {}
+        self.tick = None
+        self.resyncs = 0
+        self.bad_batches = 0  # Batches that failed to decode and were skipped
+
+    def _resync(self, written):
+        self.read = written
+        self.rooms.clear()
+        self.resyncs += 1
+
+    def poll(self):
+        """Apply everything written since the last poll; returns updated room IDs."""
+        buf = self.shm.buf
+        updated = set()
+        while True:
+            written, reserved = RING_HEADER.unpack_from(buf, 0)
+            if self.read >= written:
+                # A resync or a skipped batch may have dropped some of them
+                return updated & self.rooms.keys()
+            if reserved - self.read > self.capacity:
+                self._resync(written)  # Lapped by the writer
+                continue
+            pos = self.read % self.capacity
+            length = MSG_HEADER.unpack_from(buf, RING_HEADER.size + pos)[0]
+            if length == WRAP:
+                self.read += self.capacity - pos
+                continue
+            start = RING_HEADER.size + pos + MSG_HEADER.size
+            body = bytes(buf[start:start + length])
+            # The writer may have started overwriting the message (or its
+            # length) while we copied it
+            written, reserved = RING_HEADER.unpack_from(buf, 0)
+            if reserved - self.read > self.capacity or pos + MSG_HEADER.size + length > self.capacity:
+                self._resync(written)
+                continue
+            self.read += MSG_HEADER.size + length
+
+            try:
+                tick, count = BATCH_HEADER.unpack_from(body, 0)
+                offset = BATCH_HEADER.size
+                for _ in range(count):
+                    room_id, offset = decode_frame(body, offset, self.rooms)
+                    if room_id is not None:
+                        updated.add(room_id)
+            except (struct.error, IndexError, KeyError, UnicodeDecodeError):
+                # Rooms may be half-updated: wait for their next keyframes
+                self.bad_batches += 1
+                self.rooms.clear()
+                continue
+            self.tick = tick
+
+    def close(self):
+        self.shm.close()
+
+
+if __name__ == "__main__":
+    from rooms import RoomManager
+
+    manager = RoomManager()
+    for _ in range(200):
+        room = manager.create_room()
+        room.set_word("SPECTATE")
+        room.start_guessing()
+    feed = SpectatorFeed()
+    clients = [SpectatorClient(feed.name) for _ in range(8)]
+    sent = 0
+    start = time.perf_counter()
+    for tick in range(1, 301):
+        for room in manager.rooms.values():
+            if tick % 20 == 0:
+                room.handle_guess(chr(64 + tick // 20))
+        manager.tick()
+        sent += feed.publish(manager.rooms.values(), tick)
+        for client in clients:
+            client.poll()
+    elapsed = time.perf_counter() - start
+    room = manager.get_room(1)
+    view = clients[0].rooms[1]
+    print(f"Bytes/tick for 200 rooms: {sent / 300:,.0f}")
+    print(f"Spectator word={view['masked_word']} wrong={view['wrong_count']} (room: {room.masked_word()} {room.wrong_count})")
+    print(f"Head: {view['joints'][1]} vs {room.ragdoll.head.x:.2f}, {room.ragdoll.head.y:.2f}")
+    print(f"300 ticks with {len(clients)} spectators in {elapsed:.2f}s")
+    for client in clients:
+        client.close()
+    feed.close()
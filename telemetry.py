@@ -0,0 +1,239 @@
+# Gameplay telemetry: guess latency, time to a verified word, attack
+# outcomes and frame stalls
+#
+# The game thread writes events into a preallocated ring buffer: a few
+# parallel typed arrays and two counters, with no lock and no per-event
+# container. The game thread only advances `head`, and the drain thread
+# only advances `tail`. When the buffer is full an event is dropped and
+# counted; the game loop never waits. A background thread drains the
+# buffer into gzip-compressed newline-delimited JSON files and rotates to
+# a new file once one reaches max_bytes on disk, keeping the newest `keep`.
+#
+# One Telemetry per producing thread (a game window, a room manager).
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from array import array
+
+from adversary import ATTACKS
+
+# ============== CONFIGURATION ==============
+DEFAULT_DIR = "hangman_telemetry"
+CAPACITY = 4096  # Events the ring holds; rounded up to a power of two
+DRAIN_INTERVAL = 0.25  # Seconds between drains
+FLUSH_INTERVAL = 5.0  # Seconds before drained events are flushed to disk
+MAX_BYTES = 4 * 2**20  # Compressed size at which a log file is rotated
+KEEP_FILES = 8
+
+# Event kinds
+GUESS = 1      # value: seconds since the previous guess (or game start)
+INTEGRITY = 2  # value: seconds from set_word until the integrity check finished
+ATTACK = 3     # a: attack code, b: detected
+STALL = 4      # value: seconds late, a: frames lost
+
+ATTACK_NAMES = ('',) + tuple(ATTACKS)
+ATTACK_CODES = {name: code for code, name in enumerate(ATTACK_NAMES)}
+
+FILE_PATTERN = re.compile(r"telemetry-(\d+)\.ndjson\.gz$")
+
+
+# One NDJSON line per kind, filled from (time, room, value, a, b); a
+# format string is several times cheaper per event than json.dumps
+def _guess_line(t, room, value, a, b):
+    return ('{"t":%.6f,"event":"guess","room":%d,"latency":%.6f,"letter":"%c","correct":%s}'
+            % (t, room, value, a, 'true' if b else 'false'))
+
+
+def _integrity_line(t, room, value, a, b):
+    return ('{"t":%.6f,"event":"integrity","room":%d,"elapsed":%.6f,"ok":%s}'
+            % (t, room, value, 'true' if a else 'false'))
+
+
+def _attack_line(t, room, value, a, b):
+    return ('{"t":%.6f,"event":"attack","room":%d,"attack":"%s","detected":%s}'
+            % (t, room, ATTACK_NAMES[a], 'true' if b else 'false'))
+
+
+def _stall_line(t, room, value, a, b):
+    return '{"t":%.6f,"event":"stall","room":%d,"late":%.6f,"frames":%d}' % (t, room, value, a)
+
+
+LINES = {GUESS: _guess_line, INTEGRITY: _integrity_line, ATTACK: _attack_line, STALL: _stall_line}
+
+
+def _format(kind, t, room, value, a, b):
+    return LINES[kind](t, room, value, a, b)
+
+
+# ============== TELEMETRY ==============
+class Telemetry:
+    def __init__(self, directory=DEFAULT_DIR, capacity=CAPACITY, max_bytes=MAX_BYTES,
+                 keep=KEEP_FILES, drain_interval=DRAIN_INTERVAL):
+        self.directory = directory
+        self.capacity = 1 << max(1, capacity - 1).bit_length()
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.drain_interval = drain_interval
+        self.dropped = 0
+        self.written = 0
+        self.files = 0
+
+        mask = self.capacity - 1
+        self._mask = mask
+        self._times = array('d', bytes(8 * self.capacity))
+        self._values = array('d', bytes(8 * self.capacity))
+        self._kinds = array('B', bytes(self.capacity))
+        self._rooms = array('i', bytes(4 * self.capacity))
+        self._a = array('i', bytes(4 * self.capacity))
+        self._b = array('i', bytes(4 * self.capacity))
+        self._head = 0  # Next slot to write; game thread only
+        self._tail = 0  # Next slot to drain; drain thread only
+
+        os.makedirs(directory, exist_ok=True)
+        self._raw = self._gzip = None
+        self._sequence = max(self._existing(), default=0)
+        self._logged_dropped = 0
+        self._stop = threading.Event()
+        self._drainer = threading.Thread(target=self._drain_loop, name="telemetry-drain", daemon=True)
+        self._drainer.start()
+
+    # ----- Hot path -----
+    def record(self, kind, value=0.0, a=0, b=0, room=0):
+        """Store one event; False (and counted) if the ring is full. Never blocks."""
+        head = self._head
+        if head - self._tail > self._mask:
+            self.dropped += 1
+            return False
+        i = head & self._mask
+        self._times[i] = time.time()
+        self._values[i] = value
+        self._kinds[i] = kind
+        self._rooms[i] = room
+        self._a[i] = a
+        self._b[i] = b
+        self._head = head + 1  # Publish only once the slot is complete
+        return True
+
+    def guess(self, latency, letter, correct, room=0):
+        return self.record(GUESS, latency, ord(letter), correct, room)
+
+    def integrity(self, elapsed, ok, room=0):
+        return self.record(INTEGRITY, elapsed, ok, 0, room)
+
+    def attack(self, name, detected, room=0):
+        return self.record(ATTACK, 0.0, ATTACK_CODES.get(name, 0), detected, room)
+
+    def stall(self, late, frames, room=0):
+        return self.record(STALL, late, frames, 0, room)
+
+    # ----- Background drain -----
+    def _drain_loop(self):
+        last_flush = time.monotonic()
+        while not self._stop.wait(self.drain_interval):
+            self._drain()
+            if self._gzip is not None and time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                self._gzip.flush()
+                last_flush = time.monotonic()
+        self._drain()
+
+    def _drain(self):
+        head, tail = self._head, self._tail
+        lines = []
+        mask = self._mask
+        # At most two contiguous runs of slots: up to the end, then from 0
+        for start, stop in ((tail & mask, min(head - tail + (tail & mask), mask + 1)),
+                            (0, max(0, (tail & mask) + head - tail - mask - 1))):
+            if stop > start:
+                lines += map(_format, self._kinds[start:stop], self._times[start:stop],
+                             self._rooms[start:stop], self._values[start:stop],
+                             self._a[start:stop], self._b[start:stop])
+        self._tail = head  # Slots are free again once copied out
+        dropped = self.dropped
+        if dropped != self._logged_dropped:
+            lines.append('{"t":%.6f,"event":"dropped","total":%d}' % (time.time(), dropped))
+            self._logged_dropped = dropped
+        if lines:
+            lines.append('')
+            self._write('\n'.join(lines).encode())
+            self.written += head - tail
+
+    def _write(self, data):
+        if self._gzip is None:
+            self._open()
+        self._gzip.write(data)
+        if self._raw.tell() >= self.max_bytes:
+            self._close_file()
+
+    def _path(self, sequence):
+        return os.path.join(self.directory, f"telemetry-{sequence:06d}.ndjson.gz")
+
+    def _existing(self):
+        for name in os.listdir(self.directory):
+            m = FILE_PATTERN.match(name)
+            if m:
+                yield int(m.group(1))
+
+    def _open(self):
+        self._sequence += 1
+        self._raw = open(self._path(self._sequence), 'wb')
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6)
+        self.files += 1
+        for old in sorted(self._existing())[:-self.keep]:
+            os.remove(self._path(old))
+
+    def _close_file(self):
+        self._gzip.close()
+        self._raw.close()
+        self._raw = self._gzip = None
+
+    def close(self):
+        """Drain what is buffered, finish the current file and stop."""
+        self._stop.set()
+        self._drainer.join()
+        if self._gzip is not None:
+            self._close_file()
+
+
+def read(directory=DEFAULT_DIR):
+    """Every logged event, oldest file first (for tools and tests)."""
+    sequences = sorted(int(m.group(1)) for m in map(FILE_PATTERN.match, os.listdir(directory)) if m)
+    for sequence in sequences:
+        with gzip.open(os.path.join(directory, f"telemetry-{sequence:06d}.ndjson.gz"), 'rt') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    telemetry = Telemetry(directory, max_bytes=256 * 1024)
+    # ~10,000 events/s in frame-sized batches, like a server hosting
+    # thousands of rooms
+    n, batch = 100_000, 160
+    spent = 0.0
+    for i in range(0, n, batch):
+        start = time.perf_counter()
+        for j in range(i, i + batch):
+            telemetry.guess(0.25, 'E', j & 1, room=j & 1023)
+        spent += time.perf_counter() - start
+        time.sleep(batch / 10_000)
+    telemetry.close()
+    print(f"guess() x{n:,}: {spent / n * 1e6:.2f} us each; "
+          f"{telemetry.written:,} written, {telemetry.dropped:,} dropped, {telemetry.files} files")
+
+    # A burst far larger than the ring: the overflow is dropped, not waited on
+    telemetry = Telemetry(directory, capacity=1024)
+    start = time.perf_counter()
+    for i in range(100_000):
+        telemetry.stall(0.02, 1)
+    burst = time.perf_counter() - start
+    telemetry.close()
+    print(f"Burst of 100,000 into 1,024 slots: {burst * 1000:.1f} ms, "
+          f"{telemetry.written:,} written, {telemetry.dropped:,} dropped")
+    events = list(read(directory))
+    print(f"Read back {len(events):,} lines; last: {events[-1]}")
@@ -0,0 +1,5 @@
+# Tests import the game modules from the project root, like the benchmarks
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+import crypto_utils
+from adversary import (ATTACKS, DETECTED, HARMLESS, UNDETECTED, Message, _run_chunk, random_attack,
+                       receive, run_campaign)
+from crypto_utils import CryptoManager
+
+TAMPERING = ('bit_flip', 'byte_flip', 'truncate', 'token_substitution', 'key_confusion')
+REPLAYS = ('replay', 'reorder')
+
+
+def sent(crypto, word):
+    return Message(crypto.encrypt(word), crypto.digest(word))
+
+
+def test_genuine_message_is_received():
+    crypto = CryptoManager()
+    assert receive(crypto, sent(crypto, "GALLOWS")) == "GALLOWS"
+
+
+@pytest.mark.parametrize('name', TAMPERING)
+def test_tampering_is_never_accepted_as_another_word(name):
+    counts = _run_chunk(name, 300, seed=1)[1]
+    assert counts[UNDETECTED] == 0
+    assert counts[DETECTED] > 0
+
+
+@pytest.mark.parametrize('name', REPLAYS)
+def test_replays_need_the_guard(name):
+    assert _run_chunk(name, 300, seed=1)[1][UNDETECTED] > 0
+    assert _run_chunk(name, 300, seed=1, replay_guard=True)[1] == {DETECTED: 300, UNDETECTED: 0, HARMLESS: 0}
+
+
+@pytest.mark.parametrize('backend', ['aesgcm', 'chacha20poly1305'])
+def test_aead_sessions_detect_every_attack(monkeypatch, backend):
+    # Sequence numbers catch replays and reordering without a guard
+    monkeypatch.setattr(crypto_utils, 'CRYPTO_BACKEND', backend)
+    for name in ATTACKS:
+        counts = _run_chunk(name, 200, seed=2)[1]
+        assert counts[UNDETECTED] == 0, name
+
+
+def test_campaign_adds_up_its_chunks():
+    report = run_campaign(250, attacks=['truncate', 'replay'], processes=1, chunk_size=100, seed=5)
+    wall = report.pop('_wall_seconds')
+    assert wall > 0
+    for name, r in report.items():
+        assert r['trials'] == 250
+        assert r[DETECTED] + r[UNDETECTED] + r[HARMLESS] == 250
+    assert report['truncate']['detection_rate'] == 1.0
+    assert report['replay']['detection_rate'] < 1.0
+
+
+def test_random_attack_is_registered():
+    assert random_attack(random.Random(0)) in ATTACKS.values()
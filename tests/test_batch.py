@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+import pytest
+
+import rooms
+from batch import MAX_WORD, GuessBatch, letter_codes, scalar_outcome
+from rooms import STATES, GameRoom
+
+WORDS = ['PYTHON', 'HANGMAN', 'GALLOWS', 'MISSISSIPPI', 'QUIZ', 'RHYTHM', 'XYLOPHONE', 'AB']
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+@pytest.fixture(autouse=True)
+def no_attacks(monkeypatch):
+    monkeypatch.setattr(rooms, 'ATTACK_PROBABILITY', 0.0)
+
+
+def new_rooms(count, rng):
+    out = []
+    for i in range(count):
+        room = GameRoom(i, ragdoll_factory=lambda x, y: None)
+        room.set_word(rng.choice(WORDS))
+        if rng.random() < 0.9:
+            room.start_guessing()
+        out.append(room)
+    return out
+
+
+def outcome(got, i):
+    return (got.applied[i], got.correct[i], got.reveal[i], got.wrong_count[i], got.won[i], got.lost[i])
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_batch_matches_game_room(seed):
+    rng = random.Random(seed)
+    games = new_rooms(300, rng)
+    batch = GuessBatch(len(games))
+    for slot, room in enumerate(games):
+        batch.load_room(slot, room)
+    for _ in range(40):
+        # Several guesses per room per tick, repeats and finished rooms included
+        slots = [s for s in range(len(games)) for _ in range(rng.choice((0, 1, 1, 2, 3)))]
+        rng.shuffle(slots)
+        letters = ''.join(rng.choice(ALPHABET) for _ in slots)
+        expected = [scalar_outcome(games[s], c) for s, c in zip(slots, letters)]
+        got = batch.apply(slots, letters)
+        assert [outcome(got, i) for i in range(len(slots))] == expected
+    for slot, room in enumerate(games):
+        assert STATES[batch.state[slot]] == room.state
+        assert int(batch.wrong[slot]) == room.wrong_count
+        assert batch.masked(slot) == room.masked_word()
+
+
+def test_store_room_copies_the_result_back():
+    room = GameRoom(1, ragdoll_factory=lambda x, y: None)
+    room.set_word("QUIZ")
+    room.start_guessing()
+    batch = GuessBatch(1)
+    batch.load_room(0, room)
+    got = batch.apply([0, 0, 0, 0, 0], "QEUIZ")
+    assert got.won.tolist() == [False, False, False, False, True]
+    assert got.reveal.tolist() == [1, 0, 2, 4, 8]
+    batch.store_room(0, room)
+    assert (room.state, room.wrong_count, room.guessed) == ("GAME_OVER", 1, set("QEUIZ"))
+    assert room.status_msg == "VICTORY - Player 2 Wins!"
+
+
+def test_longest_word_reveals_every_position():
+    word = "AB" * (MAX_WORD // 2)
+    batch = GuessBatch(2)
+    batch.load(0, word)
+    got = batch.apply([0], "B")
+    assert int(got.reveal[0]) == sum(1 << i for i in range(1, MAX_WORD, 2))
+    with pytest.raises(ValueError):
+        batch.load(1, word + "C")
+
+
+def test_bad_input_is_rejected():
+    assert letter_codes("AZ").tolist() == [0, 25]
+    assert letter_codes(np.array([66], dtype=np.uint8)).tolist() == [1]
+    with pytest.raises(ValueError):
+        letter_codes("a")
+    with pytest.raises(ValueError):
+        GuessBatch(1).apply([0, 0], "A")
+    assert len(GuessBatch(1).apply([], "").applied) == 0
@@ -0,0 +1,102 @@
+import socket
+
+import pytest
+
+import wire
+from cluster import HashRing, LocalCluster, RelayClient
+
+ROOMS = range(1, 201)
+
+
+def placement(ring):
+    return {room_id: ring.node_for(room_id) for room_id in ROOMS}
+
+
+def test_ring_is_deterministic_and_balanced():
+    nodes = ["a:1", "b:2", "c:3", "d:4"]
+    ring = HashRing(nodes)
+    assert placement(ring) == placement(HashRing(reversed(nodes)))
+    counts = [list(placement(ring).values()).count(n) for n in nodes]
+    assert min(counts) > len(ROOMS) / len(nodes) / 3
+
+
+def test_adding_a_node_only_moves_rooms_onto_it():
+    ring = HashRing(["a:1", "b:2", "c:3"])
+    before = placement(ring)
+    ring.add_node("d:4")
+    after = placement(ring)
+    moved = [r for r in ROOMS if before[r] != after[r]]
+    assert moved and all(after[r] == "d:4" for r in moved)
+    assert len(moved) < len(ROOMS) / 2
+
+
+def test_removing_a_node_only_moves_its_rooms():
+    ring = HashRing(["a:1", "b:2", "c:3"])
+    before = placement(ring)
+    ring.remove_node("b:2")
+    after = placement(ring)
+    assert all(before[r] == "b:2" for r in ROOMS if before[r] != after[r])
+    assert "b:2" not in after.values()
+    with pytest.raises(LookupError):
+        HashRing().node_for(1)
+
+
+def read_log(client, room_id, count):
+    """The room's log as a late joiner receives it."""
+    client.join(room_id)
+    sock, frames = client.connections[client.routes[room_id]]
+    sock.settimeout(2)
+    while len(client.inbox) < count:
+        try:
+            data = sock.recv(65536)
+        except socket.timeout:
+            break
+        client.inbox.extend(frames.feed(data))
+    return [(f.type, f.fields[0] if f.type == wire.GUESS else None) for f in client.inbox]
+
+
+def test_rooms_and_their_logs_follow_membership_changes():
+    rooms = range(1, 41)
+    with LocalCluster() as cluster:
+        cluster.start(2)
+        client = RelayClient(cluster.members)
+        spectators = []
+        try:
+            for room_id in rooms:
+                client.request(room_id, wire.encode_word_set(room_id, b'\x80' * 73, b'\0' * 16))
+                client.request(room_id, wire.encode_guess(room_id, 'A'))
+            owners = HashRing(cluster.members)
+            assert all(client.routes[r] == owners.node_for(r) for r in rooms)
+
+            added = cluster.add_node()
+            for room_id in rooms:
+                client.request(room_id, wire.encode_guess(room_id, 'B'))
+            owners = HashRing(cluster.members)
+            assert all(client.routes[r] == owners.node_for(r) for r in rooms)
+            assert added in client.routes.values()
+
+            # The same client, with routes and a socket to the removed node
+            removed = client.seeds[0]
+            assert removed in client.connections
+            cluster.remove_node(removed)
+            for room_id in rooms:
+                client.request(room_id, wire.encode_guess(room_id, 'C'))
+            owners = HashRing(cluster.members)
+            assert all(client.routes[r] == owners.node_for(r) for r in rooms)
+            assert removed not in client.connections
+
+            for room_id in (1, 20, 40):
+                spectator = RelayClient(cluster.members)
+                spectators.append(spectator)
+                log = read_log(spectator, room_id, 4)
+                assert log == [(wire.WORD_SET, None), (wire.GUESS, 'A'), (wire.GUESS, 'B'), (wire.GUESS, 'C')]
+        finally:
+            client.close()
+            for spectator in spectators:
+                spectator.close()
+
+
+def test_unreachable_cluster_raises():
+    client = RelayClient(["127.0.0.1:1"])
+    with pytest.raises(ConnectionError):
+        client.request(1, wire.encode_join(1))
@@ -0,0 +1,119 @@
+import math
+import random
+
+import pytest
+
+from collision import CELL, HEAD_RADIUS, JOINT_RADIUS, CollisionWorld, Segment, SpatialHash, push_out
+from physics import FLOOR_Y, HEAD, BloodParticle, Point, Ragdoll
+
+
+class Body:
+    """Just the joints and blood a CollisionWorld looks at."""
+
+    def __init__(self, points):
+        self.points = points
+        self.blood_particles = []
+
+
+def falling_ragdoll(x):
+    ragdoll = Ragdoll(x, 100)
+    ragdoll.wrong_count = 6
+    ragdoll.pop_progress[:] = [1.0] * 7
+    ragdoll.death_timer = 100  # Rope snaps on the next frames
+    return ragdoll
+
+
+def test_segment_closest_point_clamps_to_the_ends():
+    seg = Segment(0, 0, 10, 0, thickness=4)
+    assert seg.closest(5, 3) == (5, 0)
+    assert seg.closest(-5, 3) == (0, 0)
+    assert seg.closest(15, -3) == (10, 0)
+    assert Segment(2, 2, 2, 2).closest(9, 9) == (2, 2)
+
+
+def test_push_out_moves_a_circle_to_the_surface():
+    seg = Segment(0, 0, 100, 0, thickness=4)
+    nx, ny, depth = push_out(50, 3, 5, seg)
+    assert (nx, ny) == pytest.approx((0, 1))
+    assert 3 + depth == pytest.approx(5 + 2)
+    assert push_out(50, 8, 5, seg) is None
+    assert push_out(50, 0, 5, seg)[2] == pytest.approx(7)  # Centre on the axis
+
+
+def test_ragdolls_come_to_rest_on_the_floor():
+    random.seed(1)
+    world = CollisionWorld()
+    ragdolls = [falling_ragdoll(250 + 40 * i) for i in range(3)]
+    for ragdoll in ragdolls:
+        world.add(ragdoll)
+    for _ in range(400):
+        for ragdoll in ragdolls:
+            ragdoll.update()
+        world.step()
+    for ragdoll in ragdolls:
+        assert ragdoll.rope_snapped
+        for i, p in enumerate(ragdoll.points):
+            r = HEAD_RADIUS if i == HEAD else JOINT_RADIUS
+            assert p.y + r <= FLOOR_Y + 0.5
+        assert all(b.y <= FLOOR_Y + 1e-9 for b in ragdoll.blood_particles)
+
+
+def test_blood_stops_on_the_gallows_base():
+    world = CollisionWorld(segments=((0, 500, 400, 500, 8),))
+    body = Body([])
+    drop = BloodParticle(200, 480)
+    drop.vx, drop.vy, drop.size = 0.0, 5.0, 3.0
+    body.blood_particles.append(drop)
+    world.ragdolls.append(body)
+    for _ in range(20):
+        drop.update()
+        world.step()
+    assert drop.y == pytest.approx(500 - 4 - 3, abs=0.5)  # Resting on top, not fallen through
+    assert drop.vy <= 0.2 + 1e-9  # One frame of gravity at most
+
+
+def test_every_overlapping_pair_is_found_once():
+    # Isolated pairs of joints from different bodies, many straddling cell
+    # borders; all-pairs and the hash must agree on the count
+    random.seed(2)
+    first, second = [], []
+    for row in range(10):
+        for col in range(10):
+            x = col * 3 * CELL + random.choice((CELL - 1, CELL + 0.5, 7))
+            y = row * 3 * CELL + random.choice((CELL - 2, 13))
+            first.append(Point(x, y))
+            angle = random.uniform(0, 2 * math.pi)
+            second.append(Point(x + 5 * math.cos(angle), y + 5 * math.sin(angle)))
+    world = CollisionWorld(segments=(), floor_y=1e9)
+    world.ragdolls = [Body(first), Body(second)]
+    assert world.step() == len(first)
+    for i, (p, q) in enumerate(zip(first, second)):
+        reach = 2 * (HEAD_RADIUS if i == HEAD else JOINT_RADIUS)
+        assert math.hypot(q.x - p.x, q.y - p.y) == pytest.approx(reach)
+
+
+def test_own_joints_do_not_collide():
+    world = CollisionWorld(segments=(), floor_y=1e9)
+    world.ragdolls = [Body([Point(10, 10), Point(11, 10)])]
+    assert world.step() == 0
+
+
+def test_dynamic_cells_do_not_pile_up():
+    world = CollisionWorld(segments=(), floor_y=1e9)
+    body = Body([Point(0, 0), Point(15, 0)])
+    world.ragdolls = [body]
+    for _ in range(200):
+        for p in body.points:
+            p.x += CELL
+        world.step()
+        assert len(world.dynamic.cells) <= 2
+
+
+def test_spatial_hash_boxes_cover_every_cell():
+    grid = SpatialHash(cell=10)
+    grid.insert_box(5, 5, 25, 15, 'wall')
+    assert sorted(grid.cells) == [(c, r) for c in range(3) for r in range(2)]
+    assert grid.get((1, 1)) == ['wall']
+    assert grid.get((9, 9)) == ()
+    grid.clear()
+    assert grid.cells == {}
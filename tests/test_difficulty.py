@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from difficulty import EASY, HARD, MAX_WORD, DifficultyIndex, _synthetic_words, normalize, pack, score
+
+
+@pytest.fixture(scope='module')
+def words():
+    return _synthetic_words(5000) + ["TEETER", "JUKEBOX"]
+
+
+@pytest.fixture(scope='module')
+def index(words):
+    return DifficultyIndex.build(words)
+
+
+def test_words_are_sorted_by_score(words, index):
+    blob, offsets = pack(normalize(words))
+    raw = dict(zip(normalize(words), score(blob, offsets).tolist()))
+    indexed = [index.word(i) for i in range(len(index))]
+    assert sorted(indexed) == sorted(raw)
+    assert np.all(np.diff([raw[w] for w in indexed]) >= 0)
+    assert np.all(np.diff(index.scores) >= 0)
+    assert index.scores[0] >= 0.0 and index.scores[-1] <= 1.0
+
+
+def test_rare_letters_score_harder(index):
+    assert index.difficulty("jukebox") > index.difficulty("TEETER")
+    assert index.difficulty("NOTAWORDATALL") is None
+
+
+def test_pick_stays_in_the_band(index):
+    rng = random.Random(1)
+    for lo, hi in (EASY, HARD, (0.4, 0.45)):
+        start, stop = index.band(lo, hi)
+        assert stop > start
+        for _ in range(50):
+            assert lo <= index.difficulty(index.pick(lo, hi, rng)) <= hi
+
+
+def test_empty_band_raises(index):
+    with pytest.raises(LookupError):
+        index.pick(1.5, 2.0)
+
+
+def test_unplayable_words_are_dropped():
+    too_long = "A" * (MAX_WORD + 1)
+    assert normalize(["cat", "Cat ", "x", "naïve", "two words", too_long, "B" * MAX_WORD]) == ["CAT", "B" * MAX_WORD]
+    index = DifficultyIndex.build(["apple", "banana", "kiwi"], max_len=5)
+    assert sorted(index.word(i) for i in range(len(index))) == ["APPLE", "KIWI"]
+    with pytest.raises(ValueError):
+        DifficultyIndex.build(["x", too_long])
+
+
+def test_save_and_load(index, tmp_path):
+    path = tmp_path / "words.npz"
+    index.save(path)
+    loaded = DifficultyIndex.load(path)
+    assert loaded.blob == index.blob
+    assert np.array_equal(loaded.offsets, index.offsets)
+    assert np.array_equal(loaded.scores, index.scores)
@@ -0,0 +1,238 @@
+import os
+import random
+
+import pytest
+from cryptography import fernet
+from cryptography.fernet import Fernet
+
+import crypto_utils
+import journal
+import rooms
+from crypto_utils import ReplayError
+from journal import KEY_ENV, KEY_FILE, Journal, JournalLocked, iter_records
+from rooms import RoomManager
+
+WORDS = ["PYTHON", "GALLOWS", "CIPHER", "JOURNAL"]
+
+
+@pytest.fixture(autouse=True)
+def no_key_env(monkeypatch):
+    monkeypatch.delenv(KEY_ENV, raising=False)
+
+
+def play(manager, count, seed=1):
+    rng = random.Random(seed)
+    random.seed(seed)  # Attacks on the simulated channel
+    for _ in range(count):
+        manager.create_room()
+    for room in manager.rooms.values():
+        if rng.random() < 0.9:
+            room.set_word(rng.choice(WORDS))
+        if room.state == "TRANSITION" and rng.random() < 0.8:
+            room.start_guessing()
+        for char in rng.sample("ABCDEFGHIJKLMNOPQRSTUVWXYZ", rng.randint(0, 12)):
+            room.handle_guess(char)
+
+
+def state(manager):
+    return {rid: (r.state, r.word, sorted(r.guessed), r.wrong_count, r.attack_detected, r.status_msg)
+            for rid, r in manager.rooms.items()}
+
+
+def restored(directory, **kwargs):
+    """Restore into a fresh manager, then close the journal and detach the rooms."""
+    jour = Journal(directory, **kwargs)
+    try:
+        manager = RoomManager(journal=jour)
+        manager.restore()
+    finally:
+        jour.close()
+    manager.journal = None
+    for room in manager.rooms.values():
+        room.journal = None
+    return manager
+
+
+@pytest.mark.parametrize('snapshot_every', [10_000, 25])
+def test_restore_rebuilds_every_room(tmp_path, snapshot_every):
+    manager = RoomManager(journal=Journal(str(tmp_path), snapshot_every=snapshot_every))
+    play(manager, 60)
+    for _ in range(3):
+        manager.tick()  # Takes the snapshots that are due
+    manager.remove_room(5)
+    expected = state(manager)
+    assert manager.journal.sync(timeout=5)
+    manager.journal.close()
+
+    again = restored(str(tmp_path))
+    assert state(again) == expected
+    if snapshot_every < 10_000:
+        assert len(journal.glob.glob(str(tmp_path / "snapshot-*.bin"))) == 1
+
+
+def test_no_plaintext_words_on_disk(tmp_path):
+    manager = RoomManager(journal=Journal(str(tmp_path), snapshot_every=25))
+    play(manager, 60)
+    manager.tick()
+    manager.journal.close()
+    for name in os.listdir(tmp_path):
+        data = (tmp_path / name).read_bytes()
+        assert not any(word.encode() in data for word in WORDS)
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    manager = RoomManager(journal=Journal(str(tmp_path)))
+    play(manager, 10)
+    expected = state(manager)
+    manager.journal.close()
+    segment = max(tmp_path.glob("segment-*.bin"))
+    data = segment.read_bytes()
+    assert len(list(iter_records(data))) == manager.journal.appended
+    torn = journal._record(journal.REMOVE, 1)[:-1]  # Crashed mid-write
+    segment.write_bytes(data + torn)
+    assert state(restored(str(tmp_path))) == expected
+
+
+def test_failed_fsync_is_reported_not_counted(tmp_path, monkeypatch):
+    jour = Journal(str(tmp_path), commit_interval=0)
+    manager = RoomManager(journal=jour)
+    manager.create_room()
+    assert jour.sync(timeout=5)
+    durable = jour.durable
+
+    def broken(fd):
+        raise OSError("disk gone")
+    monkeypatch.setattr(journal.os, 'fsync', broken)
+    manager.get_room(1).set_word("GALLOWS")
+    assert not jour.sync(timeout=5)
+    assert jour.durable == durable
+    assert jour.errors >= 1 and isinstance(jour.error, OSError)
+
+    monkeypatch.undo()
+    manager.create_room()
+    assert not jour.sync(timeout=5)  # Still reports the earlier loss
+    assert jour.durable == jour.appended - jour.errors
+    jour.close()
+    assert len(list(tmp_path.glob("segment-*.bin"))) >= 2  # Later records start a new segment
+
+
+def test_key_can_live_outside_the_directory(tmp_path, monkeypatch):
+    directory = str(tmp_path / "journal")
+    key_file = str(tmp_path / "secret.key")
+    manager = RoomManager(journal=Journal(directory, key_file=key_file))
+    play(manager, 5)
+    expected = state(manager)
+    manager.journal.close()
+    assert not os.path.exists(os.path.join(directory, KEY_FILE))
+    assert os.stat(key_file).st_mode & 0o077 == 0
+
+    with pytest.raises(fernet.InvalidToken):
+        restored(directory)  # A new in-directory key cannot unwrap the sessions
+    assert state(restored(directory, key_file=key_file)) == expected
+    monkeypatch.setenv(KEY_ENV, open(key_file).read())
+    assert state(restored(directory)) == expected
+
+
+def test_default_key_is_owner_only(tmp_path):
+    path = tmp_path / KEY_FILE
+    path.write_bytes(Fernet.generate_key())
+    os.chmod(path, 0o644)
+    Journal(str(tmp_path)).close()
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+
+def one_room(tmp_path, monkeypatch, start):
+    monkeypatch.setattr(rooms, 'ATTACK_PROBABILITY', 0.0)
+    manager = RoomManager(journal=Journal(str(tmp_path)))
+    room = manager.create_room()
+    room.set_word("GALLOWS")
+    if start:
+        room.start_guessing()
+        room.handle_guess('G')
+    manager.journal.close()
+    return restored(str(tmp_path)).get_room(1)
+
+
+def test_restored_word_survives_the_downtime(tmp_path, monkeypatch):
+    room = one_room(tmp_path, monkeypatch, start=False)
+    later = fernet.time.time() + 3600
+    monkeypatch.setattr(fernet.time, 'time', lambda: later)
+    room.start_guessing()
+    assert not room.attack_detected
+    assert room.word == "GALLOWS"
+
+
+def test_restored_room_rejects_a_replay(tmp_path, monkeypatch):
+    room = one_room(tmp_path, monkeypatch, start=True)
+    assert room.masked_word() == "G______"
+    with pytest.raises(ReplayError):
+        room.crypto.decrypt(room.received.token)
+
+
+@pytest.mark.parametrize('backend', ['aesgcm', 'chacha20poly1305'])
+def test_aead_sessions_round_trip(tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(crypto_utils, 'CRYPTO_BACKEND', backend)
+    manager = RoomManager(journal=Journal(str(tmp_path)))
+    play(manager, 20)
+    expected = state(manager)
+    manager.journal.close()
+    again = restored(str(tmp_path))
+    assert state(again) == expected
+    assert {r.crypto.cipher.name for r in again.rooms.values() if r.crypto} == {backend}
+
+
+def test_directory_can_only_be_open_once(tmp_path):
+    first = Journal(str(tmp_path))
+    with pytest.raises(JournalLocked):
+        Journal(str(tmp_path))
+    first.close()
+    Journal(str(tmp_path)).close()
+
+
+def test_failed_snapshot_keeps_the_writer_going(tmp_path, monkeypatch):
+    manager = RoomManager(journal=Journal(str(tmp_path), snapshot_every=10))
+
+    def broken(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(journal.os, 'replace', broken)
+    play(manager, 10)
+    manager.tick()  # Snapshot fails
+    manager.get_room(1).reset_game()  # Queued behind the snapshot
+    assert manager.journal.sync(timeout=5)
+    monkeypatch.undo()
+    expected = state(manager)
+    assert manager.journal.snapshot_errors == 1
+    assert isinstance(manager.journal.error, OSError)
+    manager.journal.close()
+    assert state(restored(str(tmp_path))) == expected
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_stopped_writer_is_reported(tmp_path, monkeypatch):
+    jour = Journal(str(tmp_path))
+
+    def crash(batch, count):
+        raise RuntimeError("writer bug")
+    monkeypatch.setattr(jour, '_commit', crash)
+    jour.reset(1)
+    assert not jour.sync()  # No timeout: must not block forever
+    assert jour.stopped and isinstance(jour.error, RuntimeError)
+    with pytest.raises(RuntimeError):
+        jour.reset(2)
+    jour.close()
+
+
+def test_non_letter_guesses_never_reach_the_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(rooms, 'ATTACK_PROBABILITY', 0.0)
+    manager = RoomManager(journal=Journal(str(tmp_path)))
+    room = manager.create_room()
+    room.set_word("GALLOWS")
+    room.start_guessing()
+    for char in ('É', 'SS', 'a', 'G'):
+        room.handle_guess(char)
+    assert room.guessed == {'G'}
+    with pytest.raises(ValueError):
+        manager.journal.guess(room.room_id, 'É', 0, "GUESSING")
+    expected = state(manager)
+    manager.journal.close()
+    assert state(restored(str(tmp_path))) == expected
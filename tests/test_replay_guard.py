@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+import crypto_utils
+from crypto_utils import CryptoManager, InvalidToken, ReplayError, ReplayGuard, ReplayGuardFull
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(crypto_utils.time, 'monotonic', clock)
+    return clock
+
+
+def tokens(n):
+    return [b'token-%d' % i for i in range(n)]
+
+
+def test_seen_tokens_are_rejected_after_leaving_the_exact_window(clock):
+    guard = ReplayGuard(window=60, capacity=100, recent=2)
+    batch = tokens(10)
+    assert all(guard.check(t) for t in batch)
+    assert len(guard.recent) == 2
+    assert not any(guard.check(t) for t in batch)
+
+
+def test_tokens_are_remembered_for_a_full_window_after_rotation(clock):
+    guard = ReplayGuard(window=60, capacity=100, recent=1)
+    first, second, third = tokens(3)
+    assert guard.check(first)
+    clock.now += 60  # Rotate: first moves to the previous generation
+    assert guard.check(second)
+    assert not guard.check(first)
+    clock.now += 60  # Rotate again: first has expired
+    assert guard.check(third)
+    assert guard.check(first)
+
+
+def test_full_guard_refuses_instead_of_forgetting(clock):
+    guard = ReplayGuard(window=60, capacity=3, recent=1)
+    batch = tokens(4)
+    assert all(guard.check(t) for t in batch[:3])
+    with pytest.raises(ReplayGuardFull):
+        guard.check(batch[3])
+    assert guard.refused == 1
+    assert not any(guard.check(t) for t in batch[:3])
+    assert issubclass(ReplayGuardFull, InvalidToken)
+
+    clock.now += 60
+    assert guard.check(batch[3])
+    assert not guard.check(batch[0])
+
+
+def test_session_rejects_a_replayed_token():
+    guard = ReplayGuard(capacity=10)
+    crypto = CryptoManager(replay_guard=guard)
+    token = crypto.encrypt("GALLOWS")
+    assert crypto.decrypt(token) == "GALLOWS"
+    with pytest.raises(ReplayError):
+        crypto.decrypt(token)
+
+
+def test_forged_tokens_do_not_fill_the_guard():
+    guard = ReplayGuard(capacity=2)
+    crypto = CryptoManager(replay_guard=guard)
+    forged = CryptoManager()
+    for _ in range(5):
+        with pytest.raises(InvalidToken):
+            crypto.decrypt(forged.encrypt("FORGED"))
+    assert guard.current.count == 0
+
+
+@pytest.mark.parametrize('backend', ['aesgcm', 'chacha20poly1305'])
+def test_guard_rejection_leaves_the_sequence_alone(backend):
+    guard = ReplayGuard(capacity=10)
+    sender = CryptoManager(backend=backend, room_id=3)
+    receiver = CryptoManager(sender.get_key(), replay_guard=guard, room_id=3)
+    first, second = sender.encrypt("ONE"), sender.encrypt("TWO")
+    guard.check(second)  # Seen before, e.g. ahead of a restart
+    with pytest.raises(ReplayError):
+        receiver.decrypt(second)
+    assert receiver.received == 0
+    assert receiver.decrypt(first) == "ONE"
+    with pytest.raises(ReplayError):
+        receiver.decrypt(first)
+
+
+def test_shared_guard_accepts_each_token_once_across_threads():
+    guard = ReplayGuard(capacity=10_000, recent=64)
+    tokens = [b'token-%d' % i for i in range(2000)]
+    accepted = []
+
+    def worker():
+        accepted.append(sum(guard.check(token) for token in tokens))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(accepted) == len(tokens)
@@ -0,0 +1,67 @@
+import random
+import sqlite3
+
+import pytest
+
+from results import ResultsStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "results.db")
+
+
+def test_close_flushes_everything_queued(path):
+    store = ResultsStore(path, batch_size=7, flush_interval=0.05)
+    for i in range(100):
+        store.record(f"p{i % 3}", 6, 10, i % 7, 12.5, i % 2 == 0)
+    store.close()
+    assert (store.written, store.errors) == (100, 0)
+    assert store.win_rate() == 0.5
+
+
+def test_aggregates_match_the_results_table(path):
+    random.seed(3)
+    store = ResultsStore(path, batch_size=50)
+    for _ in range(1000):
+        store.record(f"p{random.randrange(20)}", random.randint(2, 12), random.randint(1, 26),
+                     random.randint(0, 6), random.uniform(5, 60), random.random() < 0.4,
+                     random.random() < 0.05)
+    store.close()
+
+    conn = sqlite3.connect(path)
+    expected = conn.execute(
+        "SELECT player, COUNT(*), SUM(won), SUM(wrong_count), SUM(integrity_failed) "
+        "FROM results GROUP BY player ORDER BY player").fetchall()
+    stats = conn.execute(
+        "SELECT player, games, wins, wrong_total, integrity_failures "
+        "FROM player_stats ORDER BY player").fetchall()
+    conn.close()
+    assert stats == expected
+
+    board = store.leaderboard(5)
+    assert [row[2] for row in board] == sorted((row[2] for row in expected), reverse=True)[:5]
+    player, games, wins = expected[0][:3]
+    assert store.win_rate(player) == wins / games
+    assert len(store.recent(player, limit=games + 1)) == games
+
+
+def test_database_uses_wal_and_survives_reopening(path):
+    store = ResultsStore(path)
+    store.record("alice", 5, 8, 2, 30.0, True)
+    store.close()
+    assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    store = ResultsStore(path)
+    store.record("alice", 5, 9, 6, 40.0, False)
+    store.close()
+    assert store.leaderboard() == [("alice", 2, 1, 0.5, 4.0)]
+    assert store.win_rate("nobody") == 0.0
+
+
+def test_record_does_not_wait_for_the_writer(path):
+    store = ResultsStore(path, flush_interval=5)
+    store.record("bob", 4, 4, 0, 3.0, True)
+    assert store.written == 0  # Still waiting for its batch
+    store.close()
+    assert store.written == 1
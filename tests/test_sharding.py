@@ -0,0 +1,160 @@
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+import rooms
+from rooms import RoomManager
+import sharding
+from sharding import (HEADER, RECORD, ShardedRoomHost, _apply_command, _publish, pack_room,
+                      segment_size, shard_for, unpack_room)
+
+
+@pytest.fixture(autouse=True)
+def no_attacks(monkeypatch):
+    monkeypatch.setattr(rooms, 'ATTACK_PROBABILITY', 0.0)
+
+
+def playing_manager(count, word="SHARDED"):
+    manager = RoomManager()
+    for rid in range(1, count + 1):
+        room = manager.create_room(rid)
+        room.set_word(word)
+        room.start_guessing()
+    return manager
+
+
+def test_record_round_trip():
+    manager = playing_manager(1)
+    room = manager.get_room(1)
+    for c in "SQZ":
+        room.handle_guess(c)
+    for _ in range(5):
+        manager.tick()
+    buf = bytearray(RECORD.size)
+    pack_room(buf, 0, room)
+    snap = unpack_room(buf, 0)
+    assert snap['room_id'] == 1
+    assert snap['state'] == "GUESSING"
+    assert snap['wrong_count'] == 2
+    assert snap['guessed'] == {'S', 'Q', 'Z'}
+    assert snap['masked_word'] == "S______"
+    assert snap['joints'] == [pytest.approx((p.x, p.y), abs=1e-3) for p in room.ragdoll.points]
+
+
+def test_capacity_rejects_instead_of_raising():
+    manager = RoomManager()
+    assert _apply_command(manager, ('create', 1), 1) is None
+    assert "capacity" in _apply_command(manager, ('create', 2), 1)
+    assert list(manager.rooms) == [1]
+
+
+@pytest.mark.parametrize('cmd', [('guess', 1, 'a'), ('guess', 1, 'AB'), ('guess', 1, 7),
+                                 ('set_word', 1, 'ÉCOLE'), ('set_word', 1, 'A' * 21)])
+def test_bad_input_is_rejected_at_the_command(cmd):
+    manager = playing_manager(1)
+    assert _apply_command(manager, cmd, 4) is not None
+    room = manager.get_room(1)
+    assert room.word == "SHARDED" and room.guessed == set()
+    _publish(bytearray(segment_size(4)), manager, 0)
+
+
+def test_reader_gives_up_on_a_stuck_shard(monkeypatch):
+    monkeypatch.setattr(sharding, 'READ_TIMEOUT', 0.05)
+    shm = shared_memory.SharedMemory(create=True, size=segment_size(1))
+    host = ShardedRoomHost(num_workers=1, capacity=1)
+    host.segments = [shm]
+    try:
+        HEADER.pack_into(shm.buf, 0, 47, 3, 0)  # Writer died mid-publish
+        with pytest.raises(TimeoutError):
+            host.frames()
+    finally:
+        host.segments = []
+        shm.close()
+        shm.unlink()
+
+
+def test_publish_keeps_sequence_even():
+    manager = playing_manager(3)
+    shm = shared_memory.SharedMemory(create=True, size=segment_size(4))
+    try:
+        seq = 0
+        for _ in range(3):
+            manager.tick()
+            seq = _publish(shm.buf, manager, seq)
+            assert HEADER.unpack_from(shm.buf, 0) == (seq, manager.frame, 3)
+        assert seq == 6
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_reader_never_sees_a_torn_shard(monkeypatch):
+    # Every room in a published shard has the same wrong count; a read that
+    # mixed two publishes would show two different counts
+    monkeypatch.setattr(sharding, 'READ_TIMEOUT', 60)  # The writer is a thread here
+    count = 64
+    manager = playing_manager(count, word="A" * 10)
+    shm = shared_memory.SharedMemory(create=True, size=segment_size(count))
+    HEADER.pack_into(shm.buf, 0, 0, 0, 0)
+    host = ShardedRoomHost(num_workers=1, capacity=count)
+    host.segments = [shm]
+    done = threading.Event()
+
+    def writer():
+        seq = 0
+        letters = "BCDEF"
+        for i in range(2000):
+            for room in manager.rooms.values():
+                room.wrong_count = i % 6
+                room.guessed = set(letters[:i % 6])
+            seq = _publish(shm.buf, manager, seq)
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    try:
+        while not done.is_set():
+            snaps = host.shard_snapshots(0)
+            assert len({s['wrong_count'] for s in snaps}) <= 1
+            reads += 1
+    finally:
+        thread.join()
+        host.segments = []
+        shm.close()
+        shm.unlink()
+    assert reads > 0
+
+
+def test_shard_for_spreads_room_ids():
+    assert [shard_for(rid, 4) for rid in range(8)] == [0, 1, 2, 3, 0, 1, 2, 3]
+
+
+def test_host_plays_rooms_across_workers():
+    with ShardedRoomHost(num_workers=2, capacity=2) as host:
+        for rid in (1, 2, 3):
+            host.create_room(rid)
+            host.set_word(rid, "SHARDED")
+            host.start_guessing(rid)
+        for c in "SHARDE":
+            host.guess(1, c)
+        host.guess(2, 'Q')
+        host.guess(2, 'a')
+        host.create_room(5)  # Third room on shard 1
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            snaps = host.snapshots()
+            if len(snaps) == 3 and snaps[1]['state'] == "GAME_OVER" and snaps[2]['wrong_count'] == 1:
+                break
+            time.sleep(0.05)
+        assert sorted(snaps) == [1, 2, 3]
+        assert snaps[1]['masked_word'] == "SHARDED"
+        assert snaps[2]['guessed'] == {'Q'}
+        assert snaps[3]['state'] == "GUESSING"
+        assert host.snapshot(4) is None
+        time.sleep(0.2)
+        assert sorted(host.errors()) == [('create', 5, "Shard capacity (2 rooms) exceeded"),
+                                         ('guess', 2, "Guess must be one letter A-Z: 'a'")]
+        assert host.frames()  # The shard is still publishing
@@ -0,0 +1,188 @@
+import pytest
+
+import rooms
+from rooms import RoomManager
+from spectator import (COORD_SCALE, F_JOINTS_WIDE, FRAME_HEADER, MSG_HEADER, RING_HEADER, SnapshotEncoder,
+                       SpectatorClient, SpectatorFeed, decode_frame)
+
+
+@pytest.fixture(autouse=True)
+def no_attacks(monkeypatch):
+    monkeypatch.setattr(rooms, 'ATTACK_PROBABILITY', 0.0)
+
+
+def playing(count, word="SPECTATE"):
+    manager = RoomManager()
+    for _ in range(count):
+        room = manager.create_room()
+        room.set_word(word)
+        room.start_guessing()
+    return manager
+
+
+def play_tick(manager, tick):
+    if tick % 7 == 0:
+        for room in manager.rooms.values():
+            room.handle_guess(chr(64 + (tick // 7 + room.room_id) % 26 + 1))
+    manager.tick()
+
+
+def assert_matches(view, room):
+    assert view['masked_word'] == room.masked_word()
+    assert view['guessed'] == room.guessed
+    assert view['wrong_count'] == room.wrong_count
+    assert view['status_msg'] == room.status_msg
+    tolerance = 0.5 / COORD_SCALE + 1e-9
+    for (x, y), p in zip(view['joints'], room.ragdoll.points):
+        assert abs(x - p.x) <= tolerance and abs(y - p.y) <= tolerance
+
+
+def test_deltas_track_the_room():
+    manager = playing(3)
+    encoder = SnapshotEncoder(keyframe_interval=50)
+    views = {}
+    for tick in range(1, 200):
+        play_tick(manager, tick)
+        for room in manager.rooms.values():
+            frame = encoder.encode(room, tick)
+            if frame:
+                assert decode_frame(frame, 0, views) == (room.room_id, len(frame))
+    for room in manager.rooms.values():
+        assert_matches(views[room.room_id], room)
+
+
+def test_unchanged_room_sends_nothing():
+    manager = RoomManager()
+    room = manager.create_room()
+    encoder = SnapshotEncoder()
+    assert encoder.encode(room, 1)
+    assert encoder.encode(room, 2) == b''
+
+
+def test_large_joint_moves_use_wide_deltas():
+    room = playing(1).get_room(1)
+    encoder = SnapshotEncoder()
+    views = {}
+    decode_frame(encoder.encode(room, 1), 0, views)
+    for p in room.ragdoll.points:
+        p.x += 100
+    frame = encoder.encode(room, 2)
+    assert FRAME_HEADER.unpack_from(frame, 0)[2] & F_JOINTS_WIDE
+    decode_frame(frame, 0, views)
+    assert_matches(views[1], room)
+
+
+def test_deltas_before_a_keyframe_are_skipped():
+    room = playing(1).get_room(1)
+    encoder = SnapshotEncoder()
+    encoder.encode(room, 1)
+    room.handle_guess('S')
+    frame = encoder.encode(room, 2)
+    views = {}
+    assert decode_frame(frame, 0, views) == (None, len(frame))
+    assert views == {}
+
+
+@pytest.fixture
+def feed():
+    feed = SpectatorFeed(capacity=4096, keyframe_interval=10)
+    yield feed
+    feed.close()
+
+
+def test_late_joiner_catches_up_at_the_next_keyframe(feed):
+    manager = playing(4)
+    for tick in range(1, 25):
+        play_tick(manager, tick)
+        feed.publish(manager.rooms.values(), tick)
+    client = SpectatorClient(feed.name)
+    try:
+        for tick in range(25, 60):
+            play_tick(manager, tick)
+            feed.publish(manager.rooms.values(), tick)
+            client.poll()
+        for room in manager.rooms.values():
+            assert_matches(client.rooms[room.room_id], room)
+    finally:
+        client.close()
+
+
+def test_ring_wraps_under_a_reader_that_keeps_up(feed):
+    manager = playing(4)
+    client = SpectatorClient(feed.name)
+    try:
+        for tick in range(1, 400):
+            play_tick(manager, tick)
+            feed.publish(manager.rooms.values(), tick)
+            client.poll()
+            assert client.tick == tick
+        assert feed.written > 4 * feed.capacity
+        assert client.resyncs == 0
+        for room in manager.rooms.values():
+            assert_matches(client.rooms[room.room_id], room)
+    finally:
+        client.close()
+
+
+def test_lapped_reader_resyncs(feed):
+    manager = playing(4)
+    client = SpectatorClient(feed.name)
+    try:
+        tick = 0
+        while feed.written < 2 * feed.capacity:
+            tick += 1
+            play_tick(manager, tick)
+            feed.publish(manager.rooms.values(), tick)
+        client.poll()
+        assert client.resyncs == 1
+        for _ in range(10):
+            tick += 1
+            play_tick(manager, tick)
+            feed.publish(manager.rooms.values(), tick)
+            client.poll()
+        for room in manager.rooms.values():
+            assert_matches(client.rooms[room.room_id], room)
+    finally:
+        client.close()
+
+
+def test_reader_drops_a_message_the_writer_is_overwriting(feed):
+    manager = playing(4)
+    client = SpectatorClient(feed.name)
+    try:
+        feed.publish(manager.rooms.values(), 1)
+        # Writer has reserved past the reader's slot but not yet published
+        RING_HEADER.pack_into(feed.shm.buf, 0, feed.written, client.read + feed.capacity + 1)
+        assert client.poll() == set()
+        assert client.resyncs == 1 and client.tick is None
+    finally:
+        client.close()
+
+
+def test_batch_that_fails_to_decode_is_skipped(feed):
+    manager = playing(2)
+    client = SpectatorClient(feed.name)
+    try:
+        start = feed.written
+        feed.publish(manager.rooms.values(), 1)
+        # Claim far more frames than the batch holds
+        body = RING_HEADER.size + start % feed.capacity + MSG_HEADER.size
+        feed.shm.buf[body + 4:body + 6] = (500).to_bytes(2, 'little')
+        assert client.poll() == set()
+        assert client.bad_batches == 1 and client.rooms == {}
+        for tick in range(2, 12):
+            play_tick(manager, tick)
+            feed.publish(manager.rooms.values(), tick)
+            client.poll()
+        for room in manager.rooms.values():
+            assert_matches(client.rooms[room.room_id], room)
+    finally:
+        client.close()
+
+
+def test_guessed_mask_ignores_non_letters():
+    room = playing(1).get_room(1)
+    room.guessed.update({'S', 'e', '?'})
+    views = {}
+    decode_frame(SnapshotEncoder().encode(room, 1), 0, views)
+    assert views[1]['guessed'] == {'S'}
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from telemetry import Telemetry, read
+
+
+@pytest.fixture
+def make(tmp_path):
+    opened = []
+
+    def make(**kwargs):
+        # Drains only when the test asks for one (or on close)
+        t = Telemetry(str(tmp_path), drain_interval=3600, **kwargs)
+        opened.append(t)
+        return t
+
+    yield make
+    for t in opened:
+        if t._drainer.is_alive():
+            t.close()
+
+
+def test_drain_across_the_end_of_the_ring(make, tmp_path):
+    t = make(capacity=8)
+    for i in range(6):
+        assert t.stall(i, i)
+    t._drain()
+    for i in range(6, 12):  # Slots 6, 7 then 0..3
+        assert t.stall(i, i)
+    t._drain()
+    t.close()
+    assert t.written == 12 and t.dropped == 0
+    assert [e['frames'] for e in read(str(tmp_path))] == list(range(12))
+
+
+def test_full_ring_drops_and_logs_the_count(make, tmp_path):
+    t = make(capacity=4)
+    results = [t.guess(0.5, 'E', True) for _ in range(6)]
+    assert results == [True] * 4 + [False] * 2
+    t._drain()
+    assert t.guess(0.5, 'Q', False)
+    t._drain()
+    t.close()
+    events = list(read(str(tmp_path)))
+    assert [e['event'] for e in events] == ['guess'] * 4 + ['dropped', 'guess']
+    assert events[4]['total'] == 2
+    assert events[5]['letter'] == 'Q' and events[5]['correct'] is False
+    assert t.written == 5 and t.dropped == 2
+
+
+def test_rotation_keeps_the_newest_files(make, tmp_path):
+    t = make(max_bytes=1, keep=3)  # Every drain fills a file
+    for i in range(5):
+        t.attack('bit_flip', True, room=i)
+        t._drain()
+    t.close()
+    assert t.files == 5
+    assert sorted(os.listdir(tmp_path)) == [f"telemetry-{n:06d}.ndjson.gz" for n in (3, 4, 5)]
+    assert [e['room'] for e in read(str(tmp_path))] == [2, 3, 4]
+
+    # A new instance carries on numbering after the existing files
+    t = make(max_bytes=1, keep=3)
+    t.integrity(0.1, True)
+    t.close()
+    assert sorted(os.listdir(tmp_path))[-1] == "telemetry-000006.ndjson.gz"
+    assert len(os.listdir(tmp_path)) == 3
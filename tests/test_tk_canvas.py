@@ -0,0 +1,59 @@
+import tkinter as tk
+
+import pytest
+
+import hangman
+from hangman import HangmanCanvas, _blend
+
+
+@pytest.fixture
+def canvas():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("No display for Tk")
+    root.withdraw()
+    view = HangmanCanvas(root)
+    yield view
+    view.stop()
+    root.destroy()
+
+
+def test_blend_endpoints():
+    assert _blend((255, 0, 0), '#102030', 0) == '#102030'
+    assert _blend((255, 0, 0), '#102030', 1) == '#ff0000'
+
+
+def test_ragdoll_maps_onto_the_drawn_gallows():
+    s = hangman.RAGDOLL_SCALE
+    assert (hangman.RAGDOLL_OFFSET_X + 250 * s, hangman.RAGDOLL_OFFSET_Y + 80 * s) == pytest.approx((150, 30))
+    assert hangman.RAGDOLL_OFFSET_Y + 600 * s == pytest.approx(260)
+
+
+def test_config_sends_only_changes():
+    view = HangmanCanvas.__new__(HangmanCanvas)
+    view._item_options = {7: {'state': 'hidden'}}
+    configs = []
+    view._config(configs, 7, state='hidden')
+    assert configs == []
+    view._config(configs, 7, state='normal', fill='#ffffff')
+    assert configs == [7, ('-state', 'normal', '-fill', '#ffffff')]
+    configs = []
+    view._config(configs, 7, state='normal', fill='#000000')
+    assert configs == [7, ('-fill', '#000000')]
+
+
+def test_frames_reuse_the_same_items(canvas):
+    items = canvas.canvas.find_all()
+    for _ in range(6):
+        canvas.wrong_guesses += 1
+        for _ in range(60):
+            canvas.ragdoll.wrong_count = canvas.wrong_guesses
+            canvas.ragdoll.update()
+            canvas._render()
+    assert canvas.canvas.find_all() == items
+    assert canvas.canvas.itemcget(canvas.head_item, 'state') == 'normal'
+
+    canvas.reset()
+    assert canvas.canvas.find_all() == items
+    assert all(canvas.canvas.itemcget(item, 'state') == 'hidden' for item in canvas._all_items)
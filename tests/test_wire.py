@@ -0,0 +1,145 @@
+import pytest
+
+import wire
+from crypto_utils import CryptoManager
+from wire import FrameReader, WireError, iter_frames, parse_frame, parse_word_sets
+
+BACKENDS = ['fernet', 'aesgcm', 'chacha20poly1305']
+
+
+def word_set(crypto, room_id, word):
+    token = crypto.encrypt(word)
+    return wire.encode_word_set(room_id, wire.token_to_raw(token), wire.word_digest(crypto, word))
+
+
+def mixed_stream(crypto):
+    return [
+        word_set(crypto, 7, "GALLOWS"),
+        wire.encode_guess(7, 'L'),
+        wire.encode_reveal(7, 'L', [2, 3]),
+        wire.encode_game_over(7, True, 2),
+        wire.encode_redirect(8, "10.0.0.2:9000"),
+        wire.encode_join(8),
+        wire.encode_ring_update(["a:1", "b:2"], True),
+        wire.encode_migrate(8, [wire.encode_guess(8, 'Q')]),
+        wire.encode_ack(8),
+    ]
+
+
+def expected_fields(frame):
+    return {
+        wire.GUESS: ('L',),
+        wire.REVEAL: ('L', [2, 3]),
+        wire.GAME_OVER: (True, 2),
+        wire.REDIRECT: ("10.0.0.2:9000",),
+        wire.JOIN: (),
+        wire.RING_UPDATE: (["a:1", "b:2"], True),
+        wire.ACK: (),
+    }.get(frame.type)
+
+
+def check_stream(frames, crypto):
+    assert [f.type for f in frames] == list(range(wire.WORD_SET, wire.ACK + 1))
+    assert wire.verify_word_set(crypto, frames[0]) == "GALLOWS"
+    assert parse_frame(memoryview(frames[7].fields[0]))[0].fields == ('Q',)
+    for frame in frames[1:]:
+        if frame.type != wire.MIGRATE:
+            assert frame.fields == expected_fields(frame)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_every_message_round_trips(backend):
+    crypto = CryptoManager(backend=backend, room_id=7)
+    data = b''.join(mixed_stream(crypto))
+    check_stream(list(iter_frames(data)), CryptoManager(crypto.get_key(), room_id=7))
+
+
+def test_reader_reassembles_a_byte_at_a_time():
+    crypto = CryptoManager()
+    data = b''.join(mixed_stream(crypto))
+    reader = FrameReader()
+    frames = []
+    for i in range(len(data)):
+        frames.extend(reader.feed(data[i:i + 1]))
+    assert reader.buffer == b''
+    check_stream(frames, CryptoManager(crypto.get_key()))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_tokens_survive_the_raw_form(backend):
+    crypto = CryptoManager(backend=backend)
+    token = crypto.encrypt("CIPHER")
+    raw = wire.token_to_raw(token)
+    assert wire.raw_to_token(raw) == token
+    if backend == 'fernet':
+        assert len(raw) < len(token)
+        assert wire.word_digest(crypto, "CIPHER") == wire.md5_digest("CIPHER")
+    else:
+        assert raw is token
+        assert wire.word_digest(crypto, "CIPHER") == b''
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_word_set_fast_path_matches_iter_frames(backend):
+    crypto = CryptoManager(backend=backend, room_id=1)
+    data = b''.join(word_set(crypto, 1, w) for w in ["ONE", "TWO", "THREE"])
+    full = word_set(crypto, 1, "FOUR")
+    words, consumed = parse_word_sets(data + full[:-1])
+    assert consumed == len(data)
+    frames = list(iter_frames(data))
+    assert words == [(f.room_id, bytes(f.fields[0]), bytes(f.fields[1])) for f in frames]
+    receiver = CryptoManager(crypto.get_key(), room_id=1)
+    assert [wire.verify_word(receiver, ct, digest) for _, ct, digest in words] == ["ONE", "TWO", "THREE"]
+
+
+def test_word_set_fast_path_refuses_other_frames():
+    with pytest.raises(WireError):
+        parse_word_sets(wire.encode_guess(1, 'A') + b'\0' * 8)
+
+
+def test_tampered_digest_is_rejected():
+    crypto = CryptoManager()
+    frame = bytearray(word_set(crypto, 1, "GALLOWS"))
+    frame[-1] ^= 1
+    words, _ = parse_word_sets(frame)
+    assert wire.verify_word(CryptoManager(crypto.get_key()), *words[0][1:]) is None
+
+
+def test_malformed_frames_raise():
+    with pytest.raises(WireError):
+        wire.encode_word_set(1, b'x', b'short')
+    bad_length = bytearray(wire.encode_word_set(1, b'abc', b''))
+    bad_length[wire.HEADER.size] = 5  # Claims more ciphertext than the frame holds
+    with pytest.raises(WireError):
+        parse_frame(bytes(bad_length))
+    with pytest.raises(WireError):
+        parse_frame(wire.HEADER.pack(5, 99, 1))
+
+
+def test_partial_frames_wait_for_more_bytes():
+    frame = wire.encode_reveal(3, 'E', [0, 31])
+    for cut in range(len(frame)):
+        assert parse_frame(frame[:cut]) == (None, 0)
+        assert list(iter_frames(frame[:cut])) == []
+    assert parse_frame(frame)[0].fields == ('E', [0, 31])
+
+
+@pytest.mark.parametrize('frame', [
+    wire.HEADER.pack(5, wire.GUESS, 1),              # No letter
+    wire.HEADER.pack(7, wire.GUESS, 1) + b'AB',      # Two letters
+    wire.HEADER.pack(6, wire.REVEAL, 1) + b'A',      # Mask missing
+    wire.HEADER.pack(6, wire.GAME_OVER, 1) + b'\1',
+    wire.HEADER.pack(5, wire.RING_UPDATE, 0),
+    wire.HEADER.pack(6, wire.ACK, 1) + b'x',
+    wire.HEADER.pack(4, wire.ACK, 1),                # Shorter than its own header
+    wire.HEADER.pack(6, wire.GUESS, 1) + b'\xc9',    # Not ASCII
+    wire.HEADER.pack(8, wire.REDIRECT, 1) + b'h\xffp',
+])
+def test_bad_bodies_raise_wire_error(frame):
+    data = frame + wire.encode_join(2)  # The next frame must not be read as part of this one
+    with pytest.raises(WireError):
+        parse_frame(data)
+    with pytest.raises(WireError):
+        list(iter_frames(data))
+    with pytest.raises(WireError):
+        FrameReader().feed(data)
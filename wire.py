@@ -0,0 +1,282 @@
+# Compact binary wire format for game messages
+#
+# Every frame is:  length (u32) | type (u8) | room_id (u32) | body
+# where length counts everything after the length field. Word-set frames
+# carry the raw token bytes (Fernet tokens without their base64; AEAD
+# tokens are raw already) and, for Fernet sessions, the raw 16-byte MD5
+# digest (no hex). parse_frame() and iter_frames() return Frame tuples
+# with memoryview slices into the receive buffer, so no payload bytes are
+# copied until they are used.
+#
+# The saving is mostly in bytes: a word-set frame is about a third smaller
+# than the base64 + hex text line. In pure Python, the per-frame objects
+# make iter_frames() slower to parse than splitting text lines. The
+# parse_word_sets() fast path (plain tuples, bytes slices) parses slightly
+# faster than text. Per message, either cost is small next to decryption
+# (python benchmarks/bench_wire.py).
+
+import base64
+import hashlib
+import struct
+from collections import namedtuple
+
+# ============== MESSAGE TYPES ==============
+WORD_SET = 1
+GUESS = 2
+REVEAL = 3
+GAME_OVER = 4
+
+# Relay control messages (cluster.py)
+REDIRECT = 5     # Room lives on another node: host:port
+JOIN = 6         # Subscribe to a room's messages
+RING_UPDATE = 7  # New cluster membership
+MIGRATE = 8      # Hand a room's message log to its new owner
+ACK = 9
+
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<IBI')        # length, type, room_id
+WORD_SET_BODY = struct.Struct('<H')   # ciphertext length, then ciphertext, then digest
+GUESS_BODY = struct.Struct('<c')      # letter
+REVEAL_BODY = struct.Struct('<cI')    # letter, bitmask of revealed positions
+GAME_OVER_BODY = struct.Struct('<BB') # won, wrong_count
+WORD_SET_HEADER = struct.Struct('<IBIH')  # HEADER + WORD_SET_BODY in one unpack
+RING_UPDATE_BODY = struct.Struct('<B')  # rebalance flag, then comma-separated addresses
+DIGEST_SIZE = 16
+FERNET_TEXT = b'g'      # Base64 of Fernet's version byte, which starts every token
+FERNET_RAW = b'\x80'
+
+# Body sizes of the fixed-size messages; parse_frame rejects anything else
+FIXED_BODY = {GUESS: GUESS_BODY.size, REVEAL: REVEAL_BODY.size,
+              GAME_OVER: GAME_OVER_BODY.size, JOIN: 0, ACK: 0}
+# Smallest body of the variable-size messages
+MIN_BODY = {WORD_SET: WORD_SET_BODY.size, RING_UPDATE: RING_UPDATE_BODY.size}
+
+Frame = namedtuple('Frame', ['type', 'room_id', 'fields'])
+
+
+class WireError(ValueError):
+    """Malformed or truncated frame."""
+
+
+# ============== TOKEN <-> RAW ==============
+def token_to_raw(token):
+    """Fernet tokens are base64 text; the wire carries the decoded bytes."""
+    if token[:1] != FERNET_TEXT:
+        return token  # AEAD tokens are raw bytes already
+    return base64.urlsafe_b64decode(token)
+
+
+def raw_to_token(raw):
+    if raw[:1] != FERNET_RAW:
+        return raw
+    return base64.urlsafe_b64encode(raw)
+
+
+def md5_digest(text):
+    return hashlib.md5(text.encode('utf-8')).digest()
+
+
+def word_digest(crypto, text):
+    """Digest a word-set frame carries: raw MD5, or none for AEAD sessions."""
+    return md5_digest(text) if crypto.separate_digest else b''
+
+
+# ============== ENCODING ==============
+def _frame(msg_type, room_id, body):
+    return HEADER.pack(HEADER.size - LENGTH.size + len(body), msg_type, room_id) + body
+
+
+def encode_word_set(room_id, ciphertext, digest):
+    if len(digest) not in (0, DIGEST_SIZE):
+        raise WireError("MD5 digest must be 16 raw bytes (or empty for AEAD tokens)")
+    return _frame(WORD_SET, room_id, WORD_SET_BODY.pack(len(ciphertext)) + bytes(ciphertext) + bytes(digest))
+
+
+def encode_guess(room_id, letter):
+    return _frame(GUESS, room_id, GUESS_BODY.pack(letter.encode('ascii')))
+
+
+def encode_reveal(room_id, letter, positions):
+    mask = 0
+    for i in positions:
+        mask |= 1 << i
+    return _frame(REVEAL, room_id, REVEAL_BODY.pack(letter.encode('ascii'), mask))
+
+
+def encode_game_over(room_id, won, wrong_count):
+    return _frame(GAME_OVER, room_id, GAME_OVER_BODY.pack(int(won), wrong_count))
+
+
+def encode_redirect(room_id, address):
+    return _frame(REDIRECT, room_id, address.encode('ascii'))
+
+
+def encode_join(room_id):
+    return _frame(JOIN, room_id, b'')
+
+
+def encode_ring_update(addresses, rebalance):
+    return _frame(RING_UPDATE, 0, RING_UPDATE_BODY.pack(int(rebalance)) + ','.join(addresses).encode('ascii'))
+
+
+def encode_migrate(room_id, frames):
+    return _frame(MIGRATE, room_id, b''.join(frames))
+
+
+def encode_ack(room_id):
+    return _frame(ACK, room_id, b'')
+
+
+# ============== PARSING ==============
+def parse_frame(view, offset=0):
+    """Parse one frame at offset; returns (Frame, next_offset).
+
+    Returns (None, offset) if the buffer does not yet hold a whole frame.
+    Byte fields are memoryview slices of `view`.
+    """
+    if len(view) - offset < HEADER.size:
+        return None, offset
+    length, msg_type, room_id = HEADER.unpack_from(view, offset)
+    end = offset + LENGTH.size + length
+    if end > len(view):
+        return None, offset
+    pos = offset + HEADER.size
+    body = end - pos
+    if body < MIN_BODY.get(msg_type, 0) or FIXED_BODY.get(msg_type, body) != body:
+        raise WireError(f"Bad body length {body} for message type {msg_type}")
+    try:
+        return Frame(msg_type, room_id, _parse_body(view, msg_type, pos, end)), end
+    except UnicodeDecodeError as e:
+        raise WireError(f"Undecodable text in message type {msg_type}") from e
+
+
+def _parse_body(view, msg_type, pos, end):
+    """Fields of a body whose length parse_frame has already checked."""
+    if msg_type == WORD_SET:
+        (ct_len,) = WORD_SET_BODY.unpack_from(view, pos)
+        pos += WORD_SET_BODY.size
+        if end - pos - ct_len not in (0, DIGEST_SIZE):
+            raise WireError("Word-set frame length mismatch")
+        fields = (view[pos:pos + ct_len], view[pos + ct_len:end])
+    elif msg_type == GUESS:
+        fields = (GUESS_BODY.unpack_from(view, pos)[0].decode('ascii'),)
+    elif msg_type == REVEAL:
+        letter, mask = REVEAL_BODY.unpack_from(view, pos)
+        fields = (letter.decode('ascii'), [i for i in range(32) if mask >> i & 1])
+    elif msg_type == GAME_OVER:
+        won, wrong = GAME_OVER_BODY.unpack_from(view, pos)
+        fields = (bool(won), wrong)
+    elif msg_type == REDIRECT:
+        fields = (bytes(view[pos:end]).decode('ascii'),)
+    elif msg_type == RING_UPDATE:
+        (rebalance,) = RING_UPDATE_BODY.unpack_from(view, pos)
+        members = bytes(view[pos + RING_UPDATE_BODY.size:end]).decode('ascii')
+        fields = (members.split(',') if members else [], bool(rebalance))
+    elif msg_type == MIGRATE:
+        fields = (view[pos:end],)
+    elif msg_type in (JOIN, ACK):
+        fields = ()
+    else:
+        raise WireError(f"Unknown message type {msg_type}")
+    return fields
+
+
+def iter_frames(data):
+    """Yield every complete frame in data; stops at a trailing partial frame."""
+    view = memoryview(data)
+    size = len(view)
+    unpack_header = WORD_SET_HEADER.unpack_from
+    offset = 0
+    # Word-set frames dominate traffic, so they are parsed inline with a
+    # single unpack of header + ciphertext length; the rest go through
+    # parse_frame()
+    while size - offset >= WORD_SET_HEADER.size:
+        length, msg_type, room_id, ct_len = unpack_header(view, offset)
+        end = offset + 4 + length
+        if end > size:
+            return
+        if msg_type == WORD_SET:
+            pos = offset + WORD_SET_HEADER.size
+            if end - pos - ct_len not in (0, DIGEST_SIZE):
+                raise WireError("Word-set frame length mismatch")
+            yield Frame(WORD_SET, room_id, (view[pos:pos + ct_len], view[pos + ct_len:end]))
+            offset = end
+        else:
+            frame, offset = parse_frame(view, offset)
+            yield frame
+    while True:
+        frame, offset = parse_frame(view, offset)
+        if frame is None:
+            return
+        yield frame
+
+
+def parse_word_sets(data):
+    """Fast path for a buffer of word-set frames: ([(room_id, ciphertext,
+    digest)], bytes consumed). Stops at a trailing partial frame.
+
+    Plain tuples and bytes slices instead of Frame and memoryview slices;
+    any other frame type raises WireError.
+    """
+    out = []
+    append = out.append
+    unpack_header = WORD_SET_HEADER.unpack_from
+    header_size = WORD_SET_HEADER.size
+    size = len(data)
+    offset = 0
+    while size - offset >= header_size:
+        length, msg_type, room_id, ct_len = unpack_header(data, offset)
+        end = offset + 4 + length
+        if end > size:
+            break
+        pos = offset + header_size
+        if msg_type != WORD_SET or end - pos - ct_len not in (0, DIGEST_SIZE):
+            raise WireError("Not a word-set frame" if msg_type != WORD_SET
+                            else "Word-set frame length mismatch")
+        append((room_id, data[pos:pos + ct_len], data[pos + ct_len:end]))
+        offset = end
+    return out, offset
+
+
+class FrameReader:
+    """Reassembles frames from a byte stream (e.g. socket recv chunks)."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, chunk, raw=False):
+        """Return the complete frames so far; (frame, frame_bytes) pairs if raw."""
+        self.buffer += chunk
+        frames = []
+        view = memoryview(self.buffer)
+        offset = 0
+        while True:
+            frame, next_offset = parse_frame(view, offset)
+            if frame is None:
+                break
+            if frame.type in (WORD_SET, MIGRATE):
+                # The buffer is about to shrink; detach payload slices from it
+                frame = Frame(frame.type, frame.room_id, tuple(
+                    bytes(f) if isinstance(f, memoryview) else f for f in frame.fields
+                ))
+            frames.append((frame, bytes(view[offset:next_offset])) if raw else frame)
+            offset = next_offset
+        view.release()
+        del self.buffer[:offset]
+        return frames
+
+
+def verify_word_set(crypto, frame):
+    """Decrypt a word-set frame and check its digest; the word or None."""
+    return verify_word(crypto, *frame.fields)
+
+
+def verify_word(crypto, ciphertext, digest):
+    """verify_word_set for the fields parse_word_sets() returns."""
+    try:
+        word = crypto.decrypt(raw_to_token(ciphertext))
+    except Exception:
+        return None
+    if word_digest(crypto, word) != bytes(digest):
+        return None
+    return word